@@ -1,29 +1,124 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from app.factories import FactorySession
 import os
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': FactorySession})
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     
+    # JSON responses: orjson when installed, dates as ISO strings (see app/json_provider.py)
+    from app.json_provider import ScheduleJSONProvider
+    app.json = ScheduleJSONProvider(app)
+    
     # Database configuration
     basedir = os.path.abspath(os.path.dirname(__file__))
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(basedir, "scheduling.db")}'
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+        'DATABASE_URL', f'sqlite:///{os.path.join(basedir, "scheduling.db")}'
+    )
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SECRET_KEY'] = 'dev-secret-key'  # Change in production
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')  # Change in production
+    
+    # SQLite connection settings (WAL lets readers in other workers run during writes)
+    app.config['SQLITE_JOURNAL_MODE'] = 'WAL'
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = 5000
+    
+    # Archive for completed schedule history (attached to every connection)
+    app.config['ARCHIVE_DATABASE_PATH'] = os.environ.get(
+        'ARCHIVE_DATABASE_PATH', os.path.join(basedir, "scheduling_archive.db")
+    )
+    app.config['ARCHIVE_HORIZON_DAYS'] = 90
+    app.config['ARCHIVE_BATCH_SIZE'] = 500
+    
+    # Background jobs: worker threads per process and how many more may wait
+    app.config['JOB_WORKERS'] = 2
+    app.config['JOB_QUEUE_SIZE'] = 16
+    
+    # Shop calendar: 2 shifts/day, 2 slots/shift, Monday-Saturday (see app/shop_calendar.py)
+    app.config['SHIFTS_PER_DAY'] = 2
+    app.config['SLOTS_PER_SHIFT'] = 2
+    app.config['SLOT_MINUTES'] = 240
+    app.config['WORKING_DAYS'] = [0, 1, 2, 3, 4, 5]  # date.weekday() values
+    app.config['HOLIDAYS'] = []  # dates (or YYYY-MM-DD strings) the shop is closed
+    
+    # In-process caches (entries per cache, see app/cache.py)
+    app.config['CACHE_MAX_ENTRIES'] = 1024
+    # Encoded by-date and by-machine schedule views (a day of one shop is tens of KB)
+    app.config['SCHEDULE_VIEW_CACHE_ENTRIES'] = 512
+    
+    # Auto-scheduler worker processes (None: one per CPU)
+    app.config['SCHEDULER_PROCESSES'] = None
+    
+    # Machine breakdowns: how many days either side of a slot to look for a free alternate slot
+    app.config['DOWNTIME_SEARCH_DAYS'] = 7
+    
+    # Capacity simulation worker processes (None: one per CPU)
+    app.config['SIMULATION_PROCESSES'] = None
+    
+    # Factory shards: name -> SQLite database path, each with its archive next to it
+    # (see app/factories.py). The default database is the factory named DEFAULT_FACTORY.
+    app.config['FACTORIES'] = {}
+    app.config['DEFAULT_FACTORY'] = 'default'
+    app.config['FACTORY_THREADS'] = None  # cross-factory queries (None: one per factory)
+    
+    # Overrides (used by tests and alternative deployments)
+    if config:
+        app.config.update(config)
+    
+    from app.factories import factory_binds
+    app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}), **factory_binds(app.config)}
     
     # Initialize extensions
     db.init_app(app)
+    from app.factories import drop_factory_metadata
+    drop_factory_metadata(app)
     CORS(app)  # Enable CORS for all routes
     
     # Register blueprints
     from app.routes.main import main_bp
     app.register_blueprint(main_bp)
+    from app.routes.planning import planning_bp
+    app.register_blueprint(planning_bp)
+    from app.routes.jobs import jobs_bp
+    app.register_blueprint(jobs_bp)
+    from app.routes.scheduling import scheduling_bp
+    app.register_blueprint(scheduling_bp)
+    from app.routes.dashboard import dashboard_bp
+    app.register_blueprint(dashboard_bp)
+    from app.routes.export import export_bp
+    app.register_blueprint(export_bp)
+    from app.routes.reports import reports_bp
+    app.register_blueprint(reports_bp)
+    from app.routes.factories import factories_bp
+    app.register_blueprint(factories_bp)
+    
+    # Lock trigger aborts from any blueprint answer 409 (see app/models/schedule_lock.py)
+    from sqlalchemy.exc import IntegrityError
+    from app.database import handle_integrity_error
+    app.register_error_handler(IntegrityError, handle_integrity_error)
+    
+    # Register CLI commands
+    from app.services.archive import archive_schedules_command
+    app.cli.add_command(archive_schedules_command)
+    from app.services.occupancy import rebuild_slot_occupancy_command, check_slot_occupancy_command
+    app.cli.add_command(rebuild_slot_occupancy_command)
+    app.cli.add_command(check_slot_occupancy_command)
+    from app.shop_calendar import rebuild_slot_keys_command
+    app.cli.add_command(rebuild_slot_keys_command)
     
-    # Create tables
+    # Configure connections, attach the archive database and bring the schema up to date
     with app.app_context():
-        db.create_all()
+        from app.database import configure_sqlite
+        from app.services.archive import init_archive
+        from app.migrations import ensure_schema
+        from app.services.jobs import init_jobs
+        from app.factories import init_factories
+        configure_sqlite(app)
+        init_archive(app)
+        ensure_schema()
+        init_factories(app)
+        init_jobs(app)
     
-    return app
\ No newline at end of file
+    return app
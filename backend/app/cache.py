@@ -0,0 +1,116 @@
+from app import db
+from app.factories import current_factory
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import text
+import threading
+
+
+def current_generations(names):
+    """Generation of each name, read in one query (0 for names never written)"""
+    names = list(names)
+    params = {f'name_{i}': name for i, name in enumerate(names)}
+    rows = db.session.execute(text(
+        f"SELECT name, generation FROM cache_generations WHERE name IN ({', '.join(':' + p for p in params)})"
+    ), params).all() if names else []
+    found = dict(rows)
+    return tuple(found.get(name, 0) for name in names)
+
+
+class GenerationCache:
+    """Bounded LRU cache whose entries are tied to cache generations.
+
+    Each entry stores the generations of the data sets it was computed from
+    (see CacheGeneration). A lookup re-reads those generations, which is one
+    small indexed query, and recomputes the value when any has changed.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, depends_on, compute):
+        generations = current_generations(depends_on)
+        found, value = self.lookup(key, generations)
+        if found:
+            return value
+        value = compute()
+        self.store(key, generations, value)
+        return value
+
+    def lookup(self, key, generations):
+        """(True, value) when `key` was computed from exactly these generations.
+
+        With lookup and store, callers checking many keys can read the
+        generations for all of them in one query.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generations:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def store(self, key, generations, value):
+        with self._lock:
+            self._entries[key] = (generations, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+def get_cache(name, max_entries=None):
+    """Return the current factory's named cache, creating it on first use
+    (with max_entries, default CACHE_MAX_ENTRIES).
+
+    Every factory has its own cache_generations table, so caches are never
+    shared between factories (the default factory's are keyed by name alone).
+    """
+    caches = current_app.extensions.setdefault('caches', {})
+    factory = current_factory()
+    key = name if factory == current_app.config['DEFAULT_FACTORY'] else (factory, name)
+    cache = caches.get(key)
+    if cache is None:
+        cache = caches.setdefault(key, GenerationCache(max_entries or current_app.config['CACHE_MAX_ENTRIES']))
+    return cache
+
+
+def cache_stats():
+    """Entries, hits and misses of every cache of the current factory"""
+    factory = current_factory()
+    default = factory == current_app.config['DEFAULT_FACTORY']
+    stats = {}
+    for key, cache in list(current_app.extensions.get('caches', {}).items()):
+        if default and isinstance(key, str):
+            stats[key] = cache.stats()
+        elif not default and isinstance(key, tuple) and key[0] == factory:
+            stats[key[1]] = cache.stats()
+    return stats
+
+
+def cached_response(cache, key, depends_on, compute):
+    """JSON response whose encoded body is cached.
+
+    compute() returns the JSON-serializable value. A hit reads the
+    generations and returns the stored bytes without querying or encoding.
+    """
+    body = cache.get_or_compute(key, depends_on, lambda: current_app.json.response(compute()).get_data())
+    return current_app.response_class(body, mimetype=current_app.json.mimetype)
@@ -0,0 +1,34 @@
+from app import db
+from flask import jsonify
+from sqlalchemy import event
+
+
+def configure_sqlite(app, engine=None):
+    """Apply per-connection SQLite settings to every new connection of an
+    engine (default: the app's default engine).
+
+    Must be called inside an app context before the first connection is made.
+    """
+    journal_mode = app.config['SQLITE_JOURNAL_MODE']
+    busy_timeout = int(app.config['SQLITE_BUSY_TIMEOUT_MS'])
+
+    @event.listens_for(engine or db.engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+        if journal_mode:
+            cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+            if journal_mode.upper() == 'WAL':
+                # Safe with WAL: a power loss can only drop the last commits, never corrupt
+                cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.close()
+
+
+def handle_integrity_error(error):
+    """Writes into a finalized range are aborted by the lock triggers; report them as conflicts"""
+    from app.models.schedule_lock import is_lock_violation, LOCKED_MESSAGE
+
+    db.session.rollback()
+    if is_lock_violation(error):
+        return jsonify({"error": f"{LOCKED_MESSAGE}. Remove the lock before changing finalized schedules"}), 409
+    raise error
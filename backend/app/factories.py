@@ -0,0 +1,163 @@
+"""
+Factory shards.
+
+Each factory keeps its schedules in its own SQLite database and archive, so
+one factory's write load or a damaged file never reaches the others.
+Factories are configured as FACTORIES = {name: database path}; the default
+database (SQLALCHEMY_DATABASE_URI) is the factory named DEFAULT_FACTORY.
+
+A request selects its factory with the X-Factory header or a /factory/<name>/
+path prefix. Every statement of that request's session (ORM and text()) then
+runs on the factory's engine, and in-process caches are kept per factory.
+`fan_out` runs a function on every factory in parallel threads.
+
+This module must not import `app` at load time: the session class is needed
+before `db` exists.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context, jsonify, request
+from flask_sqlalchemy.session import Session
+import os
+
+FACTORY_HEADER = 'X-Factory'
+PATH_PREFIX = '/factory/'
+
+
+def bind_key(name):
+    """Flask-SQLAlchemy bind key of a factory's engine"""
+    return f'factory:{name}'
+
+
+def archive_path(database_path):
+    """A factory's archive sits next to its database: north.db -> north_archive.db"""
+    stem, _ = os.path.splitext(database_path)
+    return f'{stem}_archive.db'
+
+
+def factory_binds(config):
+    """SQLALCHEMY_BINDS entries for the configured factories"""
+    return {bind_key(name): f'sqlite:///{path}' for name, path in config['FACTORIES'].items()}
+
+
+def drop_factory_metadata(app):
+    """Remove the empty MetaData that db.init_app registers for each factory bind.
+
+    Factory engines use the default metadata through FactorySession. A
+    per-bind MetaData would stay on the module-level `db` after this app is
+    gone, and db.create_all()/drop_all() in a later app without those binds
+    would fail partway through.
+    """
+    metadatas = app.extensions['sqlalchemy'].metadatas
+    for name in app.config['FACTORIES']:
+        metadatas.pop(bind_key(name), None)
+
+
+def factory_names(app=None):
+    """The default factory first, then the configured ones"""
+    config = (app or current_app).config
+    return [config['DEFAULT_FACTORY']] + list(config['FACTORIES'])
+
+
+def current_factory():
+    """Name of the factory the current session runs on"""
+    factory = g.get('factory') if has_app_context() else None
+    return factory or current_app.config['DEFAULT_FACTORY']
+
+
+def _set_factory(name):
+    # g.factory stays unset for the default factory, so its path is unchanged
+    g.factory = None if name == current_app.config['DEFAULT_FACTORY'] else name
+
+
+class FactorySession(Session):
+    """Session that runs every statement on the current factory's engine"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            factory = g.get('factory')
+            if factory is not None:
+                return self._db.engines[bind_key(factory)]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def factory_context(app, name):
+    """A new app context (and so a new session) on the given factory"""
+    with app.app_context():
+        _set_factory(name)
+        yield
+
+
+def fan_out(function, *args):
+    """Run function(*args) on every factory in parallel threads.
+
+    Returns ({factory: result}, {factory: error message}). A failing factory
+    is reported in the errors and does not stop the others.
+    """
+    app = current_app._get_current_object()
+    names = factory_names(app)
+
+    def run(name):
+        with factory_context(app, name):
+            return function(*args)
+
+    results, errors = {}, {}
+    threads = app.config['FACTORY_THREADS'] or len(names)
+    with ThreadPoolExecutor(max_workers=min(threads, len(names)), thread_name_prefix='factory') as executor:
+        futures = {name: executor.submit(run, name) for name in names}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                app.logger.exception("Factory %s failed", name)
+                errors[name] = str(e)
+    return results, errors
+
+
+class FactoryPathPrefix:
+    """WSGI middleware serving /factory/<name>/<path> as /<path> with X-Factory: <name>"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path.startswith(PATH_PREFIX):
+            name, _, rest = path[len(PATH_PREFIX):].partition('/')
+            environ['HTTP_X_FACTORY'] = name
+            environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + PATH_PREFIX + name
+            environ['PATH_INFO'] = '/' + rest
+        return self.wsgi_app(environ, start_response)
+
+
+def select_factory():
+    """Before each request: switch the session to the requested factory"""
+    name = request.headers.get(FACTORY_HEADER)
+    if not name:
+        return None
+    if name not in factory_names():
+        return jsonify({"error": f"Unknown factory: {name}"}), 404
+    _set_factory(name)
+    return None
+
+
+def init_factories(app):
+    """Set up every factory's engine like the default one and bring its schema up to date.
+
+    Must be called inside an app context at startup.
+    """
+    from app.database import configure_sqlite
+    from app.services.archive import init_archive
+    from app.migrations import ensure_schema
+
+    engines = app.extensions['sqlalchemy'].engines
+    for name, path in app.config['FACTORIES'].items():
+        engine = engines[bind_key(name)]
+        configure_sqlite(app, engine)
+        init_archive(app, engine, archive_path(path))
+        ensure_schema(engine)
+
+    app.before_request(select_factory)
+    app.wsgi_app = FactoryPathPrefix(app.wsgi_app)
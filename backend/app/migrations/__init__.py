@@ -0,0 +1,88 @@
+"""
+Schema versioning.
+
+The schema version lives in a one-row `schema_version` table. On startup
+`ensure_schema` reads it once; when it matches the latest migration nothing
+else happens, so a normal boot does no reflection and no DDL.
+
+- Fresh database: tables are created from the models and stamped with the
+  latest version.
+- Database from before versioning existed: treated as version 1 (baseline)
+  and upgraded from there.
+- Older version: each newer migration runs in order, in one transaction.
+
+To change the schema, update the models and add a module here with the next
+version number and an `upgrade(connection)` function, then list it in
+MIGRATIONS.
+"""
+
+from app import db
+from app.migrations import v001_baseline, v002_jobs, v003_slot_occupancy, v004_dashboard, v005_slot_key, v006_schedule_indexes, v007_machine_downtimes, v008_part_generations, v009_schedule_locks, v010_day_generations, v011_machine_generations, v012_schedule_id_autoincrement
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+MIGRATIONS = [
+    v001_baseline,
+    v002_jobs,
+    v003_slot_occupancy,
+    v004_dashboard,
+    v005_slot_key,
+    v006_schedule_indexes,
+    v007_machine_downtimes,
+    v008_part_generations,
+    v009_schedule_locks,
+    v010_day_generations,
+    v011_machine_generations,
+    v012_schedule_id_autoincrement,
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def read_version(connection):
+    """Return the stored schema version, or None when the table does not exist"""
+    try:
+        return connection.execute(text("SELECT version FROM schema_version")).scalar()
+    except OperationalError:
+        return None
+
+
+def _stamp(connection, version):
+    connection.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+    connection.execute(text("DELETE FROM schema_version"))
+    connection.execute(text("INSERT INTO schema_version (version) VALUES (:version)"), {"version": version})
+
+
+def ensure_schema(engine=None):
+    """Bring a database (default: the app's default engine) to the latest schema
+    version. Must run inside an app context."""
+    engine = engine or db.engine
+    with engine.connect() as connection:
+        version = read_version(connection)
+    if version == LATEST_VERSION:
+        return version
+
+    with engine.begin() as connection:
+        # Re-read inside the write transaction in case another worker got here first
+        version = read_version(connection)
+        if version == LATEST_VERSION:
+            return version
+
+        if version is None:
+            has_tables = connection.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'production_schedules'"
+            )).scalar()
+            if not has_tables:
+                import app.models  # noqa: F401 - register every table on db.metadata
+                db.metadata.create_all(connection)
+                _stamp(connection, LATEST_VERSION)
+                return LATEST_VERSION
+            version = v001_baseline.version
+
+        for migration in MIGRATIONS:
+            if migration.version > version:
+                migration.upgrade(connection)
+                version = migration.version
+        _stamp(connection, version)
+
+    return version
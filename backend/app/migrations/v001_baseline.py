@@ -0,0 +1,7 @@
+"""Baseline: the schema as created by db.create_all() before versioning existed"""
+
+version = 1
+
+
+def upgrade(connection):
+    pass
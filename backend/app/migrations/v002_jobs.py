@@ -0,0 +1,9 @@
+"""Background jobs table"""
+
+from app.models.job import Job
+
+version = 2
+
+
+def upgrade(connection):
+    Job.__table__.create(connection, checkfirst=True)
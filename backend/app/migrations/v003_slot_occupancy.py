@@ -0,0 +1,13 @@
+"""Per-slot occupancy counts maintained by triggers"""
+
+from app.models.slot_occupancy import SlotOccupancy, create_occupancy_triggers
+from app.services.occupancy import REBUILD_SQL
+from sqlalchemy import text
+
+version = 3
+
+
+def upgrade(connection):
+    SlotOccupancy.__table__.create(connection, checkfirst=True)
+    create_occupancy_triggers(connection)
+    connection.execute(text(REBUILD_SQL))
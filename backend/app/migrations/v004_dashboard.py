@@ -0,0 +1,17 @@
+"""Cache generations for the dashboard and the indexes its tiles read"""
+
+from app.models.cache_generation import CacheGeneration, create_generation_triggers
+from sqlalchemy import text
+
+version = 4
+
+
+def upgrade(connection):
+    CacheGeneration.__table__.create(connection, checkfirst=True)
+    create_generation_triggers(connection)
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_schedule_status_date ON production_schedules (status, date)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_slot_occupancy_date ON slot_occupancy (date, machine_id)"
+    ))
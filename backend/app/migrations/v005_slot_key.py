@@ -0,0 +1,18 @@
+"""Integer slot key on production schedules"""
+
+from app.shop_calendar import get_calendar
+from sqlalchemy import text
+
+version = 5
+
+
+def upgrade(connection):
+    columns = [row[1] for row in connection.execute(text("PRAGMA table_info(production_schedules)"))]
+    if 'slot_key' not in columns:
+        connection.execute(text("ALTER TABLE production_schedules ADD COLUMN slot_key INTEGER"))
+    connection.execute(text(
+        f"UPDATE production_schedules SET slot_key = {get_calendar().slot_key_sql()}"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_schedule_machine_slot_key ON production_schedules (machine_id, slot_key)"
+    ))
@@ -0,0 +1,23 @@
+"""Curated production_schedules indexes for the hot queries"""
+
+from sqlalchemy import text
+
+version = 6
+
+CREATE = [
+    "CREATE INDEX IF NOT EXISTS idx_schedule_machine_slot ON production_schedules (machine_id, date, shift_number, slot_number)",
+    "CREATE INDEX IF NOT EXISTS idx_schedule_part_date ON production_schedules (part_id, date)",
+    "CREATE INDEX IF NOT EXISTS idx_schedule_sub_batch ON production_schedules (sub_batch_id, operation_id)",
+]
+
+# Replaced by the indexes above (same leading columns)
+DROP = [
+    "DROP INDEX IF EXISTS idx_schedule_machine_date",
+    "DROP INDEX IF EXISTS idx_schedule_part_operation",
+]
+
+
+def upgrade(connection):
+    for statement in CREATE + DROP:
+        connection.execute(text(statement))
+    connection.execute(text("ANALYZE production_schedules"))
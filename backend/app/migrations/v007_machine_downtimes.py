@@ -0,0 +1,9 @@
+"""Machine downtime windows"""
+
+from app.models.machine_downtime import MachineDowntime
+
+version = 7
+
+
+def upgrade(connection):
+    MachineDowntime.__table__.create(connection, checkfirst=True)
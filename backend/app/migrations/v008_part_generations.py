@@ -0,0 +1,9 @@
+"""Per-part and eligibility cache generations"""
+
+from app.models.cache_generation import recreate_generation_triggers
+
+version = 8
+
+
+def upgrade(connection):
+    recreate_generation_triggers(connection)
@@ -0,0 +1,10 @@
+"""Finalized schedule ranges and the triggers that lock them"""
+
+from app.models.schedule_lock import ScheduleLock, create_lock_triggers
+
+version = 9
+
+
+def upgrade(connection):
+    ScheduleLock.__table__.create(connection, checkfirst=True)
+    create_lock_triggers(connection)
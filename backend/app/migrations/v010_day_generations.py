@@ -0,0 +1,9 @@
+"""Per-day schedule cache generations"""
+
+from app.models.cache_generation import recreate_generation_triggers
+
+version = 10
+
+
+def upgrade(connection):
+    recreate_generation_triggers(connection)
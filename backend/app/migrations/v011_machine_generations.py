@@ -0,0 +1,9 @@
+"""Per-machine schedule cache generations"""
+
+from app.models.cache_generation import recreate_generation_triggers
+
+version = 11
+
+
+def upgrade(connection):
+    recreate_generation_triggers(connection)
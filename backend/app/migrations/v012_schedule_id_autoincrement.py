@@ -0,0 +1,43 @@
+"""Never reuse production schedule ids.
+
+Without AUTOINCREMENT SQLite hands out max(schedule_id) + 1, so once the
+newest row is deleted or archived its id is issued again and collides with
+the archived copy. SQLite cannot add AUTOINCREMENT to an existing table, so
+the table is rebuilt and its indexes and triggers are recreated from their
+stored SQL.
+"""
+
+from app.models.production_schedule import ProductionSchedule
+from sqlalchemy import text
+from sqlalchemy.schema import CreateTable
+
+version = 12
+
+
+def upgrade(connection):
+    schema = connection.execute(text(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = 'production_schedules' "
+        "AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+    )).scalars().all()
+    columns = ', '.join(column.name for column in ProductionSchedule.__table__.columns)
+
+    connection.execute(text(f"CREATE TEMP TABLE production_schedules_copy AS SELECT {columns} FROM production_schedules"))
+    connection.execute(text("DROP TABLE production_schedules"))
+    connection.execute(CreateTable(ProductionSchedule.__table__))
+    connection.execute(text(
+        f"INSERT INTO production_schedules ({columns}) SELECT {columns} FROM production_schedules_copy"
+    ))
+    connection.execute(text("DROP TABLE production_schedules_copy"))
+    for statement in schema:
+        connection.execute(text(statement))
+
+    # Start above every id already handed out, archived ones included
+    highest = connection.execute(text("SELECT MAX(schedule_id) FROM production_schedules")).scalar() or 0
+    databases = [row[1] for row in connection.execute(text("PRAGMA database_list"))]
+    if 'archive' in databases:
+        archived = connection.execute(text("SELECT MAX(schedule_id) FROM archive.production_schedules")).scalar()
+        highest = max(highest, archived or 0)
+    connection.execute(text("DELETE FROM sqlite_sequence WHERE name = 'production_schedules'"))
+    connection.execute(text(
+        "INSERT INTO sqlite_sequence (name, seq) VALUES ('production_schedules', :seq)"
+    ), {'seq': highest})
@@ -6,6 +6,11 @@ from app.models.operation_machine import OperationMachine
 from app.models.monthly_plan import MonthlyPlan
 from app.models.forecast_plan import ForecastPlan
 from app.models.production_schedule import ProductionSchedule
+from app.models.job import Job
+from app.models.slot_occupancy import SlotOccupancy
+from app.models.cache_generation import CacheGeneration
+from app.models.machine_downtime import MachineDowntime
+from app.models.schedule_lock import ScheduleLock
 
 __all__ = [
     'Company',
@@ -15,5 +20,10 @@ __all__ = [
     'OperationMachine',
     'MonthlyPlan',
     'ForecastPlan',
-    'ProductionSchedule'
+    'ProductionSchedule',
+    'Job',
+    'SlotOccupancy',
+    'CacheGeneration',
+    'MachineDowntime',
+    'ScheduleLock'
 ]
\ No newline at end of file
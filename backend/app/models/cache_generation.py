@@ -0,0 +1,72 @@
+from app import db
+from sqlalchemy import event, text
+
+class CacheGeneration(db.Model):
+    """Change counter per cached data set.
+
+    SQLite triggers bump the generation of every name a write touches, in the
+    same transaction as the write. In-process caches remember the generations
+    a value was computed from and recompute it once any of them has moved, so
+    every server worker sees writes made by the others.
+    """
+    __tablename__ = 'cache_generations'
+    
+    name = db.Column(db.String(100), primary_key=True)
+    generation = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<CacheGeneration {self.name} - {self.generation}>'
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'generation': self.generation
+        }
+
+# Generation names bumped by writes to each table, as SQL expressions over
+# the written row ({row} is NEW or OLD)
+GENERATION_SOURCES = {
+    'production_schedules': [
+        "'schedules'", "'part:' || {row}.part_id", "'day:' || {row}.date", "'machine:' || {row}.machine_id"
+    ],
+    'monthly_plans': ["'plans'", "'part:' || {row}.part_id"],
+    'forecast_plans': ["'forecasts'"],
+    'machines': ["'machines'"],
+    'operations': ["'operations'", "'part:' || {row}.part_id"],
+    'operation_machines': ["'eligibility'"],
+}
+
+TRIGGER_EVENTS = [('insert', ['NEW']), ('update', ['OLD', 'NEW']), ('delete', ['OLD'])]
+
+def _bump(name):
+    return (
+        f"INSERT INTO cache_generations (name, generation) VALUES ({name}, 1) "
+        f"ON CONFLICT (name) DO UPDATE SET generation = generation + 1;"
+    )
+
+def generation_triggers():
+    statements = []
+    for table, names in GENERATION_SOURCES.items():
+        for event_name, rows in TRIGGER_EVENTS:
+            body = ' '.join(_bump(name.format(row=row)) for name in names for row in rows)
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS trg_generation_{table}_{event_name} "
+                f"AFTER {event_name.upper()} ON {table} BEGIN {body} END"
+            )
+    return statements
+
+def create_generation_triggers(connection):
+    for statement in generation_triggers():
+        connection.execute(text(statement))
+
+def recreate_generation_triggers(connection):
+    """Replace existing triggers after GENERATION_SOURCES changed (they are created IF NOT EXISTS)"""
+    for table in GENERATION_SOURCES:
+        for event_name, _ in TRIGGER_EVENTS:
+            connection.execute(text(f"DROP TRIGGER IF EXISTS trg_generation_{table}_{event_name}"))
+    create_generation_triggers(connection)
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_generation_triggers(target, connection, **kw):
+    # Tables created from the models (fresh database, tests) get the triggers too
+    create_generation_triggers(connection)
@@ -0,0 +1,74 @@
+from app import db
+from app.shop_calendar import get_calendar
+from datetime import datetime
+from sqlalchemy import event
+
+class MachineDowntime(db.Model):
+    """A machine out of service from one slot to another (both inclusive)"""
+    __tablename__ = 'machine_downtimes'
+
+    downtime_id = db.Column(db.Integer, primary_key=True)
+    machine_id = db.Column(db.Integer, db.ForeignKey('machines.machine_id'), nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    start_shift = db.Column(db.Integer, nullable=False)
+    start_slot = db.Column(db.Integer, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    end_shift = db.Column(db.Integer, nullable=False)
+    end_slot = db.Column(db.Integer, nullable=False)
+    start_key = db.Column(db.Integer, nullable=False)  # slot keys, see app/shop_calendar.py
+    end_key = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_downtime_machine_start', 'machine_id', 'start_key'),
+    )
+
+    def __repr__(self):
+        return f'<MachineDowntime Machine:{self.machine_id} {self.start_date} S{self.start_shift}:{self.start_slot} - {self.end_date} S{self.end_shift}:{self.end_slot}>'
+
+    def to_dict(self):
+        return {
+            'downtime_id': self.downtime_id,
+            'machine_id': self.machine_id,
+            'start': {
+                'date': self.start_date.isoformat(),
+                'shift_number': self.start_shift,
+                'slot_number': self.start_slot
+            },
+            'end': {
+                'date': self.end_date.isoformat(),
+                'shift_number': self.end_shift,
+                'slot_number': self.end_slot
+            },
+            'start_key': self.start_key,
+            'end_key': self.end_key,
+            'reason': self.reason,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    @classmethod
+    def down_slots(cls, machine_ids, start_key, end_key):
+        """Set of (machine_id, slot_key) out of service with start_key <= slot_key <= end_key.
+
+        `machine_ids=None` covers every machine.
+        """
+        query = cls.query.filter(cls.start_key <= end_key, cls.end_key >= start_key)
+        if machine_ids is not None:
+            if not machine_ids:
+                return set()
+            query = query.filter(cls.machine_id.in_(machine_ids))
+        downtimes = query.all()
+        return {
+            (downtime.machine_id, key)
+            for downtime in downtimes
+            for key in range(max(downtime.start_key, start_key), min(downtime.end_key, end_key) + 1)
+        }
+
+
+@event.listens_for(MachineDowntime, 'before_insert')
+@event.listens_for(MachineDowntime, 'before_update')
+def _set_slot_keys(mapper, connection, target):
+    calendar = get_calendar()
+    target.start_key = calendar.slot_key(target.start_date, target.start_shift, target.start_slot)
+    target.end_key = calendar.slot_key(target.end_date, target.end_shift, target.end_slot)
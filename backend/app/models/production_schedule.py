@@ -1,5 +1,7 @@
 from app import db
+from app.shop_calendar import get_calendar
 from datetime import datetime
+from sqlalchemy import event
 
 class ProductionSchedule(db.Model):
     __tablename__ = 'production_schedules'
@@ -14,12 +16,24 @@ class ProductionSchedule(db.Model):
     quantity_scheduled = db.Column(db.Integer, nullable=False)
     sub_batch_id = db.Column(db.String(50), nullable=True)  # For tracking sub-batches
     status = db.Column(db.String(50), nullable=False, default='planned')  # planned, in_progress, completed, delayed
+    slot_key = db.Column(db.Integer, nullable=True)  # (date, shift, slot) as one integer, see app/shop_calendar.py
     
-    # Add constraints and indexes
+    # Add constraints and indexes (each one backs a hot query; see test_query_plans.py)
     __table_args__ = (
+        # Slot conflict checks; its (machine_id, date) prefix serves per-machine lookups
+        db.Index('idx_schedule_machine_slot', 'machine_id', 'date', 'shift_number', 'slot_number'),
+        # Per-date schedules and conflicts, month and week ranges
         db.Index('idx_schedule_date_shift_slot', 'date', 'shift_number', 'slot_number'),
-        db.Index('idx_schedule_part_operation', 'part_id', 'operation_id'),
-        db.Index('idx_schedule_machine_date', 'machine_id', 'date'),
+        # Per-part schedules and a part's month (re-planning)
+        db.Index('idx_schedule_part_date', 'part_id', 'date'),
+        # Sub-batch tracking
+        db.Index('idx_schedule_sub_batch', 'sub_batch_id', 'operation_id'),
+        # Delayed and overdue operations
+        db.Index('idx_schedule_status_date', 'status', 'date'),
+        # Slot-key ranges per machine
+        db.Index('idx_schedule_machine_slot_key', 'machine_id', 'slot_key'),
+        # Ids are never reused, so a new row cannot collide with an archived one
+        {'sqlite_autoincrement': True},
     )
     
     def __repr__(self):
@@ -36,14 +50,35 @@ class ProductionSchedule(db.Model):
             'machine_id': self.machine_id,
             'quantity_scheduled': self.quantity_scheduled,
             'sub_batch_id': self.sub_batch_id,
-            'status': self.status
+            'status': self.status,
+            'slot_key': self.slot_key
         }
     
+    @classmethod
+    def rows(cls, query):
+        """Dicts shaped like to_dict() for every schedule a query matches.
+
+        Reads plain column tuples instead of loading ORM objects and leaves
+        dates as date objects for the JSON provider to encode.
+        """
+        columns = cls.__table__.columns
+        keys = [column.key for column in columns]
+        return [dict(zip(keys, row)) for row in query.with_entities(*columns).all()]
+    
     @classmethod
     def get_machine_schedule(cls, machine_id, date):
         """Get all schedules for a specific machine on a specific date"""
         return cls.query.filter_by(machine_id=machine_id, date=date).all()
     
+    @classmethod
+    def get_machine_slot_range(cls, machine_id, start_key, end_key):
+        """Schedules on a machine with start_key <= slot_key < end_key, in slot order"""
+        return cls.query.filter(
+            cls.machine_id == machine_id,
+            cls.slot_key >= start_key,
+            cls.slot_key < end_key
+        ).order_by(cls.slot_key).all()
+    
     @classmethod
     def check_slot_availability(cls, machine_id, date, shift_number, slot_number):
         """Check if a specific slot is available for a machine"""
@@ -179,4 +214,11 @@ class ProductionSchedule(db.Model):
                 
                 conflicts.append(conflict_info)
         
-        return conflicts
\ No newline at end of file
+        return conflicts
+
+
+@event.listens_for(ProductionSchedule, 'before_insert')
+@event.listens_for(ProductionSchedule, 'before_update')
+def _set_slot_key(mapper, connection, target):
+    # Bulk inserts and set-based updates bypass this and set slot_key themselves
+    target.slot_key = get_calendar().slot_key(target.date, target.shift_number, target.slot_number)
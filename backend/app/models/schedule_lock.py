@@ -0,0 +1,85 @@
+from app import db
+from datetime import datetime, timedelta
+from sqlalchemy import event, text
+
+# Message raised by the lock triggers; routes turn it into a 409
+LOCKED_MESSAGE = 'Schedule range is locked'
+
+class ScheduleLock(db.Model):
+    """A finalized date range (both ends inclusive) whose schedules may no longer be changed.
+
+    Enforced by SQLite triggers on production_schedules, so every write path
+    (ORM, set-based shifts, re-planning) is covered. Status changes are still
+    allowed, and completed rows can be deleted so archiving keeps working.
+    """
+    __tablename__ = 'schedule_locks'
+
+    lock_id = db.Column(db.Integer, primary_key=True)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    locked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_schedule_lock_start', 'start_date', 'end_date'),
+    )
+
+    def __repr__(self):
+        return f'<ScheduleLock {self.start_date} - {self.end_date}>'
+
+    def to_dict(self):
+        return {
+            'lock_id': self.lock_id,
+            'from': self.start_date.isoformat(),
+            'to': self.end_date.isoformat(),
+            'locked_at': self.locked_at.isoformat() if self.locked_at else None
+        }
+
+    @classmethod
+    def covering(cls, day):
+        """Locks that include the given day"""
+        return cls.query.filter(cls.start_date <= day, cls.end_date >= day).all()
+
+    @classmethod
+    def locked_days(cls, start_date, end_date):
+        """Set of locked days between start_date and end_date (inclusive)"""
+        days = set()
+        for lock in cls.query.filter(cls.start_date <= end_date, cls.end_date >= start_date).all():
+            day = max(lock.start_date, start_date)
+            while day <= min(lock.end_date, end_date):
+                days.add(day)
+                day += timedelta(days=1)
+        return days
+
+
+def is_lock_violation(error):
+    """True when a database error was raised by one of the lock triggers"""
+    return LOCKED_MESSAGE in str(getattr(error, 'orig', error))
+
+
+_LOCKED = "EXISTS (SELECT 1 FROM schedule_locks WHERE start_date <= {row}.date AND end_date >= {row}.date)"
+_ABORT = f"SELECT RAISE(ABORT, '{LOCKED_MESSAGE}');"
+
+# Columns that define what was planned; status is tracked on the shop floor and stays writable
+_PLAN_COLUMNS = ['date', 'shift_number', 'slot_number', 'machine_id', 'part_id', 'operation_id',
+                 'quantity_scheduled', 'sub_batch_id']
+_PLAN_CHANGED = ' OR '.join(f"OLD.{column} IS NOT NEW.{column}" for column in _PLAN_COLUMNS)
+
+LOCK_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS trg_schedule_lock_insert BEFORE INSERT ON production_schedules "
+    f"WHEN {_LOCKED.format(row='NEW')} BEGIN {_ABORT} END",
+    f"CREATE TRIGGER IF NOT EXISTS trg_schedule_lock_update "
+    f"BEFORE UPDATE OF {', '.join(_PLAN_COLUMNS)} ON production_schedules "
+    f"WHEN ({_PLAN_CHANGED}) AND ({_LOCKED.format(row='OLD')} OR {_LOCKED.format(row='NEW')}) "
+    f"BEGIN {_ABORT} END",
+    f"CREATE TRIGGER IF NOT EXISTS trg_schedule_lock_delete BEFORE DELETE ON production_schedules "
+    f"WHEN OLD.status != 'completed' AND {_LOCKED.format(row='OLD')} BEGIN {_ABORT} END",
+]
+
+def create_lock_triggers(connection):
+    for statement in LOCK_TRIGGERS:
+        connection.execute(text(statement))
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_lock_triggers(target, connection, **kw):
+    # Tables created from the models (fresh database, tests) get the triggers too
+    create_lock_triggers(connection)
@@ -0,0 +1,69 @@
+from app import db
+from sqlalchemy import event, text
+
+class SlotOccupancy(db.Model):
+    """Number of production schedules booked into each machine slot.
+
+    Maintained by SQLite triggers on production_schedules in the same
+    transaction as every insert, update and delete, so a count above 1 is a
+    double-booked slot. Only occupied slots have a row.
+    """
+    __tablename__ = 'slot_occupancy'
+    
+    machine_id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    shift_number = db.Column(db.Integer, primary_key=True)
+    slot_number = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False)
+    
+    # Conflict totals and heatmaps only read double-booked slots
+    __table_args__ = (
+        db.Index('idx_slot_occupancy_date', 'date', 'machine_id'),
+        db.Index('idx_slot_occupancy_conflicts', 'date', 'machine_id', sqlite_where=text('count > 1')),
+    )
+    
+    def __repr__(self):
+        return f'<SlotOccupancy Machine:{self.machine_id} - {self.date} S{self.shift_number}:{self.slot_number} x{self.count}>'
+    
+    def to_dict(self):
+        return {
+            'machine_id': self.machine_id,
+            'date': self.date.isoformat() if self.date else None,
+            'shift_number': self.shift_number,
+            'slot_number': self.slot_number,
+            'count': self.count
+        }
+
+_SLOT_MATCH = "machine_id = {row}.machine_id AND date = {row}.date AND shift_number = {row}.shift_number AND slot_number = {row}.slot_number"
+
+_ADD = (
+    "INSERT INTO slot_occupancy (machine_id, date, shift_number, slot_number, count) "
+    "VALUES (NEW.machine_id, NEW.date, NEW.shift_number, NEW.slot_number, 1) "
+    "ON CONFLICT (machine_id, date, shift_number, slot_number) DO UPDATE SET count = count + 1;"
+)
+
+_REMOVE = (
+    f"UPDATE slot_occupancy SET count = count - 1 WHERE {_SLOT_MATCH.format(row='OLD')}; "
+    f"DELETE FROM slot_occupancy WHERE {_SLOT_MATCH.format(row='OLD')} AND count <= 0;"
+)
+
+OCCUPANCY_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS trg_slot_occupancy_insert AFTER INSERT ON production_schedules "
+    f"BEGIN {_ADD} END",
+    f"CREATE TRIGGER IF NOT EXISTS trg_slot_occupancy_delete AFTER DELETE ON production_schedules "
+    f"BEGIN {_REMOVE} END",
+    f"CREATE TRIGGER IF NOT EXISTS trg_slot_occupancy_update "
+    f"AFTER UPDATE OF machine_id, date, shift_number, slot_number ON production_schedules "
+    f"WHEN OLD.machine_id IS NOT NEW.machine_id OR OLD.date IS NOT NEW.date "
+    f"OR OLD.shift_number IS NOT NEW.shift_number OR OLD.slot_number IS NOT NEW.slot_number "
+    f"BEGIN {_REMOVE} {_ADD} END",
+]
+
+def create_occupancy_triggers(connection):
+    for statement in OCCUPANCY_TRIGGERS:
+        connection.execute(text(statement))
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_occupancy_triggers(target, connection, **kw):
+    # Tables created from the models (fresh database, tests) get the triggers too
+    create_occupancy_triggers(connection)
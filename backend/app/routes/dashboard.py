@@ -0,0 +1,21 @@
+from flask import Blueprint, request, jsonify
+from app.services.dashboard import dashboard_summary
+
+dashboard_bp = Blueprint("dashboard", __name__)
+
+# Dashboard
+@dashboard_bp.route("/dashboard", methods=["GET"])
+def get_dashboard():
+    """Utilization, delays, forecast vs actual and conflicts in one response"""
+    from datetime import datetime, date
+    
+    date_param = request.args.get('date')
+    if date_param:
+        try:
+            day = datetime.fromisoformat(date_param).date()
+        except ValueError:
+            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    else:
+        day = date.today()
+    
+    return jsonify(dashboard_summary(day))
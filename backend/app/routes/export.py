@@ -0,0 +1,33 @@
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+
+export_bp = Blueprint("export", __name__)
+
+@export_bp.route("/export/snapshot", methods=["GET"])
+def export_snapshot():
+    """Stream the schedule, joined with operation times and machine type, as a columnar file"""
+    from datetime import datetime
+    from app.services.snapshot import FORMATS, available, stream_snapshot, snapshot_filename  # NumPy is only loaded when needed
+    
+    fmt = request.args.get("format", "arrow")
+    if fmt not in FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(FORMATS)}"}), 400
+    
+    dates = {}
+    for param in ["from", "to"]:
+        value = request.args.get(param)
+        if value:
+            try:
+                dates[param] = datetime.fromisoformat(value).date()
+            except ValueError:
+                return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    
+    if not available(fmt):
+        return jsonify({"error": f"The {fmt} format needs pyarrow, which is not installed. Use format=npz"}), 501
+    
+    chunks = stream_snapshot(fmt, dates.get("from"), dates.get("to"))
+    filename = snapshot_filename(fmt, dates.get("from"), dates.get("to"))
+    return Response(
+        stream_with_context(chunks),
+        mimetype=FORMATS[fmt][0],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
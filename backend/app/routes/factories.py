@@ -0,0 +1,41 @@
+from flask import Blueprint, request, jsonify, current_app
+from app.factories import factory_names
+from app.services.cross_factory import factory_utilization, factory_plan_vs_actual
+
+factories_bp = Blueprint("factories", __name__)
+
+def _date_param():
+    """The date query parameter (default today), or None when it is not a valid date"""
+    from datetime import datetime, date
+    
+    value = request.args.get('date')
+    if not value:
+        return date.today()
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        return None
+
+@factories_bp.route("/factories", methods=["GET"])
+def list_factories():
+    """Configured factories (select one with the X-Factory header or /factory/<name>/)"""
+    return jsonify({
+        "default": current_app.config['DEFAULT_FACTORY'],
+        "factories": factory_names()
+    })
+
+@factories_bp.route("/factories/utilization", methods=["GET"])
+def get_factory_utilization():
+    """Machine utilization for the week of `date` across every factory"""
+    day = _date_param()
+    if day is None:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    return jsonify(factory_utilization(day))
+
+@factories_bp.route("/factories/plan-vs-actual", methods=["GET"])
+def get_factory_plan_vs_actual():
+    """Forecast vs planned vs completed for the month of `date` across every factory"""
+    day = _date_param()
+    if day is None:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    return jsonify(factory_plan_vs_actual(day))
@@ -0,0 +1,44 @@
+from flask import Blueprint, request, jsonify
+from app.models.job import Job
+from app.services.jobs import JOBS, QueueFull, get_job_runner, refresh_job_state
+
+jobs_bp = Blueprint("jobs", __name__)
+
+# Background jobs
+@jobs_bp.route("/jobs", methods=["POST"])
+def submit_job():
+    """Queue a named job; poll GET /jobs/<id> for progress and result"""
+    data = request.get_json()
+    if not data or "name" not in data:
+        return jsonify({"error": "Missing required field: name"}), 400
+    
+    if data["name"] not in JOBS:
+        return jsonify({"error": f"Unknown job. Must be one of: {', '.join(sorted(JOBS))}"}), 400
+    
+    params = data.get("params", {})
+    if not isinstance(params, dict):
+        return jsonify({"error": "params must be an object"}), 400
+    
+    try:
+        job = get_job_runner().submit(data["name"], params)
+    except QueueFull:
+        return jsonify({"error": "Job queue is full, try again later"}), 503
+    
+    response = jsonify(job.to_dict())
+    response.headers["Location"] = f"/jobs/{job.job_id}"
+    return response, 202
+
+@jobs_bp.route("/jobs", methods=["GET"])
+def get_jobs():
+    query = Job.query
+    status = request.args.get('status')
+    if status:
+        query = query.filter_by(status=status)
+    limit = min(request.args.get('limit', default=50, type=int), 500)
+    jobs = query.order_by(Job.created_at.desc()).limit(limit).all()
+    return jsonify([refresh_job_state(job).to_dict() for job in jobs])
+
+@jobs_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = Job.query.get_or_404(job_id)
+    return jsonify(refresh_job_state(job).to_dict())
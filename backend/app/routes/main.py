@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app import db
 from app.models.company import Company
 from app.models.part import Part
@@ -8,6 +8,16 @@ from app.models.operation_machine import OperationMachine
 from app.models.monthly_plan import MonthlyPlan
 from app.models.forecast_plan import ForecastPlan
 from app.models.production_schedule import ProductionSchedule
+from app.models.machine_downtime import MachineDowntime
+from app.models.schedule_lock import ScheduleLock, LOCKED_MESSAGE
+from app.services.archive import get_schedule_history as schedule_history
+from app.services.replanning import compute_plan_diff, apply_plan_diff
+from app.services.eligibility import get_eligibility
+from app.services.occupancy import conflict_summary, conflict_heatmap
+from app.services.rescheduling import shift_schedules, reallocate_downtime
+from app.services.precedence import precedence_violations, sub_batch_violations
+from app.shop_calendar import get_calendar
+from app.cache import get_cache, cached_response, cache_stats
 
 main_bp = Blueprint("main", __name__)
 
@@ -47,6 +57,67 @@ def create_machine():
     db.session.commit()
     return jsonify(machine.to_dict()), 201
 
+@main_bp.route("/machines/<int:machine_id>/eligible-operations", methods=["GET"])
+def get_machine_eligible_operations(machine_id):
+    machine = Machine.query.get_or_404(machine_id)
+    operation_ids = get_eligibility().operations_for_machine(machine_id)
+    if not operation_ids:
+        return jsonify([])
+    operations = Operation.query.filter(Operation.operation_id.in_(operation_ids)).all()
+    return jsonify([operation.to_dict() for operation in operations])
+
+@main_bp.route("/machines/<int:machine_id>/downtime", methods=["GET"])
+def get_machine_downtime(machine_id):
+    machine = Machine.query.get_or_404(machine_id)
+    downtimes = MachineDowntime.query.filter_by(machine_id=machine_id).order_by(MachineDowntime.start_key).all()
+    return jsonify([downtime.to_dict() for downtime in downtimes])
+
+@main_bp.route("/machines/<int:machine_id>/downtime", methods=["POST"])
+def create_machine_downtime(machine_id):
+    """Record a breakdown and move the machine's planned work in the window to eligible alternates"""
+    from datetime import datetime
+
+    machine = Machine.query.get_or_404(machine_id)
+    data = request.get_json()
+    if not data or not all(key in data for key in ["start_date", "end_date"]):
+        return jsonify({"error": "Missing required fields: start_date, end_date"}), 400
+
+    try:
+        start_date = datetime.fromisoformat(data["start_date"]).date()
+        end_date = datetime.fromisoformat(data["end_date"]).date()
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+    # The window covers whole days unless start/end shifts and slots are given
+    calendar = get_calendar()
+    start_shift = data.get("start_shift", 1)
+    start_slot = data.get("start_slot", 1)
+    end_shift = data.get("end_shift", calendar.shifts_per_day)
+    end_slot = data.get("end_slot", calendar.slots_per_shift)
+    if not calendar.valid_shift(start_shift) or not calendar.valid_shift(end_shift):
+        return jsonify({"error": calendar.shift_error}), 400
+    if not calendar.valid_slot(start_slot) or not calendar.valid_slot(end_slot):
+        return jsonify({"error": calendar.slot_error}), 400
+    if calendar.slot_key(start_date, start_shift, start_slot) > calendar.slot_key(end_date, end_shift, end_slot):
+        return jsonify({"error": "Downtime must end after it starts"}), 400
+
+    downtime = MachineDowntime(
+        machine_id=machine_id,
+        start_date=start_date,
+        start_shift=start_shift,
+        start_slot=start_slot,
+        end_date=end_date,
+        end_shift=end_shift,
+        end_slot=end_slot,
+        reason=data.get("reason")
+    )
+    db.session.add(downtime)
+    db.session.flush()
+
+    report = reallocate_downtime(downtime, current_app.config['DOWNTIME_SEARCH_DAYS'])
+    db.session.commit()
+    return jsonify(report), 201
+
 # Part CRUD operations
 @main_bp.route("/parts", methods=["GET"])
 def get_parts():
@@ -183,13 +254,19 @@ def get_eligible_machines(operation_id):
     machines = operation.get_eligible_machines()
     return jsonify([machine.to_dict() for machine in machines])
 
+def _is_assigned(operation_id, machine_id):
+    # Read from the table, not the in-process matrix, which another worker may have outdated
+    return db.session.query(
+        OperationMachine.query.filter_by(operation_id=operation_id, machine_id=machine_id).exists()
+    ).scalar()
+
 @main_bp.route("/operations/<int:operation_id>/machines/<int:machine_id>", methods=["POST"])
 def assign_machine_to_operation(operation_id, machine_id):
     operation = Operation.query.get_or_404(operation_id)
     machine = Machine.query.get_or_404(machine_id)
     
     # Check if already assigned
-    if machine in operation.eligible_machines:
+    if _is_assigned(operation_id, machine_id):
         return jsonify({"message": "Machine already assigned to operation"}), 200
     
     # Add machine to operation
@@ -203,7 +280,7 @@ def remove_machine_from_operation(operation_id, machine_id):
     machine = Machine.query.get_or_404(machine_id)
     
     # Check if assigned
-    if machine not in operation.eligible_machines:
+    if not _is_assigned(operation_id, machine_id):
         return jsonify({"error": "Machine not assigned to operation"}), 404
     
     # Remove machine from operation
@@ -259,8 +336,20 @@ def create_monthly_plan():
     )
     
     db.session.add(plan)
+    
+    # Reconcile existing schedules with the new quantity in the same transaction
+    reconciliation = None
+    if existing_plan and data.get("reconcile", True):
+        db.session.flush()
+        reconciliation = compute_plan_diff(plan)
+        apply_plan_diff(reconciliation)
+    
     db.session.commit()
-    return jsonify(plan.to_dict()), 201
+    
+    response_data = plan.to_dict()
+    if reconciliation:
+        response_data["reconciliation"] = reconciliation
+    return jsonify(response_data), 201
 
 @main_bp.route("/monthly-plans/<int:plan_id>", methods=["GET"])
 def get_monthly_plan(plan_id):
@@ -303,6 +392,21 @@ def update_monthly_plan(plan_id):
     db.session.commit()
     return jsonify(plan.to_dict())
 
+@main_bp.route("/monthly-plans/<int:plan_id>/reconcile", methods=["GET"])
+def preview_monthly_plan_reconcile(plan_id):
+    """Dry run: show the inserts, updates and deletes that reconciling would make"""
+    plan = MonthlyPlan.query.get_or_404(plan_id)
+    return jsonify(compute_plan_diff(plan))
+
+@main_bp.route("/monthly-plans/<int:plan_id>/reconcile", methods=["POST"])
+def apply_monthly_plan_reconcile(plan_id):
+    """Bring production schedules in line with the plan in one transaction"""
+    plan = MonthlyPlan.query.get_or_404(plan_id)
+    diff = compute_plan_diff(plan)
+    apply_plan_diff(diff)
+    db.session.commit()
+    return jsonify(diff)
+
 @main_bp.route("/monthly-plans/<int:plan_id>", methods=["DELETE"])
 def delete_monthly_plan(plan_id):
     plan = MonthlyPlan.query.get_or_404(plan_id)
@@ -424,10 +528,12 @@ def delete_forecast_plan(forecast_id):
 # Production Schedule CRUD operations
 @main_bp.route("/production-schedules", methods=["GET"])
 def get_production_schedules():
-    # Support filtering by date, machine_id, part_id
+    # Support filtering by date, machine_id, part_id, sub_batch_id and status
     date_param = request.args.get('date')
     machine_id_param = request.args.get('machine_id')
     part_id_param = request.args.get('part_id')
+    sub_batch_id = request.args.get('sub_batch_id')
+    status = request.args.get('status')
     
     query = ProductionSchedule.query
     
@@ -453,12 +559,34 @@ def get_production_schedules():
         except ValueError:
             return jsonify({"error": "Invalid part_id format"}), 400
     
-    schedules = query.all()
-    return jsonify([schedule.to_dict() for schedule in schedules])
+    if sub_batch_id:
+        query = query.filter_by(sub_batch_id=sub_batch_id)
+    
+    if status:
+        query = query.filter_by(status=status)
+    
+    return jsonify(ProductionSchedule.rows(query))
+
+def expand_slot_key(data):
+    """Accept {"slot_key": n} in place of date, shift_number and slot_number"""
+    if not isinstance(data, dict) or "slot_key" not in data:
+        return data
+    if not isinstance(data["slot_key"], int):
+        raise ValueError("slot_key must be an integer")
+    try:
+        slot_date, shift_number, slot_number = get_calendar().from_slot_key(data["slot_key"])
+    except OverflowError:
+        raise ValueError("slot_key out of range")
+    data = {key: value for key, value in data.items() if key != "slot_key"}
+    data.update(date=slot_date.isoformat(), shift_number=shift_number, slot_number=slot_number)
+    return data
 
 @main_bp.route("/production-schedules", methods=["POST"])
 def create_production_schedule():
-    data = request.get_json()
+    try:
+        data = expand_slot_key(request.get_json())
+    except ValueError:
+        return jsonify({"error": "Invalid slot_key"}), 400
     if not data or not all(key in data for key in ["date", "shift_number", "slot_number", "part_id", "operation_id", "machine_id", "quantity_scheduled"]):
         return jsonify({"error": "Missing required fields: date, shift_number, slot_number, part_id, operation_id, machine_id, quantity_scheduled"}), 400
     
@@ -477,12 +605,13 @@ def create_production_schedule():
     if not machine:
         return jsonify({"error": "Machine not found"}), 404
     
-    # Validate shift and slot numbers
-    if data["shift_number"] not in [1, 2]:
-        return jsonify({"error": "Shift number must be 1 or 2"}), 400
+    # Validate shift and slot numbers against the shop calendar
+    calendar = get_calendar()
+    if not calendar.valid_shift(data["shift_number"]):
+        return jsonify({"error": calendar.shift_error}), 400
     
-    if data["slot_number"] not in [1, 2]:
-        return jsonify({"error": "Slot number must be 1 or 2"}), 400
+    if not calendar.valid_slot(data["slot_number"]):
+        return jsonify({"error": calendar.slot_error}), 400
     
     # Parse date
     try:
@@ -528,13 +657,15 @@ def create_production_schedule():
             "message": "Schedule created successfully, but conflicts detected in this slot.",
             "conflicts": existing_conflicts
         }
-        return jsonify(response_data), 201  # Created with warnings
     else:
         response_data["warnings"] = {
             "conflicts_detected": False,
             "message": "Schedule created successfully with no conflicts."
         }
-        return jsonify(response_data), 201
+    
+    # Operations of the touched sub-batch that are now out of order
+    response_data["warnings"]["precedence_violations"] = sub_batch_violations(schedule.part_id, schedule.sub_batch_id)
+    return jsonify(response_data), 201
 
 @main_bp.route("/production-schedules/<int:schedule_id>", methods=["GET"])
 def get_production_schedule(schedule_id):
@@ -544,7 +675,10 @@ def get_production_schedule(schedule_id):
 @main_bp.route("/production-schedules/<int:schedule_id>", methods=["PUT"])
 def update_production_schedule(schedule_id):
     schedule = ProductionSchedule.query.get_or_404(schedule_id)
-    data = request.get_json()
+    try:
+        data = expand_slot_key(request.get_json())
+    except ValueError:
+        return jsonify({"error": "Invalid slot_key"}), 400
     if not data:
         return jsonify({"error": "No data provided"}), 400
     
@@ -582,14 +716,15 @@ def update_production_schedule(schedule_id):
             return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
     
     # Update shift and slot numbers if provided
+    calendar = get_calendar()
     if "shift_number" in data:
-        if data["shift_number"] not in [1, 2]:
-            return jsonify({"error": "Shift number must be 1 or 2"}), 400
+        if not calendar.valid_shift(data["shift_number"]):
+            return jsonify({"error": calendar.shift_error}), 400
         schedule.shift_number = data["shift_number"]
     
     if "slot_number" in data:
-        if data["slot_number"] not in [1, 2]:
-            return jsonify({"error": "Slot number must be 1 or 2"}), 400
+        if not calendar.valid_slot(data["slot_number"]):
+            return jsonify({"error": calendar.slot_error}), 400
         schedule.slot_number = data["slot_number"]
     
     # Update other fields
@@ -626,11 +761,16 @@ def update_production_schedule(schedule_id):
             "message": "Schedule updated successfully with no conflicts."
         }
     
+    # Operations of the touched sub-batch that are now out of order
+    response_data["warnings"]["precedence_violations"] = sub_batch_violations(schedule.part_id, schedule.sub_batch_id)
     return jsonify(response_data)
 
 @main_bp.route("/production-schedules/<int:schedule_id>", methods=["DELETE"])
 def delete_production_schedule(schedule_id):
     schedule = ProductionSchedule.query.get_or_404(schedule_id)
+    # The lock triggers let completed rows through for archiving; the API still refuses them
+    if ScheduleLock.covering(schedule.date):
+        return jsonify({"error": f"{LOCKED_MESSAGE}. Remove the lock before changing finalized schedules"}), 409
     db.session.delete(schedule)
     db.session.commit()
     return jsonify({"message": "Production schedule deleted successfully"}), 200
@@ -653,6 +793,9 @@ def update_production_schedule_status(schedule_id):
     return jsonify(schedule.to_dict())
 
 # Specific filtering endpoints for day/machine/part queries
+def _schedule_view_cache():
+    return get_cache('schedule_views', current_app.config['SCHEDULE_VIEW_CACHE_ENTRIES'])
+
 @main_bp.route("/production-schedules/by-date/<date>", methods=["GET"])
 def get_schedules_by_date(date):
     try:
@@ -661,35 +804,118 @@ def get_schedules_by_date(date):
     except ValueError:
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
     
-    schedules = ProductionSchedule.query.filter_by(date=date_filter).all()
-    return jsonify([schedule.to_dict() for schedule in schedules])
+    # Cached until a schedule on that date is written (old and new date on moves)
+    return cached_response(
+        _schedule_view_cache(), ('by_date', date_filter), [f'day:{date_filter.isoformat()}'],
+        lambda: ProductionSchedule.rows(ProductionSchedule.query.filter_by(date=date_filter))
+    )
 
 @main_bp.route("/production-schedules/by-machine/<int:machine_id>", methods=["GET"])
 def get_schedules_by_machine(machine_id):
-    # Validate machine exists
-    machine = Machine.query.get_or_404(machine_id)
-    
     # Optional date filtering
+    date_filter = None
     date_param = request.args.get('date')
     if date_param:
         try:
             from datetime import datetime
             date_filter = datetime.fromisoformat(date_param).date()
-            schedules = ProductionSchedule.get_machine_schedule(machine_id, date_filter)
         except ValueError:
             return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
-    else:
-        schedules = ProductionSchedule.query.filter_by(machine_id=machine_id).all()
     
-    return jsonify([schedule.to_dict() for schedule in schedules])
+    def load():
+        # Validate machine exists (a missing machine is not cached)
+        Machine.query.get_or_404(machine_id)
+        query = ProductionSchedule.query.filter_by(machine_id=machine_id)
+        if date_filter:
+            query = query.filter_by(date=date_filter)
+        return ProductionSchedule.rows(query)
+    
+    # Cached until a schedule on that machine is written (old and new machine on moves)
+    return cached_response(
+        _schedule_view_cache(), ('by_machine', machine_id, date_filter), [f'machine:{machine_id}', 'machines'], load
+    )
 
 @main_bp.route("/production-schedules/by-part/<int:part_id>", methods=["GET"])
 def get_schedules_by_part(part_id):
     # Validate part exists
     part = Part.query.get_or_404(part_id)
     
-    schedules = ProductionSchedule.query.filter_by(part_id=part_id).all()
-    return jsonify([schedule.to_dict() for schedule in schedules])
+    return jsonify(ProductionSchedule.rows(ProductionSchedule.query.filter_by(part_id=part_id)))
+
+@main_bp.route("/production-schedules/history", methods=["GET"])
+def get_schedule_history():
+    """Report live and archived schedules together (reads through the union view)"""
+    from datetime import datetime
+
+    filters = {}
+    for param in ["from", "to"]:
+        value = request.args.get(param)
+        if value:
+            try:
+                filters[param] = datetime.fromisoformat(value).date()
+            except ValueError:
+                return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+    machine_id = request.args.get('machine_id', type=int)
+    part_id = request.args.get('part_id', type=int)
+
+    schedules = schedule_history(
+        date_from=filters.get("from"),
+        date_to=filters.get("to"),
+        machine_id=machine_id,
+        part_id=part_id
+    )
+    return jsonify(schedules)
+
+@main_bp.route("/production-schedules/shift", methods=["POST"])
+def shift_production_schedules():
+    """Move every matching schedule by N working slots and/or to another machine in one update"""
+    from datetime import datetime
+
+    data = request.get_json(silent=True) or {}
+
+    filters = {key: data.get(key) for key in ["machine_id", "part_id", "sub_batch_id", "status"]}
+    for param in ["from", "to"]:
+        value = data.get(param)
+        if value:
+            try:
+                filters[param] = datetime.fromisoformat(value).date()
+            except (TypeError, ValueError):
+                return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+    offset_slots = data.get("offset_slots", 0)
+    if not isinstance(offset_slots, int):
+        return jsonify({"error": "offset_slots must be an integer"}), 400
+
+    try:
+        result = shift_schedules(filters, offset_slots, data.get("target_machine_id"))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+
+    db.session.commit()
+    return jsonify(result)
+
+@main_bp.route("/production-schedules/precedence-violations", methods=["GET"])
+def get_precedence_violations():
+    """Sub-batch rows scheduled no later than a lower-sequence operation of the same sub-batch"""
+    from datetime import datetime
+
+    dates = {}
+    for param in ["from", "to"]:
+        value = request.args.get(param)
+        if value:
+            try:
+                dates[param] = datetime.fromisoformat(value).date()
+            except ValueError:
+                return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+    violations = precedence_violations(dates.get("from"), dates.get("to"))
+    return jsonify({
+        "violation_count": len(violations),
+        "sub_batches": len({(v["part_id"], v["sub_batch_id"]) for v in violations}),
+        "violations": violations
+    })
 
 # Conflict detection endpoints
 @main_bp.route("/production-schedules/conflicts/by-date/<date>", methods=["GET"])
@@ -739,10 +965,57 @@ def get_conflicts_by_machine(machine_id):
     
     return jsonify(response_data)
 
+@main_bp.route("/production-schedules/conflicts/summary", methods=["GET"])
+def get_conflict_summary():
+    """Count double-booked slots in a date range (optionally for one machine)"""
+    from datetime import datetime
+    
+    filters = {}
+    for param in ["from", "to"]:
+        value = request.args.get(param)
+        if value:
+            try:
+                filters[param] = datetime.fromisoformat(value).date()
+            except ValueError:
+                return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    
+    machine_id = request.args.get('machine_id', type=int)
+    summary = conflict_summary(filters.get("from"), filters.get("to"), machine_id)
+    
+    return jsonify({
+        "from": request.args.get("from"),
+        "to": request.args.get("to"),
+        "machine_id": machine_id,
+        **summary
+    })
+
+@main_bp.route("/production-schedules/conflicts/heatmap", methods=["GET"])
+def get_conflict_heatmap():
+    """Double-booked slots per date and machine in a date range"""
+    from datetime import datetime
+    
+    if not request.args.get("from") or not request.args.get("to"):
+        return jsonify({"error": "Missing required parameters: from, to"}), 400
+    
+    try:
+        date_from = datetime.fromisoformat(request.args["from"]).date()
+        date_to = datetime.fromisoformat(request.args["to"]).date()
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    
+    return jsonify({
+        "from": date_from.isoformat(),
+        "to": date_to.isoformat(),
+        "cells": conflict_heatmap(date_from, date_to)
+    })
+
 @main_bp.route("/production-schedules/conflicts/check-slot", methods=["POST"])
 def check_slot_conflicts():
     """Check for conflicts in a specific slot before scheduling"""
-    data = request.get_json()
+    try:
+        data = expand_slot_key(request.get_json())
+    except ValueError:
+        return jsonify({"error": "Invalid slot_key"}), 400
     
     if not data or not all(key in data for key in ["machine_id", "date", "shift_number", "slot_number"]):
         return jsonify({"error": "Missing required fields: machine_id, date, shift_number, slot_number"}), 400
@@ -750,12 +1023,13 @@ def check_slot_conflicts():
     # Validate machine exists
     machine = Machine.query.get_or_404(data["machine_id"])
     
-    # Validate shift and slot numbers
-    if data["shift_number"] not in [1, 2]:
-        return jsonify({"error": "Shift number must be 1 or 2"}), 400
+    # Validate shift and slot numbers against the shop calendar
+    calendar = get_calendar()
+    if not calendar.valid_shift(data["shift_number"]):
+        return jsonify({"error": calendar.shift_error}), 400
     
-    if data["slot_number"] not in [1, 2]:
-        return jsonify({"error": "Slot number must be 1 or 2"}), 400
+    if not calendar.valid_slot(data["slot_number"]):
+        return jsonify({"error": calendar.slot_error}), 400
     
     # Parse date
     try:
@@ -789,6 +1063,12 @@ def check_slot_conflicts():
             "message": "Slot is available for scheduling."
         })
 
+# Cache monitoring
+@main_bp.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    """Entries, hits and misses of every in-process cache of this worker"""
+    return jsonify(cache_stats())
+
 # Test route to verify database setup
 @main_bp.route("/test-db", methods=["GET"])
 def test_database():
@@ -0,0 +1,93 @@
+from flask import Blueprint, request, jsonify, current_app
+from datetime import date
+
+planning_bp = Blueprint("planning", __name__)
+
+def parse_start_month(value):
+    """Parse an optional ?start=YYYY-MM-DD into the first day of its month"""
+    from datetime import datetime
+    if not value:
+        return date.today().replace(day=1)
+    return datetime.fromisoformat(value).date().replace(day=1)
+
+# Forecast load
+@planning_bp.route("/forecast/load", methods=["GET"])
+def get_forecast_load():
+    """Roll weekly forecasts up to required vs available hours per machine type"""
+    from app.services.forecast_load import compute_forecast_load  # NumPy is only loaded when needed
+    
+    months = request.args.get('months', default=2, type=int)
+    if not (1 <= months <= 12):
+        return jsonify({"error": "Months must be between 1 and 12"}), 400
+    
+    try:
+        start_month = parse_start_month(request.args.get('start'))
+    except ValueError:
+        return jsonify({"error": "Invalid start format. Use YYYY-MM-DD"}), 400
+    
+    return jsonify(compute_forecast_load(start_month, months, current_app.config))
+
+# Plan projections
+@planning_bp.route("/monthly-plans/<int:plan_id>/projection", methods=["GET"])
+def get_plan_projection(plan_id):
+    """Projected completion slot and lateness of a monthly plan from the live schedule"""
+    from app.models.monthly_plan import MonthlyPlan
+    from app.services.projections import plan_projections
+    
+    plan = MonthlyPlan.query.get_or_404(plan_id)
+    return jsonify(plan_projections([plan], current_app.config['SLOT_MINUTES'])[0])
+
+@planning_bp.route("/monthly-plans/projections", methods=["GET"])
+def get_plan_projections():
+    """Projections for every plan of a month (default: current month)"""
+    from app.services.projections import month_projections
+    
+    try:
+        month = parse_start_month(request.args.get('month'))
+    except ValueError:
+        return jsonify({"error": "Invalid month format. Use YYYY-MM-DD"}), 400
+    
+    projections = month_projections(month, current_app.config['SLOT_MINUTES'])
+    return jsonify({
+        "month": month.isoformat(),
+        "plans": len(projections),
+        "late": sum(1 for projection in projections if projection["late"]),
+        "projections": projections
+    })
+
+# Capacity simulation
+MAX_SCENARIOS = 100000
+
+@planning_bp.route("/capacity/simulate", methods=["POST"])
+def run_capacity_simulation():
+    """Monte Carlo overload probability per machine type and week under forecast uncertainty"""
+    from app.services.capacity import simulate_capacity, DISTRIBUTIONS  # NumPy is only loaded when needed
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        start_month = parse_start_month(data.get("start"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid start format. Use YYYY-MM-DD"}), 400
+    
+    months = data.get("months", 2)
+    scenarios = data.get("scenarios", 10000)
+    spread = data.get("spread", 0.3)
+    distribution = data.get("distribution", "uniform")
+    seed = data.get("seed")
+    processes = data.get("processes")
+    if not isinstance(months, int) or not (1 <= months <= 12):
+        return jsonify({"error": "Months must be between 1 and 12"}), 400
+    if not isinstance(scenarios, int) or not (1 <= scenarios <= MAX_SCENARIOS):
+        return jsonify({"error": f"scenarios must be between 1 and {MAX_SCENARIOS}"}), 400
+    if isinstance(spread, bool) or not isinstance(spread, (int, float)) or not (0 <= spread <= 1):
+        return jsonify({"error": "spread must be a number between 0 and 1"}), 400
+    if distribution not in DISTRIBUTIONS:
+        return jsonify({"error": f"distribution must be one of: {', '.join(DISTRIBUTIONS)}"}), 400
+    if seed is not None and (not isinstance(seed, int) or seed < 0):
+        return jsonify({"error": "seed must be a non-negative integer"}), 400
+    if processes is not None and (not isinstance(processes, int) or processes < 1):
+        return jsonify({"error": "processes must be a positive integer"}), 400
+    
+    return jsonify(simulate_capacity(start_month, months, current_app.config, scenarios=scenarios,
+                                     spread=float(spread), distribution=distribution,
+                                     seed=seed, processes=processes))
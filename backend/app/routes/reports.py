@@ -0,0 +1,35 @@
+from flask import Blueprint, request, jsonify
+
+reports_bp = Blueprint("reports", __name__)
+
+def _date_param(name):
+    """Date query parameter (default today), or None when it is not a valid date"""
+    from datetime import datetime, date
+    
+    value = request.args.get(name)
+    if not value:
+        return date.today()
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        return None
+
+@reports_bp.route("/reports/daily", methods=["GET"])
+def get_daily_report():
+    """Production on a date per machine and part, split by status"""
+    from app.services.reports import daily_report  # NumPy is only loaded when needed
+    
+    day = _date_param('date')
+    if day is None:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    return jsonify(daily_report(day))
+
+@reports_bp.route("/reports/overdue", methods=["GET"])
+def get_overdue_report():
+    """Open operations dated before as_of, per status, machine and part"""
+    from app.services.reports import overdue_report  # NumPy is only loaded when needed
+    
+    as_of = _date_param('as_of')
+    if as_of is None:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    return jsonify(overdue_report(as_of))
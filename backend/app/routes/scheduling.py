@@ -0,0 +1,90 @@
+from flask import Blueprint, request, jsonify, current_app
+
+scheduling_bp = Blueprint("scheduling", __name__)
+
+# Auto-scheduling
+@scheduling_bp.route("/schedule/auto", methods=["POST"])
+def auto_schedule():
+    """Schedule the open quantity of a month's plans into free slots"""
+    from datetime import datetime
+    from app.services.auto_scheduler import auto_schedule_month
+    
+    data = request.get_json(silent=True) or {}
+    if "month" not in data:
+        return jsonify({"error": "Missing required field: month"}), 400
+    
+    try:
+        month = datetime.fromisoformat(data["month"]).date()
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid month format. Use YYYY-MM-DD"}), 400
+    
+    processes = data.get("processes")
+    if processes is not None and (not isinstance(processes, int) or processes < 1):
+        return jsonify({"error": "processes must be a positive integer"}), 400
+    
+    result = auto_schedule_month(month, current_app.config, processes=processes,
+                                 dry_run=bool(data.get("dry_run", False)))
+    return jsonify(result), 200 if result["dry_run"] else 201
+
+# Sub-batch sizing
+@scheduling_bp.route("/monthly-plans/<int:plan_id>/sub-batch-plan", methods=["GET"])
+def get_sub_batch_plan(plan_id):
+    """Split a plan's quantity into sub-batches with the shortest projected makespan"""
+    from app.models.monthly_plan import MonthlyPlan
+    from app.services.batch_sizing import part_operations, plan_sub_batches, MAX_SUB_BATCHES
+    
+    plan = MonthlyPlan.query.get_or_404(plan_id)
+    quantity = request.args.get("quantity", default=plan.planned_quantity, type=int)
+    max_batches = request.args.get("max_batches", default=MAX_SUB_BATCHES, type=int)
+    if quantity < 0 or max_batches < 1:
+        return jsonify({"error": "quantity must be 0 or more and max_batches at least 1"}), 400
+    
+    operations = part_operations(plan.part_id)
+    if any(not op["machine_ids"] for op in operations):
+        return jsonify({"error": "An operation of the part has no eligible machine"}), 400
+    
+    result = plan_sub_batches(operations, quantity, current_app.config["SLOT_MINUTES"], max_batches)
+    return jsonify({"plan_id": plan.plan_id, "part_id": plan.part_id, **result})
+
+# Finalization
+@scheduling_bp.route("/schedule/finalize", methods=["POST"])
+def finalize_schedule():
+    """Check a date range for conflicts, eligibility, part and precedence violations; lock it when clean"""
+    from datetime import datetime
+    from app import db
+    from app.services.finalization import finalize_range
+    
+    dates = {}
+    for param in ["from", "to"]:
+        value = request.args.get(param)
+        if not value:
+            return jsonify({"error": f"Missing required parameter: {param}"}), 400
+        try:
+            dates[param] = datetime.fromisoformat(value).date()
+        except ValueError:
+            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    
+    try:
+        result = finalize_range(dates["from"], dates["to"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    db.session.commit()
+    return jsonify(result), 201 if result["clean"] else 409
+
+@scheduling_bp.route("/schedule/locks", methods=["GET"])
+def get_schedule_locks():
+    from app.models.schedule_lock import ScheduleLock
+    locks = ScheduleLock.query.order_by(ScheduleLock.start_date).all()
+    return jsonify([lock.to_dict() for lock in locks])
+
+@scheduling_bp.route("/schedule/locks/<int:lock_id>", methods=["DELETE"])
+def delete_schedule_lock(lock_id):
+    """Unlock a finalized range so its schedules can be changed again"""
+    from app import db
+    from app.models.schedule_lock import ScheduleLock
+    
+    lock = ScheduleLock.query.get_or_404(lock_id)
+    db.session.delete(lock)
+    db.session.commit()
+    return jsonify({"message": "Schedule lock removed successfully"}), 200
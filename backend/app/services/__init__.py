@@ -0,0 +1 @@
+# Engines and background helpers that work on top of the models
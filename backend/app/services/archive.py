@@ -0,0 +1,162 @@
+from app import db
+from datetime import date, timedelta
+from sqlalchemy import event, text
+import click
+from flask.cli import with_appcontext
+
+# Columns shared by the live table, the archive table and the union view
+SCHEDULE_COLUMNS = [
+    'schedule_id',
+    'date',
+    'shift_number',
+    'slot_number',
+    'part_id',
+    'operation_id',
+    'machine_id',
+    'quantity_scheduled',
+    'sub_batch_id',
+    'status'
+]
+
+# Name of the per-connection view that reads live and archived schedules together
+HISTORY_VIEW = 'production_schedules_all'
+
+ARCHIVE_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS archive.production_schedules (
+    schedule_id INTEGER PRIMARY KEY,
+    date DATE NOT NULL,
+    shift_number INTEGER NOT NULL,
+    slot_number INTEGER NOT NULL,
+    part_id INTEGER NOT NULL,
+    operation_id INTEGER NOT NULL,
+    machine_id INTEGER NOT NULL,
+    quantity_scheduled INTEGER NOT NULL,
+    sub_batch_id VARCHAR(50),
+    status VARCHAR(50) NOT NULL
+)
+"""
+
+ARCHIVE_INDEX_DDL = [
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_schedule_date ON production_schedules (date)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_schedule_machine_date ON production_schedules (machine_id, date)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_schedule_part_operation ON production_schedules (part_id, operation_id)",
+]
+
+
+def _history_view_ddl():
+    columns = ', '.join(SCHEDULE_COLUMNS)
+    return (
+        f"CREATE TEMP VIEW IF NOT EXISTS {HISTORY_VIEW} AS "
+        f"SELECT {columns}, 0 AS archived FROM main.production_schedules "
+        f"UNION ALL "
+        f"SELECT {columns}, 1 AS archived FROM archive.production_schedules"
+    )
+
+
+def init_archive(app, engine=None, archive_path=None):
+    """Attach the archive database and the history view to every new connection.
+
+    Defaults to the app's default engine and ARCHIVE_DATABASE_PATH. Must be
+    called inside an app context before the first connection is made,
+    otherwise pooled connections opened earlier will not see the archive.
+    """
+    archive_path = archive_path or app.config['ARCHIVE_DATABASE_PATH']
+
+    @event.listens_for(engine or db.engine, 'connect')
+    def attach_archive(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+        cursor.execute(ARCHIVE_TABLE_DDL)
+        for statement in ARCHIVE_INDEX_DDL:
+            cursor.execute(statement)
+        cursor.execute(_history_view_ddl())
+        cursor.close()
+
+
+def archive_completed_schedules(horizon_days, batch_size, today=None):
+    """Move completed schedules older than the horizon into the archive database.
+
+    Rows are moved in batches, each batch in its own transaction, so the live
+    table is never locked for longer than one batch. Returns the number of
+    rows moved.
+    """
+    cutoff = (today or date.today()) - timedelta(days=horizon_days)
+    columns = ', '.join(SCHEDULE_COLUMNS)
+    moved = 0
+
+    while True:
+        ids = db.session.execute(text(
+            "SELECT schedule_id FROM main.production_schedules "
+            "WHERE status = 'completed' AND date < :cutoff "
+            "ORDER BY schedule_id LIMIT :batch_size"
+        ), {'cutoff': cutoff.isoformat(), 'batch_size': batch_size}).scalars().all()
+
+        if not ids:
+            break
+
+        id_params = {f'id_{i}': schedule_id for i, schedule_id in enumerate(ids)}
+        id_list = ', '.join(f':{name}' for name in id_params)
+
+        # INSERT OR REPLACE keeps a rerun idempotent if a previous batch copied
+        # rows into the archive but did not get to delete them from the live table
+        db.session.execute(text(
+            f"INSERT OR REPLACE INTO archive.production_schedules ({columns}) "
+            f"SELECT {columns} FROM main.production_schedules WHERE schedule_id IN ({id_list})"
+        ), id_params)
+        db.session.execute(text(
+            f"DELETE FROM main.production_schedules WHERE schedule_id IN ({id_list})"
+        ), id_params)
+        db.session.commit()
+
+        moved += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    return moved
+
+
+def get_schedule_history(date_from=None, date_to=None, machine_id=None, part_id=None):
+    """Read live and archived schedules through the union view"""
+    conditions = []
+    params = {}
+
+    if date_from:
+        conditions.append("date >= :date_from")
+        params['date_from'] = date_from.isoformat()
+    if date_to:
+        conditions.append("date <= :date_to")
+        params['date_to'] = date_to.isoformat()
+    if machine_id:
+        conditions.append("machine_id = :machine_id")
+        params['machine_id'] = machine_id
+    if part_id:
+        conditions.append("part_id = :part_id")
+        params['part_id'] = part_id
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = db.session.execute(text(
+        f"SELECT {', '.join(SCHEDULE_COLUMNS)}, archived FROM {HISTORY_VIEW} {where} "
+        f"ORDER BY date, shift_number, slot_number, machine_id"
+    ), params).mappings().all()
+
+    return [
+        {**row, 'archived': bool(row['archived'])}
+        for row in rows
+    ]
+
+
+@click.command('archive-schedules')
+@with_appcontext
+@click.option('--horizon-days', type=int, default=None,
+              help='Archive completed schedules older than this many days.')
+@click.option('--batch-size', type=int, default=None,
+              help='Number of rows moved per transaction.')
+def archive_schedules_command(horizon_days, batch_size):
+    """Move old completed production schedules into the archive database."""
+    from flask import current_app
+
+    horizon_days = horizon_days if horizon_days is not None else current_app.config['ARCHIVE_HORIZON_DAYS']
+    batch_size = batch_size or current_app.config['ARCHIVE_BATCH_SIZE']
+
+    moved = archive_completed_schedules(horizon_days, batch_size)
+    click.echo(f"Archived {moved} completed schedules older than {horizon_days} days.")
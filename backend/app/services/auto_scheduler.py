@@ -0,0 +1,405 @@
+from app import db
+from app.models.operation import Operation
+from app.models.monthly_plan import MonthlyPlan
+from app.models.machine_downtime import MachineDowntime
+from app.models.production_schedule import ProductionSchedule
+from app.models.schedule_lock import ScheduleLock
+from app.services.batch_sizing import plan_sub_batches
+from app.services.eligibility import get_eligibility
+from app.services.replanning import month_bounds
+from app.shop_calendar import get_calendar
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from sqlalchemy import func, insert
+import math
+import multiprocessing
+import os
+import re
+
+
+def sub_batch_id(part_id, month_start, number):
+    return f"P{part_id}-{month_start:%Y%m}-B{number:03d}"
+
+
+def last_sub_batch_numbers(month_start):
+    """Highest auto-scheduler sub-batch number per part for a month: {part_id: number}.
+
+    Numbering continues from the highest suffix rather than the number of
+    sub-batches, so gaps left by deleted batches never lead to a reused id.
+    """
+    pattern = re.compile(rf"P(\d+)-{month_start:%Y%m}-B(\d+)")
+    numbers = {}
+    for (batch_id,) in db.session.query(ProductionSchedule.sub_batch_id).filter(
+            ProductionSchedule.sub_batch_id.like(f"P%-{month_start:%Y%m}-B%")
+    ).distinct():
+        match = pattern.fullmatch(batch_id)
+        if match:
+            part_id, number = int(match.group(1)), int(match.group(2))
+            numbers[part_id] = max(numbers.get(part_id, 0), number)
+    return numbers
+
+
+def month_slots(month_start, month_end, calendar, today=None):
+    """Slot keys of the working slots left in the month, in order"""
+    return calendar.working_slot_keys(max(month_start, today or date.today()), month_end)
+
+
+def find_components(parts):
+    """Group operations into independent machine groups and order the groups.
+
+    Operations are joined to their eligible machines with union-find, which
+    splits the shop into machine groups (for example lathes and VMCs) that
+    share no machine. Groups are only coupled through operation precedence:
+    when a part's operation in group A is followed by one in group B, B has to
+    wait for A's slots. Groups that precede each other both ways are merged,
+    so every part visits each group in one contiguous run of operations.
+
+    Returns a list of levels; each level is a list of components (sets of
+    operation ids) that can be solved in parallel once earlier levels are done.
+    """
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(a, b):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    for part in parts:
+        for operation in part['operations']:
+            for machine_id in operation['machine_ids']:
+                union(('operation', operation['operation_id']), ('machine', machine_id))
+
+    # Merge groups until the precedence graph between them has no cycle
+    while True:
+        edges = {}
+        for part in parts:
+            roots = [find(('operation', op['operation_id'])) for op in part['operations']]
+            for before, after in zip(roots, roots[1:]):
+                if before != after:
+                    edges.setdefault(before, set()).add(after)
+        cycle = _find_cycle(edges)
+        if not cycle:
+            break
+        for node in cycle[1:]:
+            union(cycle[0], node)
+
+    # Longest-path level of every group in the precedence DAG
+    levels = {}
+
+    def level_of(root):
+        if root not in levels:
+            levels[root] = 0
+            levels[root] = max(
+                (level_of(before) + 1 for before, afters in edges.items() if root in afters),
+                default=0
+            )
+        return levels[root]
+
+    components = {}
+    for part in parts:
+        for operation in part['operations']:
+            root = find(('operation', operation['operation_id']))
+            components.setdefault(root, set()).add(operation['operation_id'])
+
+    ordered = [[] for _ in range(max((level_of(root) for root in components), default=-1) + 1)]
+    for root in sorted(components, key=repr):
+        ordered[level_of(root)].append(components[root])
+    return ordered
+
+
+def _find_cycle(edges):
+    """Return the nodes of one cycle in a directed graph, or None"""
+    state = {}
+    stack = []
+
+    def visit(node):
+        state[node] = 'open'
+        stack.append(node)
+        for after in edges.get(node, ()):
+            if state.get(after) == 'open':
+                return stack[stack.index(after):]
+            if after not in state:
+                cycle = visit(after)
+                if cycle:
+                    return cycle
+        state[node] = 'done'
+        stack.pop()
+        return None
+
+    for node in list(edges):
+        if node not in state:
+            cycle = visit(node)
+            if cycle:
+                return cycle
+    return None
+
+
+def solve_component(component):
+    """Greedy list scheduling for one component. Runs in a worker process, so it
+    only takes and returns plain data.
+
+    `component['segments']` holds, per part, the run of its operations that
+    falls in this component and the sub-batches to place, each with the
+    earliest slot it may start in (after its previous operation in an earlier
+    component). Every operation of a sub-batch goes to the eligible machine
+    with the earliest run of free slots long enough for it, after the
+    previous operation of the same sub-batch, so consecutive sub-batches
+    overlap across operations. A run never crosses `component['breaks']`,
+    the slot indexes that do not directly follow the previous slot (after a
+    locked day). A sub-batch that cannot be placed completely fails, and so
+    do the part's later sub-batches in this component.
+    """
+    n_slots = component['n_slots']
+    slot_minutes = component['slot_minutes']
+    breaks = set(component['breaks'])
+    busy = {machine_id: set(slots) for machine_id, slots in component['busy'].items()}
+    placed = {}
+    failed = []
+
+    def first_free_run(machine_id, start, length):
+        taken = busy.setdefault(machine_id, set())
+        t = start
+        while t + length <= n_slots:
+            blocked = next((s for s in range(t, t + length) if s in taken), None)
+            if blocked is not None:
+                t = blocked + 1
+                continue
+            split = next((s for s in range(t + 1, t + length) if s in breaks), None)
+            if split is None:
+                return t
+            t = split
+        return None
+
+    for segment in sorted(component['segments'], key=lambda s: s['part_id']):
+        for position, (batch_number, quantity, release) in enumerate(segment['batches']):
+            placements = []
+            earliest = release
+            complete = True
+            for operation in segment['operations']:
+                length = max(1, math.ceil(quantity * operation['cycle_minutes'] / slot_minutes))
+                best = None
+                for machine_id in operation['machine_ids']:
+                    start = first_free_run(machine_id, earliest, length)
+                    if start is not None and (best is None or start < best[1]):
+                        best = (machine_id, start)
+                if best is None:
+                    complete = False
+                    break
+                machine_id, start = best
+                busy[machine_id].update(range(start, start + length))
+                placements.append((operation['operation_id'], machine_id, start, length))
+                earliest = start + length
+
+            if not complete:
+                # Give back the slots of the operations already placed for this sub-batch
+                for _, machine_id, start, length in placements:
+                    busy[machine_id].difference_update(range(start, start + length))
+                failed.extend((segment['part_id'], number) for number, _, _ in segment['batches'][position:])
+                break
+            placed[(segment['part_id'], batch_number)] = placements
+
+    return {'placed': list(placed.items()), 'failed': failed}
+
+
+def process_pool(processes):
+    # Workers only run module-level functions on plain data (solve_component
+    # here, the capacity simulation's sampler), so forking the already-loaded
+    # app is safe and avoids re-importing it in every worker.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+    return ProcessPoolExecutor(max_workers=processes, mp_context=context)
+
+
+def build_scheduling_problem(month, config, today=None):
+    """Load everything the solver needs for a month in a handful of queries"""
+    month_start, month_end = month_bounds(month)
+    calendar = get_calendar()
+    slots = month_slots(month_start, month_end, calendar, today)
+    # Finalized days cannot take new rows
+    locked = ScheduleLock.locked_days(month_start, month_end)
+    if locked:
+        slots = [key for key in slots if calendar.from_slot_key(key)[0] not in locked]
+    slot_index = {key: i for i, key in enumerate(slots)}
+    # Indexes whose slot does not directly follow the previous one: runs are split there
+    breaks = [i for i in range(1, len(slots)) if calendar.next_slot_keys(slots[i - 1], 1)[0] != slots[i]]
+
+    plans = MonthlyPlan.query.filter(
+        MonthlyPlan.month >= month_start,
+        MonthlyPlan.month <= month_end
+    ).all()
+    part_ids = [plan.part_id for plan in plans]
+
+    operations_by_part = {}
+    if part_ids:
+        for operation in Operation.query.filter(Operation.part_id.in_(part_ids)).order_by(
+                Operation.part_id, Operation.sequence_number).all():
+            operations_by_part.setdefault(operation.part_id, []).append(operation)
+
+    # Quantity already scheduled for the first operation of each part this month
+    started = dict(db.session.query(
+        ProductionSchedule.operation_id,
+        func.sum(ProductionSchedule.quantity_scheduled)
+    ).filter(
+        ProductionSchedule.date >= month_start,
+        ProductionSchedule.date <= month_end
+    ).group_by(ProductionSchedule.operation_id).all())
+
+    last_numbers = last_sub_batch_numbers(month_start)
+
+    eligibility = get_eligibility()
+    parts = []
+    unplaced = []
+    for plan in plans:
+        operations = operations_by_part.get(plan.part_id, [])
+        if not operations:
+            continue
+        quantity = plan.planned_quantity - (started.get(operations[0].operation_id) or 0)
+        if quantity <= 0:
+            continue
+        part_operations = [{
+            'operation_id': op.operation_id,
+            'cycle_minutes': (op.machining_time or 0) + (op.loading_time or 0),
+            'machine_ids': sorted(eligibility.eligible_machines(op.operation_id))
+        } for op in operations]
+        if not all(op['machine_ids'] for op in part_operations):
+            unplaced.append({'part_id': plan.part_id, 'quantity': quantity,
+                             'reason': 'An operation has no eligible machine'})
+            continue
+
+        sizes = plan_sub_batches(part_operations, quantity, config['SLOT_MINUTES'])['batch_sizes']
+        first = last_numbers.get(plan.part_id, 0) + 1
+        batches = [(first + i, size) for i, size in enumerate(sizes)]
+        parts.append({'part_id': plan.part_id, 'operations': part_operations, 'batches': batches})
+
+    busy = {}
+    for machine_id, slot_key in db.session.query(
+            ProductionSchedule.machine_id,
+            ProductionSchedule.slot_key
+    ).filter(
+        ProductionSchedule.date >= month_start,
+        ProductionSchedule.date <= month_end
+    ).all():
+        index = slot_index.get(slot_key)
+        if index is not None:
+            busy.setdefault(machine_id, set()).add(index)
+    if slots:
+        for machine_id, slot_key in MachineDowntime.down_slots(None, slots[0], slots[-1]):
+            index = slot_index.get(slot_key)
+            if index is not None:
+                busy.setdefault(machine_id, set()).add(index)
+
+    return month_start, slots, breaks, parts, busy, unplaced
+
+
+def auto_schedule_month(month, config, processes=None, dry_run=False, today=None):
+    """Schedule the open quantity of every monthly plan in the month.
+
+    The problem is split into machine-group components (see find_components).
+    Components on the same level are solved in parallel in a process pool;
+    a later level starts once the slots of the operations it depends on are
+    known. The merged result is written in one transaction unless `dry_run`
+    is set.
+    """
+    month_start, slots, breaks, parts, busy, unplaced = build_scheduling_problem(month, config, today)
+    levels = find_components(parts)
+
+    releases = {(part['part_id'], number): 0 for part in parts for number, _ in part['batches']}
+    placed = {}
+    failed = set()
+
+    processes = processes or config.get('SCHEDULER_PROCESSES') or os.cpu_count() or 1
+    processes = max(1, min(processes, max((len(level) for level in levels), default=1)))
+    pool = process_pool(processes) if processes > 1 else None
+    try:
+        for level in levels:
+            inputs = []
+            for operation_ids in level:
+                segments = []
+                for part in parts:
+                    operations = [op for op in part['operations'] if op['operation_id'] in operation_ids]
+                    if not operations:
+                        continue
+                    batches = [
+                        (number, quantity, releases[(part['part_id'], number)])
+                        for number, quantity in part['batches']
+                        if (part['part_id'], number) not in failed
+                    ]
+                    if batches:
+                        segments.append({'part_id': part['part_id'], 'operations': operations, 'batches': batches})
+                machine_ids = {m for segment in segments for op in segment['operations'] for m in op['machine_ids']}
+                inputs.append({
+                    'segments': segments,
+                    'busy': {m: sorted(busy.get(m, ())) for m in machine_ids},
+                    'n_slots': len(slots),
+                    'breaks': breaks,
+                    'slot_minutes': config['SLOT_MINUTES']
+                })
+
+            results = pool.map(solve_component, inputs) if pool and len(inputs) > 1 else map(solve_component, inputs)
+            for result in results:
+                failed.update(tuple(key) for key in result['failed'])
+                for key, placements in result['placed']:
+                    key = tuple(key)
+                    placed.setdefault(key, []).extend(placements)
+                    releases[key] = max(start + length for _, _, start, length in placements)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    shop_calendar = get_calendar()
+    rows = []
+    for part in parts:
+        open_quantity = 0
+        for number, quantity in part['batches']:
+            key = (part['part_id'], number)
+            if key in failed:
+                # Operations placed in earlier components are dropped with the sub-batch
+                open_quantity += quantity
+                continue
+            for operation_id, machine_id, start, length in placed.get(key, []):
+                # Spread the sub-batch quantity over the slots it occupies
+                share, extra = divmod(quantity, length)
+                for i in range(length):
+                    slot_quantity = share + (1 if i < extra else 0)
+                    if not slot_quantity:
+                        continue
+                    slot_key = slots[start + i]
+                    slot_date, shift_number, slot_number = shop_calendar.from_slot_key(slot_key)
+                    rows.append({
+                        'date': slot_date,
+                        'shift_number': shift_number,
+                        'slot_number': slot_number,
+                        'slot_key': slot_key,
+                        'part_id': part['part_id'],
+                        'operation_id': operation_id,
+                        'machine_id': machine_id,
+                        'quantity_scheduled': slot_quantity,
+                        'sub_batch_id': sub_batch_id(part['part_id'], month_start, number),
+                        'status': 'planned'
+                    })
+        if open_quantity:
+            unplaced.append({'part_id': part['part_id'], 'quantity': open_quantity,
+                             'reason': 'No free slots left in the month'})
+
+    if rows and not dry_run:
+        db.session.execute(insert(ProductionSchedule), rows)
+        db.session.commit()
+
+    return {
+        'month': month_start.isoformat(),
+        'dry_run': dry_run,
+        'components': sum(len(level) for level in levels),
+        'levels': len(levels),
+        'processes': processes,
+        'parts_scheduled': len({row['part_id'] for row in rows}),
+        'schedules_created': len(rows),
+        'schedules': [{**row, 'date': row['date'].isoformat()} for row in rows] if dry_run else [],
+        'unplaced': unplaced
+    }
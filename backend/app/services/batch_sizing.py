@@ -0,0 +1,90 @@
+from app import db
+from app.models.operation import Operation
+from app.services.eligibility import get_eligibility
+import numpy as np
+
+# Most sub-batches considered for one plan
+MAX_SUB_BATCHES = 200
+
+
+def part_operations(part_id):
+    """A part's operation chain in the form the sizing engine and the auto-scheduler use"""
+    eligibility = get_eligibility()
+    operations = Operation.query.filter_by(part_id=part_id).order_by(Operation.sequence_number).all()
+    return [{
+        'operation_id': op.operation_id,
+        'cycle_minutes': (op.machining_time or 0) + (op.loading_time or 0),
+        'machine_ids': sorted(eligibility.eligible_machines(op.operation_id))
+    } for op in operations]
+
+
+def split_quantity(quantity, batch_count):
+    """`batch_count` sub-batch sizes adding up to `quantity`, differing by at most one"""
+    size, extra = divmod(quantity, batch_count)
+    return [size + 1] * extra + [size] * (batch_count - extra)
+
+
+def evaluate_splits(cycle_minutes, machine_counts, quantity, slot_minutes, max_batches=MAX_SUB_BATCHES):
+    """Projected makespan in slots for every sub-batch count 1..max_batches at once.
+
+    A sub-batch of q pieces holds operation i for d_i = ceil(q * c_i / slot)
+    slots. Sub-batches flow through the chain with each operation starting
+    once the previous one has finished, so for k sub-batches
+
+        C(k) = sum(d) + (k - 1) * max(d_i / m_i)
+
+    where m_i is the number of machines eligible for operation i: the first
+    sub-batch passes through every operation, the rest follow at the pace of
+    the bottleneck. Sizes are taken as ceil(quantity / k), so C(k) is an upper
+    bound when the split is uneven. Returns (batch_counts, durations, makespans)
+    as arrays of shape (K,), (K, operations) and (K,).
+    """
+    cycle_minutes = np.asarray(cycle_minutes, dtype=float)
+    machine_counts = np.maximum(np.asarray(machine_counts, dtype=float), 1.0)
+    counts = np.arange(1, max(1, min(quantity, max_batches)) + 1)
+    sizes = -(-quantity // counts)  # ceil(quantity / k)
+    durations = np.maximum(1, np.ceil(sizes[:, None] * cycle_minutes[None, :] / slot_minutes)).astype(int)
+    pace = (durations / machine_counts[None, :]).max(axis=1)
+    makespans = durations.sum(axis=1) + np.ceil((counts - 1) * pace).astype(int)
+    return counts, durations, makespans
+
+
+def plan_sub_batches(operations, quantity, slot_minutes, max_batches=MAX_SUB_BATCHES):
+    """Split `quantity` into the sub-batches with the shortest projected makespan.
+
+    `operations` is a part's chain as returned by part_operations. Among the
+    counts with the shortest makespan the smallest wins, which is the one whose
+    sub-batches fill their slots best. Returns the sizes, slots per operation
+    per sub-batch and the projected makespan.
+    """
+    if quantity <= 0 or not operations:
+        return {'quantity': max(quantity, 0), 'batch_count': 0, 'batch_sizes': [],
+                'makespan_slots': 0, 'makespan_minutes': 0, 'bottleneck_operation_id': None,
+                'slot_utilization': None, 'operations': []}
+
+    cycle_minutes = [op['cycle_minutes'] for op in operations]
+    machine_counts = [len(op['machine_ids']) for op in operations]
+    counts, durations, makespans = evaluate_splits(cycle_minutes, machine_counts, quantity, slot_minutes, max_batches)
+    best = int(np.argmin(makespans))  # first minimum: fewest sub-batches
+    batch_count = int(counts[best])
+    sizes = split_quantity(quantity, batch_count)
+
+    slot_counts = [[max(1, -(-size * op['cycle_minutes'] // slot_minutes)) for op in operations] for size in sizes]
+    booked = sum(sum(row) for row in slot_counts) * slot_minutes
+    pace = durations[best] / np.maximum(np.asarray(machine_counts, dtype=float), 1.0)
+    return {
+        'quantity': quantity,
+        'batch_count': batch_count,
+        'batch_sizes': sizes,
+        'makespan_slots': int(makespans[best]),
+        'makespan_minutes': int(makespans[best]) * slot_minutes,
+        'bottleneck_operation_id': operations[int(np.argmax(pace))]['operation_id'],
+        # Share of the booked slot minutes spent machining
+        'slot_utilization': round(quantity * sum(cycle_minutes) / booked, 3) if booked else None,
+        'operations': [{
+            'operation_id': op['operation_id'],
+            'cycle_minutes': op['cycle_minutes'],
+            'machines': len(op['machine_ids']),
+            'slots_per_batch': int(durations[best][i])
+        } for i, op in enumerate(operations)]
+    }
@@ -0,0 +1,88 @@
+from app.services.auto_scheduler import process_pool
+from app.services.forecast_load import Routing, forecast_quantities, weekly_machine_hours, week_labels
+import numpy as np
+import os
+
+DISTRIBUTIONS = ('uniform', 'normal')
+
+# Scenarios per task; also the unit of seeding, so results do not depend on the process count
+CHUNK_SCENARIOS = 1000
+
+
+def sample_required_hours(task):
+    """Required hours per scenario, machine type and week for one chunk of scenarios.
+
+    Every part-week quantity is scaled by its own random factor: uniform in
+    [1 - spread, 1 + spread], or normal with mean 1 and standard deviation
+    `spread`, clipped at 0. Runs in a worker process on plain arrays.
+    """
+    base, part_type_hours, spread, distribution, scenarios, seed = task
+    rng = np.random.default_rng(seed)
+    shape = (scenarios,) + base.shape
+    if distribution == 'normal':
+        factors = np.clip(rng.normal(1.0, spread, size=shape), 0.0, None)
+    else:
+        factors = rng.uniform(1.0 - spread, 1.0 + spread, size=shape)
+    quantities = factors * base[None, :, :]
+    # scenarios x parts x weeks -> scenarios x types x weeks
+    return np.einsum('spw,pt->stw', quantities, part_type_hours)
+
+
+def simulate_capacity(start_month, months, config, scenarios=10000, spread=0.3,
+                      distribution='uniform', seed=None, processes=None):
+    """Monte Carlo rough-cut capacity check of the forecasts in a window.
+
+    Samples `scenarios` versions of the weekly forecasts, converts each to
+    machine-type hours through the operation routing and compares them with
+    the hours the type's machines have in a week. Chunks of scenarios are
+    sampled in a process pool, each from its own child of one SeedSequence,
+    so a given seed always gives the same result.
+    """
+    routing = Routing.load()
+    base = forecast_quantities(routing, start_month, months)
+    part_type_hours = routing.part_type_hours()
+    available = routing.machines_per_type * weekly_machine_hours(config)
+
+    chunks = [CHUNK_SCENARIOS] * (scenarios // CHUNK_SCENARIOS)
+    if scenarios % CHUNK_SCENARIOS:
+        chunks.append(scenarios % CHUNK_SCENARIOS)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    tasks = [(base, part_type_hours, spread, distribution, n, child) for n, child in zip(chunks, seeds)]
+
+    processes = processes or config.get('SIMULATION_PROCESSES') or os.cpu_count() or 1
+    processes = max(1, min(processes, len(tasks)))
+    if processes > 1:
+        pool = process_pool(processes)
+        try:
+            samples = list(pool.map(sample_required_hours, tasks))
+        finally:
+            pool.shutdown()
+    else:
+        samples = [sample_required_hours(task) for task in tasks]
+    required = np.concatenate(samples)  # scenarios x types x weeks
+
+    overloaded = required > available[None, :, None]
+    mean = required.mean(axis=0)
+    p50, p90 = np.percentile(required, [50, 90], axis=0)
+    return {
+        'start_month': start_month.isoformat(),
+        'months': months,
+        'scenarios': scenarios,
+        'spread': spread,
+        'distribution': distribution,
+        'processes': processes,
+        'weeks': week_labels(start_month, months),
+        'machine_types': {
+            machine_type: {
+                'machines': int(routing.machines_per_type[i]),
+                'available_hours': round(float(available[i]), 2),
+                'expected_hours': np.round(mean[i], 2).tolist(),
+                'p50_hours': np.round(p50[i], 2).tolist(),
+                'p90_hours': np.round(p90[i], 2).tolist(),
+                'overload_probability': np.round(overloaded[:, i, :].mean(axis=0), 4).tolist(),
+                # Share of scenarios with at least one overloaded week
+                'any_week_overload_probability': round(float(overloaded[:, i, :].any(axis=1).mean()), 4)
+            }
+            for i, machine_type in enumerate(routing.machine_types)
+        }
+    }
@@ -0,0 +1,55 @@
+from app.cache import get_cache
+from app.factories import fan_out
+from app.services.dashboard import forecast_vs_actual_tile, utilization_tile, week_bounds
+from app.services.replanning import month_bounds
+
+# Summed across factories for plan vs actual
+PLAN_FIELDS = ('forecasted', 'planned', 'scheduled', 'completed')
+
+
+def _utilization(week_start, week_end):
+    # Same cache entry as the dashboard tile of this factory
+    return get_cache('dashboard').get_or_compute(
+        ('utilization', week_start), ['schedules', 'machines'],
+        lambda: utilization_tile(week_start, week_end)
+    )
+
+
+def _plan_vs_actual(day):
+    return get_cache('dashboard').get_or_compute(
+        ('forecast_vs_actual', month_bounds(day)[0]), ['forecasts', 'plans', 'schedules', 'operations'],
+        lambda: forecast_vs_actual_tile(day)
+    )
+
+
+def factory_utilization(day):
+    """Machine utilization for the week of a date in every factory, queried in parallel"""
+    week_start, week_end = week_bounds(day)
+    tiles, errors = fan_out(_utilization, week_start, week_end)
+    machines = [{'factory': name, **machine} for name, tile in tiles.items() for machine in tile['machines']]
+    return {
+        'from': week_start.isoformat(),
+        'to': week_end.isoformat(),
+        'average': round(sum(m['utilization'] for m in machines) / len(machines), 3) if machines else 0.0,
+        'factories': [{
+            'factory': name,
+            'machines': len(tile['machines']),
+            'available_slots_per_machine': tile['available_slots_per_machine'],
+            'average': tile['average']
+        } for name, tile in tiles.items()],
+        'machines': machines,
+        'errors': errors
+    }
+
+
+def factory_plan_vs_actual(day):
+    """Forecast, plan and output for the month of a date in every factory, queried in parallel"""
+    tiles, errors = fan_out(_plan_vs_actual, day)
+    totals = {field: sum(tile[field] for tile in tiles.values()) for field in PLAN_FIELDS}
+    return {
+        'month': month_bounds(day)[0].isoformat(),
+        **totals,
+        'completion': round(totals['completed'] / totals['planned'], 3) if totals['planned'] else None,
+        'factories': [{'factory': name, **tile} for name, tile in tiles.items()],
+        'errors': errors
+    }
@@ -0,0 +1,142 @@
+from app import db
+from app.cache import get_cache
+from app.services.occupancy import conflict_summary
+from app.services.replanning import month_bounds
+from app.shop_calendar import get_calendar
+from datetime import timedelta
+from sqlalchemy import text
+
+# Open rows whose date has passed are overdue
+OPEN_STATUSES = ('planned', 'in_progress', 'delayed')
+
+OVERDUE_LIST_LIMIT = 10
+
+
+def week_bounds(day):
+    """Monday and Sunday of the week containing the given date"""
+    start = day - timedelta(days=day.weekday())
+    return start, start + timedelta(days=6)
+
+
+def utilization_tile(start, end):
+    """Occupied vs available slots per machine, read from slot_occupancy"""
+    available = get_calendar().working_slot_count(start, end)
+    rows = db.session.execute(text(
+        "SELECT m.machine_id, m.name, m.type, COALESCE(o.occupied, 0) AS occupied "
+        "FROM machines m LEFT JOIN ("
+        "  SELECT machine_id, COUNT(*) AS occupied FROM slot_occupancy "
+        "  WHERE date >= :start AND date <= :end GROUP BY machine_id"
+        ") o ON o.machine_id = m.machine_id ORDER BY m.machine_id"
+    ), {'start': start.isoformat(), 'end': end.isoformat()}).mappings().all()
+
+    machines = [{
+        'machine_id': row['machine_id'],
+        'name': row['name'],
+        'type': row['type'],
+        'occupied_slots': row['occupied'],
+        'utilization': round(row['occupied'] / available, 3) if available else 0.0
+    } for row in rows]
+    return {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'available_slots_per_machine': available,
+        'average': round(sum(m['utilization'] for m in machines) / len(machines), 3) if machines else 0.0,
+        'machines': machines
+    }
+
+
+def delays_tile(day):
+    """Delayed rows and open rows scheduled before the given date"""
+    status_list = ', '.join(f"'{status}'" for status in OPEN_STATUSES)
+    counts = db.session.execute(text(
+        f"SELECT "
+        f"(SELECT COUNT(*) FROM production_schedules WHERE status = 'delayed') AS delayed, "
+        f"(SELECT COUNT(*) FROM production_schedules WHERE status IN ({status_list}) AND date < :day) AS overdue"
+    ), {'day': day.isoformat()}).mappings().one()
+    oldest = db.session.execute(text(
+        f"SELECT schedule_id, date, shift_number, slot_number, part_id, operation_id, machine_id, "
+        f"quantity_scheduled, sub_batch_id, status FROM production_schedules "
+        f"WHERE status IN ({status_list}) AND date < :day "
+        f"ORDER BY date, shift_number, slot_number LIMIT :limit"
+    ), {'day': day.isoformat(), 'limit': OVERDUE_LIST_LIMIT}).mappings().all()
+    return {
+        'delayed': counts['delayed'],
+        'overdue': counts['overdue'],
+        'oldest_overdue': [dict(row) for row in oldest]
+    }
+
+
+def forecast_vs_actual_tile(day):
+    """Forecast, plan and last-operation output for the month of the given date"""
+    month_start, month_end = month_bounds(day)
+    params = {'start': month_start.isoformat(), 'end': month_end.isoformat()}
+    row = db.session.execute(text(
+        "SELECT "
+        "(SELECT COALESCE(SUM(forecasted_quantity), 0) FROM forecast_plans "
+        " WHERE month >= :start AND month <= :end) AS forecasted, "
+        "(SELECT COALESCE(SUM(planned_quantity), 0) FROM monthly_plans "
+        " WHERE month >= :start AND month <= :end) AS planned"
+    ), params).mappings().one()
+
+    # A part is finished when its last operation is, so only that operation counts
+    output = db.session.execute(text(
+        "SELECT COALESCE(SUM(ps.quantity_scheduled), 0) AS scheduled, "
+        "COALESCE(SUM(CASE WHEN ps.status = 'completed' THEN ps.quantity_scheduled END), 0) AS completed "
+        "FROM production_schedules ps "
+        "WHERE ps.date >= :start AND ps.date <= :end AND ps.operation_id IN ("
+        "  SELECT o.operation_id FROM operations o JOIN ("
+        "    SELECT part_id, MAX(sequence_number) AS last_sequence FROM operations GROUP BY part_id"
+        "  ) l ON l.part_id = o.part_id AND l.last_sequence = o.sequence_number"
+        ")"
+    ), params).mappings().one()
+
+    planned = row['planned']
+    return {
+        'month': month_start.isoformat(),
+        'forecasted': row['forecasted'],
+        'planned': planned,
+        'scheduled': output['scheduled'],
+        'completed': output['completed'],
+        'completion': round(output['completed'] / planned, 3) if planned else None
+    }
+
+
+def conflicts_tile(week_start, week_end, month_start, month_end):
+    week = conflict_summary(week_start, week_end)
+    return {
+        'week': week,
+        'month': conflict_summary(month_start, month_end),
+        'warning': week['conflicted_slots'] > 0
+    }
+
+
+def dashboard_summary(day):
+    """All dashboard tiles for a date.
+
+    Each tile is cached per period and tied to the cache generations of the
+    tables it reads, so a write only recomputes the tiles it affects.
+    """
+    cache = get_cache('dashboard')
+    week_start, week_end = week_bounds(day)
+    month_start, month_end = month_bounds(day)
+
+    return {
+        'date': day.isoformat(),
+        'utilization': cache.get_or_compute(
+            ('utilization', week_start), ['schedules', 'machines'],
+            lambda: utilization_tile(week_start, week_end)
+        ),
+        'delays': cache.get_or_compute(
+            ('delays', day), ['schedules'],
+            lambda: delays_tile(day)
+        ),
+        'forecast_vs_actual': cache.get_or_compute(
+            ('forecast_vs_actual', month_start), ['forecasts', 'plans', 'schedules', 'operations'],
+            lambda: forecast_vs_actual_tile(day)
+        ),
+        'conflicts': cache.get_or_compute(
+            # A week can span two months, so the month is part of the key
+            ('conflicts', week_start, month_start), ['schedules'],
+            lambda: conflicts_tile(week_start, week_end, month_start, month_end)
+        )
+    }
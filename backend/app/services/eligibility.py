@@ -0,0 +1,105 @@
+from app import db
+from app.cache import current_generations
+from app.factories import current_factory
+from app.models.operation_machine import OperationMachine
+from flask import current_app
+
+
+class EligibilityMatrix:
+    """In-process copy of operation_machines held as integer bitsets.
+
+    Every machine and operation gets a bit position the first time it shows
+    up. `by_operation[op]` is a bitset over machine positions and
+    `by_machine[machine]` a bitset over operation positions, so "eligible?" is
+    a single AND and both directions of lookup avoid the database entirely.
+    The matrix is loaded with one query and reloaded when the 'eligibility'
+    cache generation changes, which the operation_machines triggers bump on
+    every write from any process.
+    """
+
+    def __init__(self):
+        self.machine_bits = {}
+        self.machine_ids = []
+        self.operation_bits = {}
+        self.operation_ids = []
+        self.by_operation = {}
+        self.by_machine = {}
+
+    @classmethod
+    def load(cls):
+        matrix = cls()
+        pairs = db.session.query(OperationMachine.operation_id, OperationMachine.machine_id).all()
+        for operation_id, machine_id in pairs:
+            matrix._set(operation_id, machine_id)
+        return matrix
+
+    def _machine_bit(self, machine_id):
+        bit = self.machine_bits.get(machine_id)
+        if bit is None:
+            bit = len(self.machine_ids)
+            self.machine_bits[machine_id] = bit
+            self.machine_ids.append(machine_id)
+        return bit
+
+    def _operation_bit(self, operation_id):
+        bit = self.operation_bits.get(operation_id)
+        if bit is None:
+            bit = len(self.operation_ids)
+            self.operation_bits[operation_id] = bit
+            self.operation_ids.append(operation_id)
+        return bit
+
+    def _set(self, operation_id, machine_id):
+        machine_bit = self._machine_bit(machine_id)
+        operation_bit = self._operation_bit(operation_id)
+        self.by_operation[operation_id] = self.by_operation.get(operation_id, 0) | (1 << machine_bit)
+        self.by_machine[machine_id] = self.by_machine.get(machine_id, 0) | (1 << operation_bit)
+
+    @staticmethod
+    def _ids_from_bits(bits, ids):
+        result = []
+        while bits:
+            low = bits & -bits
+            result.append(ids[low.bit_length() - 1])
+            bits ^= low
+        return result
+
+    def is_eligible(self, operation_id, machine_id):
+        bit = self.machine_bits.get(machine_id)
+        if bit is None:
+            return False
+        return bool(self.by_operation.get(operation_id, 0) >> bit & 1)
+
+    def eligible_machines(self, operation_id):
+        """Machine ids eligible for an operation"""
+        return self._ids_from_bits(self.by_operation.get(operation_id, 0), self.machine_ids)
+
+    def operations_for_machine(self, machine_id):
+        """Operation ids a machine can run"""
+        return self._ids_from_bits(self.by_machine.get(machine_id, 0), self.operation_ids)
+
+    def machine_mask(self, machine_ids):
+        """Bitset for a set of machines, to test many operations against it at once"""
+        mask = 0
+        for machine_id in machine_ids:
+            bit = self.machine_bits.get(machine_id)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+
+def get_eligibility():
+    """Return the current factory's eligibility matrix, loading it on first use
+    and again whenever operation_machines has changed.
+
+    Every factory has its own operation_machines table, so each gets its own
+    matrix.
+    """
+    matrices = current_app.extensions.setdefault('eligibility', {})
+    factory = current_factory()
+    generation = current_generations(['eligibility'])
+    entry = matrices.get(factory)
+    if entry is None or entry[0] != generation:
+        entry = (generation, EligibilityMatrix.load())
+        matrices[factory] = entry
+    return entry[1]
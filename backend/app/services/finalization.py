@@ -0,0 +1,89 @@
+from app import db
+from app.models.schedule_lock import ScheduleLock
+from app.services.precedence import precedence_violations
+from sqlalchemy import text
+
+# Each check is one set-based query over the schedules dated :date_from..:date_to
+DOUBLE_BOOKINGS_SQL = (
+    "SELECT o.machine_id, o.date, o.shift_number, o.slot_number, o.count AS bookings, "
+    "group_concat(s.schedule_id) AS schedule_ids "
+    "FROM slot_occupancy o JOIN production_schedules s ON s.machine_id = o.machine_id AND s.date = o.date "
+    "AND s.shift_number = o.shift_number AND s.slot_number = o.slot_number "
+    "WHERE o.count > 1 AND o.date >= :date_from AND o.date <= :date_to "
+    "GROUP BY o.machine_id, o.date, o.shift_number, o.slot_number "
+    "ORDER BY o.date, o.machine_id, o.shift_number, o.slot_number"
+)
+
+INELIGIBLE_MACHINES_SQL = (
+    "SELECT s.schedule_id, s.date, s.shift_number, s.slot_number, s.operation_id, s.machine_id "
+    "FROM production_schedules s "
+    "WHERE s.date >= :date_from AND s.date <= :date_to AND NOT EXISTS ("
+    "  SELECT 1 FROM operation_machines om "
+    "  WHERE om.operation_id = s.operation_id AND om.machine_id = s.machine_id"
+    ") ORDER BY s.date, s.shift_number, s.slot_number, s.schedule_id"
+)
+
+PART_MISMATCHES_SQL = (
+    "SELECT s.schedule_id, s.date, s.shift_number, s.slot_number, s.operation_id, "
+    "s.part_id, o.part_id AS operation_part_id "
+    "FROM production_schedules s JOIN operations o ON o.operation_id = s.operation_id "
+    "WHERE s.date >= :date_from AND s.date <= :date_to AND o.part_id != s.part_id "
+    "ORDER BY s.date, s.shift_number, s.slot_number, s.schedule_id"
+)
+
+
+def _rows(sql, params):
+    return [dict(row) for row in db.session.execute(text(sql), params).mappings().all()]
+
+
+def find_violations(date_from, date_to):
+    """Every reason the schedules dated date_from..date_to cannot be finalized"""
+    params = {'date_from': date_from.isoformat(), 'date_to': date_to.isoformat()}
+    double_bookings = _rows(DOUBLE_BOOKINGS_SQL, params)
+    for slot in double_bookings:
+        slot['schedule_ids'] = sorted(int(schedule_id) for schedule_id in slot['schedule_ids'].split(','))
+    return {
+        'double_bookings': double_bookings,
+        'ineligible_machines': _rows(INELIGIBLE_MACHINES_SQL, params),
+        'part_mismatches': _rows(PART_MISMATCHES_SQL, params),
+        'precedence': precedence_violations(date_from, date_to)
+    }
+
+
+def _begin_immediate():
+    # SQLite only takes the write lock at the first write, so another
+    # connection could commit schedules between the checks and the lock
+    # insert. BEGIN IMMEDIATE takes it up front; a session that has already
+    # written holds it anyway.
+    dbapi_connection = db.session.connection().connection.dbapi_connection
+    if not dbapi_connection.in_transaction:
+        dbapi_connection.execute("BEGIN IMMEDIATE")
+
+
+def finalize_range(date_from, date_to):
+    """Check a date range and lock it when it is clean (caller commits).
+
+    Runs every check and reports all violations at once; the range is only
+    locked when there are none. The database write lock is held from the
+    first check until the caller commits, so no schedule write can slip in
+    between. Raises ValueError for an empty range.
+    """
+    if date_to < date_from:
+        raise ValueError("to must not be before from")
+    _begin_immediate()
+    violations = find_violations(date_from, date_to)
+    violation_count = sum(len(found) for found in violations.values())
+
+    lock = None
+    if not violation_count:
+        lock = ScheduleLock(start_date=date_from, end_date=date_to)
+        db.session.add(lock)
+        db.session.flush()
+    return {
+        'from': date_from.isoformat(),
+        'to': date_to.isoformat(),
+        'clean': not violation_count,
+        'violation_count': violation_count,
+        'violations': violations,
+        'lock': lock.to_dict() if lock else None
+    }
@@ -0,0 +1,171 @@
+from app import db
+from app.models.operation import Operation
+from app.models.machine import Machine
+from app.models.operation_machine import OperationMachine
+from app.models.forecast_plan import ForecastPlan
+from app.shop_calendar import ShopCalendar
+from datetime import date
+import numpy as np
+
+WEEKS_PER_MONTH = 4
+
+
+def add_months(month, count):
+    """Return the first day of the month `count` months after `month`"""
+    index = month.year * 12 + (month.month - 1) + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class Routing:
+    """Operation routing as arrays: which part an operation belongs to, how many
+    minutes a piece takes, and how its load spreads over machine types.
+
+    Load for an operation is split evenly across its eligible machines, so an
+    operation eligible on two VMCs and one lathe puts 2/3 of its hours on
+    "VMC" and 1/3 on "CNC Lathe". Operations without eligible machines have an
+    all-zero share row and are reported as unassigned.
+    """
+
+    def __init__(self, part_ids, machine_types, machines_per_type, op_part, op_minutes, op_type_share):
+        self.part_ids = part_ids
+        self.part_index = {part_id: i for i, part_id in enumerate(part_ids)}
+        self.machine_types = machine_types
+        self.machines_per_type = machines_per_type
+        self.op_part = op_part
+        self.op_minutes = op_minutes
+        self.op_type_share = op_type_share
+        self.op_unassigned = op_type_share.sum(axis=1) == 0
+
+    @classmethod
+    def load(cls):
+        """Build the routing from three flat queries"""
+        machines = db.session.query(Machine.machine_id, Machine.type).all()
+        operations = db.session.query(
+            Operation.operation_id,
+            Operation.part_id,
+            Operation.machining_time + Operation.loading_time
+        ).all()
+        edges = db.session.query(OperationMachine.operation_id, OperationMachine.machine_id).all()
+
+        machine_types = sorted({machine_type for _, machine_type in machines})
+        type_index = {machine_type: i for i, machine_type in enumerate(machine_types)}
+        machine_index = {machine_id: i for i, (machine_id, _) in enumerate(machines)}
+        op_index = {operation_id: i for i, (operation_id, _, _) in enumerate(operations)}
+        part_ids = sorted({part_id for _, part_id, _ in operations})
+        part_index = {part_id: i for i, part_id in enumerate(part_ids)}
+
+        # machines x types one-hot
+        machine_type_matrix = np.zeros((len(machines), len(machine_types)))
+        if machines:
+            machine_type_matrix[
+                np.arange(len(machines)),
+                [type_index[machine_type] for _, machine_type in machines]
+            ] = 1.0
+        machines_per_type = machine_type_matrix.sum(axis=0)
+
+        # operations x machines eligibility
+        eligibility = np.zeros((len(operations), len(machines)))
+        edges = [(op_index[o], machine_index[m]) for o, m in edges if o in op_index and m in machine_index]
+        if edges:
+            rows, cols = zip(*edges)
+            eligibility[list(rows), list(cols)] = 1.0
+
+        eligible_counts = eligibility.sum(axis=1, keepdims=True)
+        op_type_share = np.divide(
+            eligibility @ machine_type_matrix,
+            eligible_counts,
+            out=np.zeros((len(operations), len(machine_types))),
+            where=eligible_counts > 0
+        )
+
+        op_part = np.array([part_index[part_id] for _, part_id, _ in operations], dtype=np.int64)
+        op_minutes = np.array([minutes or 0.0 for _, _, minutes in operations], dtype=np.float64)
+
+        return cls(part_ids, machine_types, machines_per_type, op_part, op_minutes, op_type_share)
+
+    def part_type_hours(self):
+        """Hours per piece of each part on each machine type (parts x types)"""
+        op_type_hours = self.op_type_share * (self.op_minutes[:, None] / 60.0)
+        hours = np.zeros((len(self.part_ids), len(self.machine_types)))
+        np.add.at(hours, self.op_part, op_type_hours)
+        return hours
+
+    def required_hours(self, quantities):
+        """Convert part quantities into machine-type hours.
+
+        `quantities` is parts x weeks (or scenarios x parts x weeks); the result
+        is types x weeks (or scenarios x types x weeks) plus the unassigned
+        hours per week.
+        """
+        op_hours = quantities[..., self.op_part, :] * (self.op_minutes[:, None] / 60.0)
+        required = np.einsum('ot,...ow->...tw', self.op_type_share, op_hours)
+        unassigned = op_hours[..., self.op_unassigned, :].sum(axis=-2)
+        return required, unassigned
+
+
+def weekly_machine_hours(config):
+    """Available hours for one machine in one week of the shop calendar"""
+    return ShopCalendar.from_config(config).weekly_minutes() / 60.0
+
+
+def forecast_quantities(routing, start_month, months):
+    """Load forecasts in the window into a parts x weeks array"""
+    end_month = add_months(start_month, months)
+    rows = db.session.query(
+        ForecastPlan.part_id,
+        ForecastPlan.month,
+        ForecastPlan.week,
+        ForecastPlan.forecasted_quantity
+    ).filter(
+        ForecastPlan.month >= start_month,
+        ForecastPlan.month < end_month
+    ).all()
+
+    quantities = np.zeros((len(routing.part_ids), months * WEEKS_PER_MONTH))
+    rows = [row for row in rows if row.part_id in routing.part_index]
+    if rows:
+        part_idx = [routing.part_index[row.part_id] for row in rows]
+        week_idx = [
+            ((row.month.year - start_month.year) * 12 + row.month.month - start_month.month) * WEEKS_PER_MONTH
+            + row.week - 1
+            for row in rows
+        ]
+        np.add.at(quantities, (part_idx, week_idx), [row.forecasted_quantity for row in rows])
+
+    return quantities
+
+
+def week_labels(start_month, months):
+    return [
+        {'month': add_months(start_month, m).isoformat(), 'week': week}
+        for m in range(months)
+        for week in range(1, WEEKS_PER_MONTH + 1)
+    ]
+
+
+def compute_forecast_load(start_month, months, config):
+    """Required vs available machine-hours per machine type and forecast week"""
+    routing = Routing.load()
+    quantities = forecast_quantities(routing, start_month, months)
+    required, unassigned = routing.required_hours(quantities)
+
+    hours_per_machine = weekly_machine_hours(config)
+    available = routing.machines_per_type[:, None] * hours_per_machine * np.ones(quantities.shape[1])
+    utilization = np.divide(required, available, out=np.zeros_like(required), where=available > 0)
+
+    return {
+        'start_month': start_month.isoformat(),
+        'months': months,
+        'weeks': week_labels(start_month, months),
+        'machine_types': {
+            machine_type: {
+                'machines': int(routing.machines_per_type[i]),
+                'required_hours': np.round(required[i], 2).tolist(),
+                'available_hours': np.round(available[i], 2).tolist(),
+                'utilization': np.round(utilization[i], 3).tolist(),
+                'overloaded_weeks': int((required[i] > available[i]).sum())
+            }
+            for i, machine_type in enumerate(routing.machine_types)
+        },
+        'unassigned_hours': np.round(unassigned, 2).tolist()
+    }
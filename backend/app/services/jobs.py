@@ -0,0 +1,216 @@
+from app import db
+from app.factories import current_factory, factory_context, factory_names
+from app.models.job import Job
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import update
+import json
+import os
+import socket
+import threading
+import traceback
+import uuid
+
+# Registered job functions by name: fn(params, progress) -> JSON-serializable result
+JOBS = {}
+
+# Jobs in these states have not finished yet
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class QueueFull(Exception):
+    """Raised when the bounded job queue has no room left"""
+
+
+def register_job(name):
+    """Decorator that makes a function available to POST /jobs under `name`"""
+    def decorator(fn):
+        JOBS[name] = fn
+        return fn
+    return decorator
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _worker_alive(worker):
+    """True when `worker` names a process on this host that is still running"""
+    if not worker:
+        return False
+    host, _, pid = worker.rpartition(':')
+    if host != socket.gethostname():
+        return True  # cannot check other hosts; assume alive
+    try:
+        os.kill(int(pid), 0)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+class JobRunner:
+    """Runs registered jobs on a small thread pool inside the web process.
+
+    The queue is bounded: at most `max_workers` jobs run and `max_queued`
+    more wait; further submissions raise QueueFull. The pool is created on
+    first use so that it is started in each forked server worker rather than
+    in the preloading master. Job state lives in the `jobs` table, so status
+    and results survive a restart.
+    """
+
+    def __init__(self, app, max_workers, max_queued):
+        self.app = app
+        self.max_workers = max_workers
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, name, params=None):
+        if name not in JOBS:
+            raise KeyError(name)
+        if not self._slots.acquire(blocking=False):
+            raise QueueFull()
+
+        try:
+            job = Job(
+                job_id=str(uuid.uuid4()),
+                name=name,
+                params=json.dumps(params or {}),
+                status='queued',
+                worker=worker_name()
+            )
+            db.session.add(job)
+            db.session.commit()
+            self._get_executor().submit(self._run, job.job_id, current_factory())
+        except Exception:
+            self._slots.release()
+            raise
+        return job
+
+    def _set_progress(self, job_id, progress, message=None):
+        values = {'progress': max(0.0, min(1.0, float(progress)))}
+        if message is not None:
+            values['message'] = message[:255]
+        # Separate short transaction so progress is visible while the job's own work is uncommitted
+        with db.session.get_bind().begin() as connection:
+            connection.execute(update(Job.__table__).where(Job.__table__.c.job_id == job_id).values(**values))
+
+    def _run(self, job_id, factory):
+        try:
+            with factory_context(self.app, factory):
+                job = db.session.get(Job, job_id)
+                job.status = 'running'
+                job.started_at = datetime.utcnow()
+                db.session.commit()
+                params = json.loads(job.params) if job.params else {}
+
+                try:
+                    result = JOBS[job.name](params, lambda progress, message=None: self._set_progress(job_id, progress, message))
+                    job = db.session.get(Job, job_id)
+                    job.result = json.dumps(result)
+                    job.status = 'succeeded'
+                    job.progress = 1.0
+                except Exception as e:
+                    db.session.rollback()
+                    job = db.session.get(Job, job_id)
+                    job.status = 'failed'
+                    job.error = f"{e}\n{traceback.format_exc()}"
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                db.session.remove()
+        finally:
+            self._slots.release()
+
+
+def refresh_job_state(job):
+    """Fail an unfinished job whose worker process has died (restart, recycle or kill)"""
+    if job.status in ACTIVE_STATUSES and not _worker_alive(job.worker):
+        job.status = 'failed'
+        job.error = 'Worker process exited before the job finished'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    return job
+
+
+def init_jobs(app):
+    """Create the app's job runner and fail jobs left unfinished by dead processes.
+
+    Must be called inside an app context at startup.
+    """
+    app.extensions['job_runner'] = JobRunner(
+        app,
+        max_workers=app.config['JOB_WORKERS'],
+        max_queued=app.config['JOB_QUEUE_SIZE']
+    )
+    for factory in factory_names(app):
+        with factory_context(app, factory):
+            for job in Job.query.filter(Job.status.in_(ACTIVE_STATUSES)).all():
+                refresh_job_state(job)
+
+
+def get_job_runner():
+    return current_app.extensions['job_runner']
+
+
+# Registered jobs
+
+@register_job('archive_schedules')
+def archive_schedules_job(params, progress):
+    from app.services.archive import archive_completed_schedules
+    horizon_days = params.get('horizon_days', current_app.config['ARCHIVE_HORIZON_DAYS'])
+    batch_size = params.get('batch_size', current_app.config['ARCHIVE_BATCH_SIZE'])
+    return {'archived': archive_completed_schedules(horizon_days, batch_size)}
+
+
+@register_job('reconcile_plan')
+def reconcile_plan_job(params, progress):
+    from app.models.monthly_plan import MonthlyPlan
+    from app.services.replanning import compute_plan_diff, apply_plan_diff
+    plan = db.session.get(MonthlyPlan, params['plan_id'])
+    if plan is None:
+        raise ValueError(f"Monthly plan {params['plan_id']} not found")
+    diff = compute_plan_diff(plan)
+    if not params.get('dry_run', False):
+        apply_plan_diff(diff)
+        db.session.commit()
+    return diff
+
+
+@register_job('forecast_load')
+def forecast_load_job(params, progress):
+    from app.services.forecast_load import compute_forecast_load
+    from datetime import date
+    start = params.get('start')
+    start_month = date.fromisoformat(start).replace(day=1) if start else date.today().replace(day=1)
+    return compute_forecast_load(start_month, int(params.get('months', 2)), current_app.config)
+
+
+@register_job('capacity_simulation')
+def capacity_simulation_job(params, progress):
+    from app.services.capacity import simulate_capacity
+    from datetime import date
+    start = params.get('start')
+    start_month = date.fromisoformat(start).replace(day=1) if start else date.today().replace(day=1)
+    return simulate_capacity(start_month, int(params.get('months', 2)), current_app.config,
+                             scenarios=int(params.get('scenarios', 10000)),
+                             spread=float(params.get('spread', 0.3)),
+                             distribution=params.get('distribution', 'uniform'),
+                             seed=params.get('seed'), processes=params.get('processes'))
+
+
+@register_job('auto_schedule')
+def auto_schedule_job(params, progress):
+    from app.services.auto_scheduler import auto_schedule_month
+    from datetime import date
+    month = date.fromisoformat(params['month'])
+    return auto_schedule_month(month, current_app.config, processes=params.get('processes'),
+                               dry_run=params.get('dry_run', False))
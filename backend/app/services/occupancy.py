@@ -0,0 +1,98 @@
+from app import db
+from sqlalchemy import text
+import click
+from flask.cli import with_appcontext
+
+# Recount every occupied slot from the live schedules
+REBUILD_SQL = (
+    "INSERT INTO slot_occupancy (machine_id, date, shift_number, slot_number, count) "
+    "SELECT machine_id, date, shift_number, slot_number, COUNT(*) FROM production_schedules "
+    "GROUP BY machine_id, date, shift_number, slot_number"
+)
+
+
+def _range_conditions(date_from, date_to, machine_id=None):
+    # `count > 1` lets SQLite use the partial index over double-booked slots
+    conditions = ["count > 1"]
+    params = {}
+    if date_from:
+        conditions.append("date >= :date_from")
+        params['date_from'] = date_from.isoformat()
+    if date_to:
+        conditions.append("date <= :date_to")
+        params['date_to'] = date_to.isoformat()
+    if machine_id:
+        conditions.append("machine_id = :machine_id")
+        params['machine_id'] = machine_id
+    return ' AND '.join(conditions), params
+
+
+def conflict_summary(date_from=None, date_to=None, machine_id=None):
+    """Double-booked slots in a date range, read from slot_occupancy"""
+    where, params = _range_conditions(date_from, date_to, machine_id)
+    row = db.session.execute(text(
+        f"SELECT COUNT(*) AS conflicted_slots, COALESCE(SUM(count), 0) AS bookings "
+        f"FROM slot_occupancy WHERE {where}"
+    ), params).mappings().one()
+    return {
+        'conflicted_slots': row['conflicted_slots'],
+        'conflicting_schedules': row['bookings'],
+        'extra_bookings': row['bookings'] - row['conflicted_slots']
+    }
+
+
+def conflict_heatmap(date_from, date_to):
+    """Double-booked slots per date and machine in a date range"""
+    where, params = _range_conditions(date_from, date_to)
+    rows = db.session.execute(text(
+        f"SELECT date, machine_id, COUNT(*) AS conflicted_slots, SUM(count) AS conflicting_schedules "
+        f"FROM slot_occupancy WHERE {where} GROUP BY date, machine_id ORDER BY date, machine_id"
+    ), params).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def rebuild_slot_occupancy():
+    """Recount slot_occupancy from production_schedules in one transaction"""
+    db.session.execute(text("DELETE FROM slot_occupancy"))
+    db.session.execute(text(REBUILD_SQL))
+    db.session.commit()
+    return db.session.execute(text("SELECT COUNT(*) FROM slot_occupancy")).scalar()
+
+
+def check_slot_occupancy():
+    """Return the slots whose stored count differs from the live schedules"""
+    rows = db.session.execute(text(
+        "SELECT machine_id, date, shift_number, slot_number, "
+        "SUM(expected) AS expected, SUM(stored) AS stored FROM ("
+        "  SELECT machine_id, date, shift_number, slot_number, COUNT(*) AS expected, 0 AS stored "
+        "  FROM production_schedules GROUP BY machine_id, date, shift_number, slot_number "
+        "  UNION ALL "
+        "  SELECT machine_id, date, shift_number, slot_number, 0, count FROM slot_occupancy"
+        ") GROUP BY machine_id, date, shift_number, slot_number HAVING SUM(expected) != SUM(stored)"
+    )).mappings().all()
+    return [dict(row) for row in rows]
+
+
+@click.command('rebuild-slot-occupancy')
+@with_appcontext
+def rebuild_slot_occupancy_command():
+    """Recount slot occupancy from the production schedules."""
+    slots = rebuild_slot_occupancy()
+    click.echo(f"Rebuilt slot occupancy: {slots} occupied slots.")
+
+
+@click.command('check-slot-occupancy')
+@with_appcontext
+def check_slot_occupancy_command():
+    """Compare slot occupancy with the production schedules."""
+    mismatches = check_slot_occupancy()
+    for row in mismatches:
+        click.echo(
+            f"Machine {row['machine_id']} {row['date']} S{row['shift_number']}:{row['slot_number']}: "
+            f"stored {row['stored']}, expected {row['expected']}"
+        )
+    if mismatches:
+        raise click.ClickException(
+            f"{len(mismatches)} slots out of date. Run 'flask rebuild-slot-occupancy' to fix them."
+        )
+    click.echo("Slot occupancy is consistent.")
@@ -0,0 +1,62 @@
+from app import db
+from app.shop_calendar import get_calendar
+from sqlalchemy import text
+
+# Rows of a sub-batch that are not after every lower-sequence operation of it.
+# GROUPS frames step over peers, so the frame ending at "1 PRECEDING" holds
+# exactly the rows whose sequence number is lower than the current row's.
+VIOLATIONS_SQL = (
+    "SELECT * FROM ("
+    "  SELECT s.schedule_id, s.part_id, s.sub_batch_id, s.operation_id, o.sequence_number,"
+    "  s.machine_id, s.date, s.shift_number, s.slot_number, s.slot_key,"
+    "  MAX(s.slot_key) OVER ("
+    "    PARTITION BY s.part_id, s.sub_batch_id ORDER BY o.sequence_number"
+    "    GROUPS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING"
+    "  ) AS predecessor_slot_key"
+    "  FROM production_schedules s JOIN operations o ON o.operation_id = s.operation_id"
+    "  WHERE s.sub_batch_id IS NOT NULL AND {scope}"
+    ") WHERE slot_key <= predecessor_slot_key "
+    "ORDER BY part_id, sub_batch_id, slot_key, sequence_number"
+)
+
+# Sub-batches (part and id) with a row in the date range; the window then sees all of their rows
+RANGE_SCOPE = (
+    "(s.part_id, s.sub_batch_id) IN (SELECT part_id, sub_batch_id FROM production_schedules "
+    "WHERE date >= :date_from AND date <= :date_to AND sub_batch_id IS NOT NULL)"
+)
+
+SUB_BATCH_SCOPE = "s.part_id = :part_id AND s.sub_batch_id = :sub_batch_id"
+
+
+def _violations(scope, params):
+    calendar = get_calendar()
+    violations = []
+    for row in db.session.execute(text(VIOLATIONS_SQL.format(scope=scope)), params).mappings().all():
+        violation = dict(row)
+        day, shift_number, slot_number = calendar.from_slot_key(row['predecessor_slot_key'])
+        violation['predecessor'] = {'date': day.isoformat(), 'shift_number': shift_number,
+                                    'slot_number': slot_number}
+        violations.append(violation)
+    return violations
+
+
+def precedence_violations(date_from=None, date_to=None):
+    """Out-of-order rows of every sub-batch with a row dated date_from..date_to.
+
+    A row violates precedence when its slot is not after every slot of a
+    lower-sequence operation of the same part and sub-batch. Sub-batches are
+    checked whole, so a violation against a row outside the range is found too.
+    """
+    if date_from is None and date_to is None:
+        return _violations("1", {})
+    return _violations(RANGE_SCOPE, {
+        'date_from': date_from.isoformat() if date_from else '0001-01-01',
+        'date_to': date_to.isoformat() if date_to else '9999-12-31'
+    })
+
+
+def sub_batch_violations(part_id, sub_batch_id):
+    """Out-of-order rows of one sub-batch (checked after every create and update)"""
+    if sub_batch_id is None:
+        return []
+    return _violations(SUB_BATCH_SCOPE, {'part_id': part_id, 'sub_batch_id': sub_batch_id})
@@ -0,0 +1,191 @@
+from app import db
+from app.cache import get_cache, current_generations
+from app.models.monthly_plan import MonthlyPlan
+from app.models.operation import Operation
+from app.models.production_schedule import ProductionSchedule
+from app.services.batch_sizing import plan_sub_batches
+from app.services.eligibility import get_eligibility
+from app.services.replanning import month_bounds
+from app.shop_calendar import get_calendar
+from datetime import date, timedelta
+
+# Rows in these states count wherever they are; planned and delayed rows only count in the future
+DONE_STATUSES = ('completed', 'in_progress')
+
+
+def _slot(calendar, key):
+    day, shift_number, slot_number = calendar.from_slot_key(key)
+    return {'slot_key': key, 'date': day.isoformat(), 'shift_number': shift_number, 'slot_number': slot_number}
+
+
+def _due_key(calendar, month_end):
+    """Last working slot of the month (the last slot of the month if no day is working)"""
+    day = month_end
+    while not calendar.is_working_day(day) and day.day > 1:
+        day -= timedelta(days=1)
+    return (day.toordinal() + 1) * calendar.slots_per_day - 1
+
+
+def project_plan(plan, operations, rows, calendar, slot_minutes, today):
+    """Projected completion of a plan's last operation from the part's schedules.
+
+    `operations` is the part's chain in sequence order and `rows` its
+    schedules from the plan's month on, as (operation_id, slot_key, quantity,
+    status). The last operation completes at the slot where its cumulative
+    quantity reaches the planned quantity. Planned or delayed rows in a slot
+    before today are overdue and do not count. Any quantity still missing is
+    projected after the part's last counted slot with the sub-batch sizing
+    engine's makespan.
+    """
+    month_start, month_end = month_bounds(plan.month)
+    due_key = _due_key(calendar, month_end)
+    now_key = calendar.slot_key(today, 1, 1)
+    projection = {
+        'plan_id': plan.plan_id,
+        'part_id': plan.part_id,
+        'company_id': plan.company_id,
+        'month': month_start.isoformat(),
+        'planned_quantity': plan.planned_quantity,
+        'due': _slot(calendar, due_key)
+    }
+    if not operations:
+        return {**projection, 'projected_completion': None, 'late': None,
+                'reason': 'The part has no operations'}
+
+    last_operation = operations[-1]['operation_id']
+    counted, overdue, completed = [], 0, 0
+    last_counted_key = None
+    for operation_id, slot_key, quantity, status in rows:
+        if status not in DONE_STATUSES and slot_key < now_key:
+            if operation_id == last_operation:
+                overdue += quantity
+            continue
+        last_counted_key = slot_key if last_counted_key is None else max(last_counted_key, slot_key)
+        if operation_id == last_operation:
+            counted.append((slot_key, quantity))
+            if status == 'completed':
+                completed += quantity
+
+    completion_key = None
+    cumulative = 0
+    for slot_key, quantity in sorted(counted):
+        cumulative += quantity
+        if cumulative >= plan.planned_quantity:
+            completion_key = slot_key
+            break
+    scheduled = sum(quantity for _, quantity in counted)
+
+    shortfall = max(plan.planned_quantity - scheduled, 0)
+    if completion_key is None and plan.planned_quantity > 0:
+        start = max(now_key - 1, last_counted_key if last_counted_key is not None else now_key - 1)
+        makespan = plan_sub_batches(operations, shortfall, slot_minutes)['makespan_slots']
+        completion_key = calendar.add_working_slots(start, max(makespan, 1))
+
+    if completion_key is None:
+        late, lateness_days, lateness_slots = False, 0, 0
+    else:
+        late = completion_key > due_key
+        due_day = calendar.from_slot_key(due_key)[0]
+        completion_day = calendar.from_slot_key(completion_key)[0]
+        lateness_days = max((completion_day - due_day).days, 0)
+        lateness_slots = 0
+        if late:
+            # Working slots after the due slot, up to and including the completion slot
+            lateness_slots = calendar.working_slot_count(due_day + timedelta(days=1), completion_day) \
+                - (calendar.slots_per_day - 1 - completion_key % calendar.slots_per_day)
+
+    return {
+        **projection,
+        'last_operation_id': last_operation,
+        'scheduled_quantity': scheduled,
+        'completed_quantity': completed,
+        'overdue_quantity': overdue,
+        'shortfall': shortfall,
+        'fully_scheduled': shortfall == 0,
+        'projected_completion': _slot(calendar, completion_key) if completion_key is not None else None,
+        'late': late,
+        'lateness_days': lateness_days,
+        'lateness_slots': lateness_slots
+    }
+
+
+def _compute_projections(plans, slot_minutes, today):
+    """Projections for many plans from two queries"""
+    part_ids = {plan.part_id for plan in plans}
+    eligibility = get_eligibility()
+    chains = {}
+    for operation in Operation.query.filter(Operation.part_id.in_(part_ids)).order_by(
+            Operation.part_id, Operation.sequence_number).all():
+        chains.setdefault(operation.part_id, []).append({
+            'operation_id': operation.operation_id,
+            'cycle_minutes': (operation.machining_time or 0) + (operation.loading_time or 0),
+            'machine_ids': sorted(eligibility.eligible_machines(operation.operation_id))
+        })
+
+    earliest = min(month_bounds(plan.month)[0] for plan in plans)
+    rows_by_part = {}
+    for part_id, operation_id, slot_key, quantity, status in db.session.query(
+            ProductionSchedule.part_id,
+            ProductionSchedule.operation_id,
+            ProductionSchedule.slot_key,
+            ProductionSchedule.quantity_scheduled,
+            ProductionSchedule.status
+    ).filter(
+        ProductionSchedule.part_id.in_(part_ids),
+        ProductionSchedule.date >= earliest
+    ).all():
+        rows_by_part.setdefault(part_id, []).append((operation_id, slot_key, quantity, status))
+
+    calendar = get_calendar()
+    projections = {}
+    for plan in plans:
+        month_start_key = month_bounds(plan.month)[0].toordinal() * calendar.slots_per_day
+        rows = [row for row in rows_by_part.get(plan.part_id, []) if row[1] >= month_start_key]
+        projections[plan.plan_id] = project_plan(plan, chains.get(plan.part_id, []), rows,
+                                                 calendar, slot_minutes, today)
+    return projections
+
+
+def plan_projections(plans, slot_minutes, today=None):
+    """Projections for the given plans, cached per plan.
+
+    A plan's projection depends on its part's schedules, operations and plan
+    (all bumping the part's cache generation) and on machine eligibility, so
+    writes to other parts leave it cached. The generations of every plan are
+    read in one query and all misses are computed together.
+    """
+    today = today or date.today()
+    if not plans:
+        return []
+    cache = get_cache('projections')
+    names = sorted({f'part:{plan.part_id}' for plan in plans}) + ['eligibility']
+    generation_of = dict(zip(names, current_generations(names)))
+
+    def depends_on(plan):
+        return [f'part:{plan.part_id}', 'eligibility']
+
+    results, missing = {}, []
+    for plan in plans:
+        generations = tuple(generation_of[name] for name in depends_on(plan))
+        found, value = cache.lookup((plan.plan_id, today), generations)
+        if found:
+            results[plan.plan_id] = value
+        else:
+            missing.append((plan, generations))
+
+    if missing:
+        computed = _compute_projections([plan for plan, _ in missing], slot_minutes, today)
+        for plan, generations in missing:
+            cache.store((plan.plan_id, today), generations, computed[plan.plan_id])
+            results[plan.plan_id] = computed[plan.plan_id]
+    return [results[plan.plan_id] for plan in plans]
+
+
+def month_projections(month, slot_minutes, today=None):
+    """Projections for every plan of a month"""
+    month_start, month_end = month_bounds(month)
+    plans = MonthlyPlan.query.filter(
+        MonthlyPlan.month >= month_start,
+        MonthlyPlan.month <= month_end
+    ).order_by(MonthlyPlan.plan_id).all()
+    return plan_projections(plans, slot_minutes, today)
@@ -0,0 +1,182 @@
+from app import db
+from app.models.operation import Operation
+from app.models.production_schedule import ProductionSchedule
+from app.services.eligibility import get_eligibility
+from app.shop_calendar import get_calendar
+from datetime import date
+import calendar
+
+# Rows in these states have already been worked on and are never touched by re-planning
+LOCKED_STATUSES = ('completed', 'in_progress')
+
+
+def month_bounds(month):
+    """Return the first and last day of the month containing the given date"""
+    first = month.replace(day=1)
+    last = first.replace(day=calendar.monthrange(first.year, first.month)[1])
+    return first, last
+
+
+def _find_free_slot(machine_id, slot_keys, taken):
+    """Find the earliest of the given slot keys that is not in `taken` on a machine"""
+    for key in slot_keys:
+        if (machine_id, key) not in taken:
+            return machine_id, key
+    return None
+
+
+def compute_plan_diff(plan, today=None):
+    """Compare a monthly plan with the schedules already in its month.
+
+    For every operation of the part, the quantity still to be scheduled is the
+    planned quantity minus what is completed or in progress. Open rows
+    (planned/delayed) are then trimmed from the latest slot backwards, topped
+    up on the latest open row, or a new row is inserted when an operation has
+    no open row at all. Nothing is written; use apply_plan_diff for that.
+    """
+    month_start, month_end = month_bounds(plan.month)
+    search_start = max(month_start, today or date.today())
+
+    operations = Operation.query.filter_by(part_id=plan.part_id).order_by(Operation.sequence_number).all()
+    schedules = ProductionSchedule.query.filter(
+        ProductionSchedule.part_id == plan.part_id,
+        ProductionSchedule.date >= month_start,
+        ProductionSchedule.date <= month_end
+    ).order_by(
+        ProductionSchedule.slot_key,
+        ProductionSchedule.schedule_id
+    ).all()
+
+    diff = {
+        'plan_id': plan.plan_id,
+        'part_id': plan.part_id,
+        'month': month_start.isoformat(),
+        'planned_quantity': plan.planned_quantity,
+        'operations': [],
+        'inserts': [],
+        'updates': [],
+        'deletes': [],
+        'unplaced': []
+    }
+
+    # Slots already used on any machine this month, so inserts do not double-book
+    taken = set()
+    if operations:
+        machine_rows = db.session.query(
+            ProductionSchedule.machine_id,
+            ProductionSchedule.slot_key
+        ).filter(
+            ProductionSchedule.date >= month_start,
+            ProductionSchedule.date <= month_end
+        ).all()
+        taken = {tuple(row) for row in machine_rows}
+
+    shop_calendar = get_calendar()
+    working_keys = shop_calendar.working_slot_keys(search_start, month_end)
+    eligibility = get_eligibility()
+    # Latest slot of the operations so far; an insert must come strictly after it
+    previous_slot_key = None
+    for operation in operations:
+        rows = [s for s in schedules if s.operation_id == operation.operation_id]
+        locked_quantity = sum(s.quantity_scheduled for s in rows if s.status in LOCKED_STATUSES)
+        open_rows = [s for s in rows if s.status not in LOCKED_STATUSES]
+        open_quantity = sum(s.quantity_scheduled for s in open_rows)
+
+        required_open = max(0, plan.planned_quantity - locked_quantity)
+        delta = required_open - open_quantity
+
+        diff['operations'].append({
+            'operation_id': operation.operation_id,
+            'sequence_number': operation.sequence_number,
+            'locked_quantity': locked_quantity,
+            'open_quantity': open_quantity,
+            'required_quantity': required_open,
+            'delta': delta
+        })
+
+        if delta < 0:
+            # Trim the latest open rows first
+            excess = -delta
+            for row in reversed(open_rows):
+                if excess == 0:
+                    break
+                if row.quantity_scheduled <= excess:
+                    diff['deletes'].append({
+                        'schedule_id': row.schedule_id,
+                        'operation_id': row.operation_id,
+                        'quantity_scheduled': row.quantity_scheduled
+                    })
+                    excess -= row.quantity_scheduled
+                else:
+                    diff['updates'].append({
+                        'schedule_id': row.schedule_id,
+                        'operation_id': row.operation_id,
+                        'old_quantity': row.quantity_scheduled,
+                        'new_quantity': row.quantity_scheduled - excess
+                    })
+                    excess = 0
+        elif delta > 0:
+            if open_rows:
+                row = open_rows[-1]
+                diff['updates'].append({
+                    'schedule_id': row.schedule_id,
+                    'operation_id': row.operation_id,
+                    'old_quantity': row.quantity_scheduled,
+                    'new_quantity': row.quantity_scheduled + delta
+                })
+            else:
+                placed = None
+                candidate_keys = [key for key in working_keys
+                                  if previous_slot_key is None or key > previous_slot_key]
+                for machine_id in eligibility.eligible_machines(operation.operation_id):
+                    placed = _find_free_slot(machine_id, candidate_keys, taken)
+                    if placed:
+                        break
+
+                if placed:
+                    taken.add(placed)
+                    machine_id, slot_key = placed
+                    slot_date, shift_number, slot_number = shop_calendar.from_slot_key(slot_key)
+                    previous_slot_key = slot_key
+                    diff['inserts'].append({
+                        'date': slot_date.isoformat(),
+                        'shift_number': shift_number,
+                        'slot_number': slot_number,
+                        'part_id': plan.part_id,
+                        'operation_id': operation.operation_id,
+                        'machine_id': machine_id,
+                        'quantity_scheduled': delta,
+                        'status': 'planned'
+                    })
+                else:
+                    diff['unplaced'].append({
+                        'operation_id': operation.operation_id,
+                        'quantity': delta,
+                        'reason': 'No eligible machine with a free slot left in the month'
+                    })
+
+        if rows:
+            previous_slot_key = max(previous_slot_key or 0, rows[-1].slot_key)
+
+    return diff
+
+
+def apply_plan_diff(diff):
+    """Stage a diff from compute_plan_diff in the current session (caller commits)"""
+    delete_ids = [row['schedule_id'] for row in diff['deletes']]
+    if delete_ids:
+        ProductionSchedule.query.filter(
+            ProductionSchedule.schedule_id.in_(delete_ids),
+            ProductionSchedule.status.notin_(LOCKED_STATUSES)
+        ).delete(synchronize_session=False)
+
+    for update in diff['updates']:
+        ProductionSchedule.query.filter(
+            ProductionSchedule.schedule_id == update['schedule_id'],
+            ProductionSchedule.status.notin_(LOCKED_STATUSES)
+        ).update({'quantity_scheduled': update['new_quantity']}, synchronize_session=False)
+
+    for insert in diff['inserts']:
+        db.session.add(ProductionSchedule(
+            **{**insert, 'date': date.fromisoformat(insert['date'])}
+        ))
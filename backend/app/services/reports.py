@@ -0,0 +1,143 @@
+"""
+Daily production and overdue reports.
+
+Each report reads its schedules with one range query into a ScheduleFrame
+and builds every breakdown from group-bys over the arrays.
+
+- Daily: one day of live and archived rows, per machine (with slot
+  utilization) and per part, split by status. Cached per day against that
+  day's cache generation, so a closed day stays cached until one of its own
+  rows changes.
+- Overdue: open rows dated before `as_of`, live and archived, per status,
+  machine and part, with how many days overdue they are. Only completed rows
+  are archived today, but reading both keeps the reports on the same source.
+"""
+
+from app import db
+from app.cache import get_cache
+from app.services.dashboard import OPEN_STATUSES
+from app.services.schedule_frame import STATUSES, ScheduleFrame, table_records
+from app.shop_calendar import get_calendar
+from datetime import date, timedelta
+from sqlalchemy import text
+import numpy as np
+
+# Upper bound (inclusive, in days) of each overdue age bucket; the last is open-ended
+OVERDUE_AGE_BUCKETS = (7, 30, 90)
+
+
+def _totals(statuses):
+    return {'rows': 0, 'quantity': 0, 'statuses': {status: {'rows': 0, 'quantity': 0} for status in statuses}}
+
+
+def _add(totals, row):
+    totals['rows'] += row['count']
+    totals['quantity'] += row['quantity']
+    totals['statuses'][row['status']] = {'rows': row['count'], 'quantity': row['quantity']}
+
+
+def status_breakdown(frame, column, statuses=STATUSES):
+    """Rows and quantity per id of a frame column, split by status: {id: totals}"""
+    breakdown = {}
+    for row in table_records(frame.group_by(column, 'status')):
+        _add(breakdown.setdefault(row[f'{column}_id'], _totals(statuses)), row)
+    return breakdown
+
+
+def _overall(frame, statuses):
+    totals = _totals(statuses)
+    for row in table_records(frame.group_by('status')):
+        _add(totals, row)
+    return totals
+
+
+def _machines():
+    return db.session.execute(text(
+        "SELECT machine_id, name, type FROM machines ORDER BY machine_id"
+    )).mappings().all()
+
+
+def build_daily_report(day):
+    frame = ScheduleFrame.load(day, day, include_archived=True)
+    available = get_calendar().working_slot_count(day, day)
+
+    by_machine = status_breakdown(frame, 'machine')
+    # Distinct slots per machine: several rows can share a slot
+    slots = frame.group_by('machine', 'slot_key')
+    machine_ids, occupied = np.unique(slots['machine_id'], return_counts=True)
+    occupied_slots = dict(zip(machine_ids.tolist(), occupied.tolist()))
+
+    machines = []
+    for machine in _machines():
+        slots_used = occupied_slots.get(machine['machine_id'], 0)
+        machines.append({
+            'machine_id': machine['machine_id'],
+            'name': machine['name'],
+            'type': machine['type'],
+            'occupied_slots': slots_used,
+            'utilization': round(slots_used / available, 3) if available else 0.0,
+            **by_machine.get(machine['machine_id'], _totals(STATUSES))
+        })
+
+    return {
+        'date': day.isoformat(),
+        'available_slots_per_machine': available,
+        'totals': _overall(frame, STATUSES),
+        'machines': machines,
+        'parts': [{'part_id': part_id, **totals} for part_id, totals in sorted(status_breakdown(frame, 'part').items())]
+    }
+
+
+def daily_report(day):
+    """Production on a date per machine and part (cached until the day's schedules change)"""
+    return get_cache('reports').get_or_compute(
+        ('daily', day), [f'day:{day.isoformat()}', 'machines'],
+        lambda: build_daily_report(day)
+    )
+
+
+def _age_buckets(days_overdue):
+    bounds = (0,) + OVERDUE_AGE_BUCKETS
+    labels = [f'{low + 1}-{high}' for low, high in zip(bounds, bounds[1:])] + [f'>{bounds[-1]}']
+    counts = np.bincount(np.searchsorted(OVERDUE_AGE_BUCKETS, days_overdue), minlength=len(labels))
+    return dict(zip(labels, counts.tolist()))
+
+
+def build_overdue_report(as_of):
+    frame = ScheduleFrame.load(date_to=as_of - timedelta(days=1), statuses=OPEN_STATUSES, include_archived=True)
+    days_overdue = as_of.toordinal() - frame.day
+
+    # Oldest row per part: first row of each part after sorting by slot
+    ordered = frame.sort('part', 'slot_key')
+    first = np.flatnonzero(np.diff(ordered.part, prepend=-1))
+    oldest = dict(zip(ordered.part_ids[ordered.part[first]].tolist(), ordered.day[first].tolist()))
+
+    names = {machine['machine_id']: machine['name'] for machine in _machines()}
+    by_machine = status_breakdown(frame, 'machine', OPEN_STATUSES)
+    parts = []
+    for part_id, totals in sorted(status_breakdown(frame, 'part', OPEN_STATUSES).items()):
+        oldest_day = date.fromordinal(oldest[part_id])
+        parts.append({
+            'part_id': part_id,
+            'oldest_date': oldest_day.isoformat(),
+            'days_overdue': (as_of - oldest_day).days,
+            **totals
+        })
+
+    return {
+        'as_of': as_of.isoformat(),
+        'totals': _overall(frame, OPEN_STATUSES),
+        'max_days_overdue': int(days_overdue.max()) if len(frame) else 0,
+        'age_buckets': _age_buckets(days_overdue),
+        'machines': [{'machine_id': machine_id, 'name': names.get(machine_id), **totals}
+                     for machine_id, totals in sorted(by_machine.items())],
+        'parts': parts
+    }
+
+
+def overdue_report(as_of):
+    """Open rows dated before as_of, per status, machine and part (cached until schedules change)"""
+    return get_cache('reports').get_or_compute(
+        ('overdue', as_of), ['schedules', 'machines'],
+        lambda: build_overdue_report(as_of)
+    )
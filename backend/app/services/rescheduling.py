@@ -0,0 +1,263 @@
+from app import db
+from app.models.machine import Machine
+from app.models.machine_downtime import MachineDowntime
+from app.models.operation import Operation
+from app.models.production_schedule import ProductionSchedule
+from app.models.schedule_lock import ScheduleLock
+from app.services.eligibility import get_eligibility
+from app.shop_calendar import get_calendar
+from bisect import bisect_left, bisect_right
+from datetime import date
+from sqlalchemy import text
+
+# Filters accepted by shift_schedules and the column each one matches
+SHIFT_FILTERS = {
+    'machine_id': "machine_id = :machine_id",
+    'part_id': "part_id = :part_id",
+    'sub_batch_id': "sub_batch_id = :sub_batch_id",
+    'status': "status = :status",
+    'from': "date >= :from",
+    'to': "date <= :to",
+}
+
+# Rows the lock triggers would refuse to move; they are left out and reported instead
+LOCKED_ROW_REASON = 'Schedule is in a finalized range'
+LOCKED_TARGET_REASON = 'Target day is in a finalized range'
+_IN_LOCKED_RANGE = "EXISTS (SELECT 1 FROM schedule_locks l WHERE l.start_date <= {day} AND l.end_date >= {day})"
+
+
+def _shift_where(filters):
+    conditions, params = [], {}
+    for name, condition in SHIFT_FILTERS.items():
+        value = filters.get(name)
+        if value is not None:
+            conditions.append(condition)
+            params[name] = value.isoformat() if hasattr(value, 'isoformat') else value
+    return ' AND '.join(conditions), params
+
+
+def _skip_shift_rows(condition, reason):
+    """Take the rows of temp.shift_rows matching `condition` out of the move and report them"""
+    ids = db.session.execute(text(
+        f"SELECT schedule_id FROM temp.shift_rows WHERE {condition} ORDER BY schedule_id"
+    )).scalars().all()
+    if ids:
+        db.session.execute(text(f"DELETE FROM temp.shift_rows WHERE {condition}"))
+    return [{'schedule_id': schedule_id, 'reason': reason} for schedule_id in ids]
+
+
+def _moved_conflicts():
+    """Double-booked slots that now hold at least one row of temp.shift_rows"""
+    rows = db.session.execute(text(
+        "SELECT o.machine_id, o.date, o.shift_number, o.slot_number, o.count AS bookings "
+        "FROM slot_occupancy o JOIN ("
+        "  SELECT DISTINCT machine_id, date, shift_number, slot_number FROM production_schedules "
+        "  WHERE schedule_id IN (SELECT schedule_id FROM temp.shift_rows)"
+        ") m ON o.machine_id = m.machine_id AND o.date = m.date "
+        "AND o.shift_number = m.shift_number AND o.slot_number = m.slot_number "
+        "WHERE o.count > 1 ORDER BY o.date, o.machine_id, o.shift_number, o.slot_number"
+    )).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def shift_schedules(filters, offset_slots=0, target_machine_id=None):
+    """Move every schedule matching `filters` in one UPDATE (caller commits).
+
+    `offset_slots` moves rows by that many working slots of the shop calendar
+    (negative moves them earlier), so work never lands on a weekend or
+    holiday. `target_machine_id` moves them to another machine, which must
+    be eligible for every operation being moved. Rows in a finalized range,
+    or that would land on a locked day, stay where they are and are listed
+    under `unplaced`. Returns the number of rows moved and the double-booked
+    slots they now share. Raises ValueError for invalid input.
+    """
+    where, params = _shift_where(filters)
+    if not where:
+        raise ValueError("At least one filter is required: " + ', '.join(SHIFT_FILTERS))
+    if not offset_slots and target_machine_id is None:
+        raise ValueError("Provide offset_slots, target_machine_id or both")
+
+    if target_machine_id is not None:
+        if db.session.get(Machine, target_machine_id) is None:
+            raise ValueError(f"Machine {target_machine_id} not found")
+        ineligible = db.session.execute(text(
+            f"SELECT DISTINCT operation_id FROM production_schedules WHERE {where} "
+            f"AND operation_id NOT IN (SELECT operation_id FROM operation_machines WHERE machine_id = :target) "
+            f"ORDER BY operation_id"
+        ), {**params, 'target': target_machine_id}).scalars().all()
+        if ineligible:
+            raise ValueError(f"Machine {target_machine_id} is not eligible for operations {ineligible}")
+
+    db.session.execute(text("DROP TABLE IF EXISTS temp.shift_rows"))
+    db.session.execute(text("DROP TABLE IF EXISTS temp.shift_map"))
+    db.session.execute(text(
+        f"CREATE TEMP TABLE shift_rows AS SELECT schedule_id, slot_key, date FROM production_schedules WHERE {where}"
+    ), params)
+    unplaced = _skip_shift_rows(_IN_LOCKED_RANGE.format(day='date'), LOCKED_ROW_REASON)
+
+    assignments = ["machine_id = COALESCE(:target, machine_id)"]
+    source = "WHERE"
+    if offset_slots:
+        # Map each distinct source slot to its destination once; every row then moves through the map
+        calendar = get_calendar()
+        keys = db.session.execute(text(
+            "SELECT DISTINCT slot_key FROM temp.shift_rows WHERE slot_key IS NOT NULL"
+        )).scalars().all()
+        mapping = []
+        for key in keys:
+            new_key = calendar.add_working_slots(key, offset_slots)
+            new_date, shift_number, slot_number = calendar.from_slot_key(new_key)
+            mapping.append({'old_key': key, 'new_key': new_key, 'date': new_date.isoformat(),
+                            'shift_number': shift_number, 'slot_number': slot_number})
+        db.session.execute(text(
+            "CREATE TEMP TABLE shift_map (old_key INTEGER PRIMARY KEY, new_key INTEGER, "
+            "date TEXT, shift_number INTEGER, slot_number INTEGER)"
+        ))
+        if mapping:
+            db.session.execute(text(
+                "INSERT INTO temp.shift_map VALUES (:old_key, :new_key, :date, :shift_number, :slot_number)"
+            ), mapping)
+        unplaced += _skip_shift_rows(
+            f"slot_key IN (SELECT old_key FROM temp.shift_map WHERE {_IN_LOCKED_RANGE.format(day='date')})",
+            LOCKED_TARGET_REASON
+        )
+        assignments += ["slot_key = m.new_key", "date = m.date",
+                        "shift_number = m.shift_number", "slot_number = m.slot_number"]
+        source = "FROM temp.shift_map m WHERE m.old_key = production_schedules.slot_key AND"
+
+    moved = db.session.execute(text(
+        f"UPDATE production_schedules SET {', '.join(assignments)} {source} "
+        f"schedule_id IN (SELECT schedule_id FROM temp.shift_rows)"
+    ), {'target': target_machine_id}).rowcount
+
+    conflicts = _moved_conflicts()
+    db.session.execute(text("DROP TABLE IF EXISTS temp.shift_rows"))
+    db.session.execute(text("DROP TABLE IF EXISTS temp.shift_map"))
+    return {
+        'moved': moved,
+        'offset_slots': offset_slots,
+        'target_machine_id': target_machine_id,
+        'conflicted_slots': len(conflicts),
+        'conflicts': conflicts,
+        'unplaced': unplaced
+    }
+
+
+def _precedence_bounds(rows, schedule_id, sequence_number):
+    """Slot keys a row may use without passing an earlier or later operation of its sub-batch"""
+    lower, upper = None, None
+    for other_id, other_sequence, key in rows:
+        if other_id == schedule_id or key is None:
+            continue
+        if other_sequence < sequence_number:
+            lower = key + 1 if lower is None else max(lower, key + 1)
+        elif other_sequence > sequence_number:
+            upper = key - 1 if upper is None else min(upper, key - 1)
+    return lower, upper
+
+
+def reallocate_downtime(downtime, search_days, today=None):
+    """Move planned work off a machine for a downtime window (caller commits).
+
+    Every `planned` schedule on the machine inside the window goes to an
+    eligible alternate machine at the free working slot nearest its current
+    slot (earlier on ties), no more than `search_days` away, and never before
+    an earlier operation or after a later operation of the same sub-batch.
+    Rows in a finalized range stay put and locked days are never targets.
+    Rows that cannot be placed stay where they are and are reported. Loads
+    the alternates' bookings and downtimes once, then places in memory.
+    """
+    calendar = get_calendar()
+    first_key = calendar.slot_key(today or date.today(), 1, 1)
+    schedules = ProductionSchedule.query.filter(
+        ProductionSchedule.machine_id == downtime.machine_id,
+        ProductionSchedule.slot_key >= downtime.start_key,
+        ProductionSchedule.slot_key <= downtime.end_key,
+        ProductionSchedule.status == 'planned'
+    ).order_by(ProductionSchedule.slot_key, ProductionSchedule.schedule_id).all()
+
+    report = {'downtime': downtime.to_dict(), 'affected': len(schedules), 'reassigned': [], 'unplaced': []}
+    if not schedules:
+        return report
+
+    sequence_of = dict(db.session.query(Operation.operation_id, Operation.sequence_number).filter(
+        Operation.operation_id.in_({schedule.operation_id for schedule in schedules})
+    ).all())
+
+    # Every row of the affected sub-batches, for precedence bounds
+    sub_batches = {}
+    batch_ids = {schedule.sub_batch_id for schedule in schedules if schedule.sub_batch_id}
+    if batch_ids:
+        for schedule_id, part_id, sub_batch_id, sequence_number, key in db.session.query(
+                ProductionSchedule.schedule_id,
+                ProductionSchedule.part_id,
+                ProductionSchedule.sub_batch_id,
+                Operation.sequence_number,
+                ProductionSchedule.slot_key
+        ).join(Operation, Operation.operation_id == ProductionSchedule.operation_id).filter(
+            ProductionSchedule.sub_batch_id.in_(batch_ids)
+        ).all():
+            sub_batches.setdefault((part_id, sub_batch_id), []).append([schedule_id, sequence_number, key])
+
+    # Free working slots on the alternates within reach of any affected row
+    eligibility = get_eligibility()
+    alternates = {
+        schedule.operation_id: sorted(m for m in eligibility.eligible_machines(schedule.operation_id)
+                                      if m != downtime.machine_id)
+        for schedule in schedules
+    }
+    machine_ids = sorted({m for machines in alternates.values() for m in machines})
+    reach = search_days * calendar.slots_per_day
+    low_key = max(first_key, schedules[0].slot_key - reach)
+    high_key = schedules[-1].slot_key + reach
+    working = calendar.working_slot_keys(calendar.from_slot_key(low_key)[0], calendar.from_slot_key(high_key)[0])
+    locked_days = ScheduleLock.locked_days(min(schedules[0].date, calendar.from_slot_key(low_key)[0]),
+                                           calendar.from_slot_key(high_key)[0])
+    if locked_days:
+        working = [key for key in working if calendar.from_slot_key(key)[0] not in locked_days]
+    taken = set(MachineDowntime.down_slots(machine_ids, low_key, high_key))
+    if machine_ids:
+        taken.update(db.session.query(ProductionSchedule.machine_id, ProductionSchedule.slot_key).filter(
+            ProductionSchedule.machine_id.in_(machine_ids),
+            ProductionSchedule.slot_key >= low_key,
+            ProductionSchedule.slot_key <= high_key
+        ).all())
+
+    for schedule in schedules:
+        entry = {'schedule_id': schedule.schedule_id, 'operation_id': schedule.operation_id,
+                 'sub_batch_id': schedule.sub_batch_id}
+        if schedule.date in locked_days:
+            report['unplaced'].append({**entry, 'reason': LOCKED_ROW_REASON})
+            continue
+        machines = alternates[schedule.operation_id]
+        if not machines:
+            report['unplaced'].append({**entry, 'reason': 'No eligible alternate machine'})
+            continue
+
+        batch_rows = sub_batches.get((schedule.part_id, schedule.sub_batch_id), [])
+        lower, upper = _precedence_bounds(batch_rows, schedule.schedule_id, sequence_of[schedule.operation_id])
+        lo = max(k for k in (low_key, lower, schedule.slot_key - reach) if k is not None)
+        hi = min(k for k in (high_key, upper, schedule.slot_key + reach) if k is not None)
+        candidates = sorted(working[bisect_left(working, lo):bisect_right(working, hi)],
+                            key=lambda k: (abs(k - schedule.slot_key), k))
+
+        placement = next(((machine_id, key) for key in candidates for machine_id in machines
+                          if (machine_id, key) not in taken), None)
+        if placement is None:
+            report['unplaced'].append({**entry, 'reason': 'No free slot on an eligible machine within precedence bounds'})
+            continue
+
+        machine_id, key = placement
+        taken.add(placement)
+        for row in batch_rows:
+            if row[0] == schedule.schedule_id:
+                row[2] = key
+        entry['from'] = {'machine_id': schedule.machine_id, 'date': schedule.date.isoformat(),
+                         'shift_number': schedule.shift_number, 'slot_number': schedule.slot_number}
+        schedule.machine_id = machine_id
+        schedule.date, schedule.shift_number, schedule.slot_number = calendar.from_slot_key(key)
+        entry['to'] = {'machine_id': machine_id, 'date': schedule.date.isoformat(),
+                       'shift_number': schedule.shift_number, 'slot_number': schedule.slot_number}
+        report['reassigned'].append(entry)
+
+    return report
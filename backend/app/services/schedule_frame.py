@@ -0,0 +1,267 @@
+from app import db
+from app.models.production_schedule import ProductionSchedule
+from app.services.archive import HISTORY_VIEW, SCHEDULE_COLUMNS
+from app.shop_calendar import get_calendar
+from datetime import date
+from sqlalchemy import Date, column, literal_column, select, table
+import numpy as np
+
+STATUSES = ('planned', 'in_progress', 'completed', 'delayed')
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+# Array columns of a frame and their dtypes. machine, part, operation and
+# sub_batch hold indices into the frame's id dictionaries (sub_batch -1: none),
+# status holds an index into STATUSES.
+COLUMNS = {
+    'schedule_id': np.int64,
+    'slot_key': np.int64,
+    'machine': np.int32,
+    'part': np.int32,
+    'operation': np.int32,
+    'sub_batch': np.int32,
+    'quantity': np.int32,
+    'status': np.int8,
+}
+
+# Columns decoded back to ids (or names) when grouping
+_DICTIONARY_KEYS = {
+    'machine': ('machine_id', 'machine_ids'),
+    'part': ('part_id', 'part_ids'),
+    'operation': ('operation_id', 'operation_ids'),
+    'sub_batch': ('sub_batch_id', 'sub_batch_ids'),
+}
+
+
+def _history_table():
+    """The history view (live and archived schedules) as a lightweight table"""
+    return table(HISTORY_VIEW, *[column(name, Date) if name == 'date' else column(name)
+                                 for name in SCHEDULE_COLUMNS])
+
+
+def _encode(values, dtype):
+    """Dictionary-encode a column: (sorted distinct values, index of each row's value)"""
+    if not len(values):
+        return np.array([], dtype=object), np.array([], dtype=dtype)
+    ids, codes = np.unique(np.asarray(values), return_inverse=True)
+    return ids, codes.astype(dtype)
+
+
+class ScheduleFrame:
+    """Production schedules as parallel typed arrays.
+
+    Loaded from one column query without creating ORM objects: 37 bytes of
+    arrays per row instead of a SQLAlchemy instance each. Machine, part, operation
+    and sub-batch ids are dictionary-encoded; `machine_ids[frame.machine]`
+    gives each row's machine id. Filtering returns a new frame that shares
+    the dictionaries, so codes stay comparable between frames.
+    """
+
+    def __init__(self, columns, machine_ids, part_ids, operation_ids, sub_batch_ids, slots_per_day):
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.asarray(columns[name], dtype=dtype))
+        self.machine_ids = machine_ids
+        self.part_ids = part_ids
+        self.operation_ids = operation_ids
+        self.sub_batch_ids = sub_batch_ids
+        self.slots_per_day = slots_per_day
+
+    @classmethod
+    def load(cls, date_from=None, date_to=None, machine_ids=None, part_ids=None, statuses=None,
+             include_archived=False):
+        """Load the schedules matching the filters in a single query.
+
+        With include_archived the rows are read through the history view, so
+        archived (completed) rows are included and their slot key is computed.
+        """
+        calendar = get_calendar()
+        if include_archived:
+            source = _history_table()
+            slot_key = literal_column(calendar.slot_key_sql()).label('slot_key')
+        else:
+            source = ProductionSchedule.__table__
+            slot_key = source.c.slot_key
+        columns = source.c
+        query = select(
+            columns.schedule_id,
+            slot_key,
+            columns.machine_id,
+            columns.part_id,
+            columns.operation_id,
+            columns.sub_batch_id,
+            columns.quantity_scheduled,
+            columns.status
+        )
+        if date_from:
+            query = query.where(columns.date >= date_from)
+        if date_to:
+            query = query.where(columns.date <= date_to)
+        if machine_ids is not None:
+            query = query.where(columns.machine_id.in_(machine_ids))
+        if part_ids is not None:
+            query = query.where(columns.part_id.in_(part_ids))
+        if statuses is not None:
+            query = query.where(columns.status.in_(statuses))
+        return cls.from_rows(db.session.execute(query).all(), calendar.slots_per_day)
+
+    @classmethod
+    def from_rows(cls, rows, slots_per_day):
+        """Build a frame from (schedule_id, slot_key, machine_id, part_id, operation_id,
+        sub_batch_id, quantity, status) tuples"""
+        values = list(zip(*rows)) or [()] * 8
+        schedule_ids, slot_keys, machines, parts, operations, sub_batches, quantities, statuses = values
+
+        machine_ids, machine = _encode(machines, np.int32)
+        part_ids, part = _encode(parts, np.int32)
+        operation_ids, operation = _encode(operations, np.int32)
+        # None sorts apart from the strings: encode the rows that have a sub-batch only
+        has_batch = np.array([value is not None for value in sub_batches], dtype=bool)
+        sub_batch_ids, batch_codes = _encode([value for value in sub_batches if value is not None], np.int32)
+        sub_batch = np.full(len(sub_batches), -1, dtype=np.int32)
+        sub_batch[has_batch] = batch_codes
+        status = np.array([STATUS_CODES.get(value, -1) for value in statuses], dtype=np.int8)
+
+        return cls({
+            'schedule_id': schedule_ids,
+            'slot_key': [-1 if key is None else key for key in slot_keys],
+            'machine': machine,
+            'part': part,
+            'operation': operation,
+            'sub_batch': sub_batch,
+            'quantity': quantities,
+            'status': status,
+        }, machine_ids, part_ids, operation_ids, sub_batch_ids, slots_per_day)
+
+    def __len__(self):
+        return len(self.schedule_id)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the row arrays"""
+        return sum(getattr(self, name).nbytes for name in COLUMNS)
+
+    @property
+    def day(self):
+        """Date ordinal of each row"""
+        return self.slot_key // self.slots_per_day
+
+    # Selection
+
+    def take(self, selection):
+        """New frame with the rows picked by a boolean mask or an index array"""
+        return ScheduleFrame(
+            {name: getattr(self, name)[selection] for name in COLUMNS},
+            self.machine_ids, self.part_ids, self.operation_ids, self.sub_batch_ids, self.slots_per_day
+        )
+
+    @staticmethod
+    def _codes(ids, dictionary):
+        """Codes of the given ids in a sorted dictionary (ids that are absent match nothing)"""
+        if not len(dictionary):
+            return np.array([], dtype=np.int64)
+        ids = np.atleast_1d(ids)
+        positions = np.clip(np.searchsorted(dictionary, ids), 0, len(dictionary) - 1)
+        return positions[dictionary[positions] == ids]
+
+    def mask(self, machine_id=None, part_id=None, operation_id=None, status=None,
+             day_from=None, day_to=None):
+        """Boolean mask of the rows matching every given filter.
+
+        Id and status filters take one value or a list; day_from and day_to
+        are dates (inclusive).
+        """
+        selected = np.ones(len(self), dtype=bool)
+        for column, ids, dictionary in [
+            (self.machine, machine_id, self.machine_ids),
+            (self.part, part_id, self.part_ids),
+            (self.operation, operation_id, self.operation_ids),
+        ]:
+            if ids is not None:
+                selected &= np.isin(column, self._codes(ids, dictionary))
+        if status is not None:
+            statuses = [status] if isinstance(status, str) else status
+            selected &= np.isin(self.status, [STATUS_CODES[value] for value in statuses])
+        if day_from is not None:
+            selected &= self.slot_key >= day_from.toordinal() * self.slots_per_day
+        if day_to is not None:
+            selected &= self.slot_key < (day_to.toordinal() + 1) * self.slots_per_day
+        return selected
+
+    def filter(self, **filters):
+        """New frame with the rows matching the filters (see mask)"""
+        return self.take(self.mask(**filters))
+
+    def sort(self, *columns):
+        """New frame sorted by the given columns, first column first (stable)"""
+        keys = [getattr(self, column) if column != 'day' else self.day for column in reversed(columns)]
+        return self.take(np.lexsort(keys) if keys else np.arange(len(self)))
+
+    # Aggregation
+
+    def group_by(self, *columns):
+        """Row count and total quantity per distinct combination of the columns.
+
+        Columns are any frame column or 'day'. Returns a dict of arrays: one
+        per column with the decoded key (ids, status names, dates as
+        ordinals for 'day'), plus 'count' and 'quantity', in key order.
+        """
+        codes = [(self.day if column == 'day' else getattr(self, column)).astype(np.int64) for column in columns]
+        if not len(self):
+            groups, inverse = np.empty((len(columns), 0), dtype=np.int64), np.array([], dtype=np.int64)
+        elif not columns:
+            groups, inverse = np.empty((0, 1), dtype=np.int64), np.zeros(len(self), dtype=np.int64)
+        else:
+            # One int64 key per row (mixed radix over each column's range) sorts
+            # much faster than unique rows of a 2-D array
+            lows = [column.min() for column in codes]
+            sizes = [int(column.max() - low) + 1 for column, low in zip(codes, lows)]
+            keys = np.ravel_multi_index([column - low for column, low in zip(codes, lows)], sizes)
+            unique_keys, inverse = np.unique(keys, return_inverse=True)
+            groups = np.array(np.unravel_index(unique_keys, sizes), dtype=np.int64) \
+                + np.array(lows, dtype=np.int64).reshape(-1, 1)
+        table = {}
+        for column, keys in zip(columns, groups):
+            if column in _DICTIONARY_KEYS:
+                name, dictionary = _DICTIONARY_KEYS[column]
+                ids = getattr(self, dictionary)
+                table[name] = np.array([str(ids[k]) if k >= 0 else None for k in keys], dtype=object) \
+                    if column == 'sub_batch' else ids[keys]
+            elif column == 'status':
+                table['status'] = np.array([STATUSES[k] if k >= 0 else None for k in keys], dtype=object)
+            else:
+                table[column] = keys
+        table['count'] = np.bincount(inverse, minlength=groups.shape[1])
+        table['quantity'] = np.bincount(inverse, weights=self.quantity, minlength=groups.shape[1]).astype(np.int64)
+        return table
+
+    def conflicts(self):
+        """(machine_id, slot_key, bookings) of every slot booked more than once"""
+        table = self.group_by('machine', 'slot_key')
+        double = table['count'] > 1
+        return list(zip(table['machine_id'][double].tolist(), table['slot_key'][double].tolist(),
+                        table['count'][double].tolist()))
+
+    # Output
+
+    def records(self):
+        """Rows as dicts with ids and status names decoded"""
+        sub_batch_ids = self.sub_batch_ids
+        return [{
+            'schedule_id': int(schedule_id),
+            'slot_key': int(slot_key),
+            'date': date.fromordinal(int(slot_key) // self.slots_per_day),
+            'machine_id': int(self.machine_ids[machine]),
+            'part_id': int(self.part_ids[part]),
+            'operation_id': int(self.operation_ids[operation]),
+            'sub_batch_id': str(sub_batch_ids[sub_batch]) if sub_batch >= 0 else None,
+            'quantity_scheduled': int(quantity),
+            'status': STATUSES[status] if status >= 0 else None
+        } for schedule_id, slot_key, machine, part, operation, sub_batch, quantity, status in zip(
+            self.schedule_id, self.slot_key, self.machine, self.part, self.operation,
+            self.sub_batch, self.quantity, self.status)]
+
+
+def table_records(table):
+    """A group_by table as a list of dicts with plain Python values"""
+    names = list(table)
+    columns = [table[name].tolist() for name in names]
+    return [dict(zip(names, values)) for values in zip(*columns)]
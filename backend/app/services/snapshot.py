@@ -0,0 +1,232 @@
+"""
+Columnar schedule snapshots for analytics.
+
+Schedules (live and archived, through the history view) are joined with
+their operation times and machine type and read from a DB cursor in record
+batches, so a large range is never held as Python rows.
+
+- arrow (default): Arrow IPC file, one record batch per read. Open it with
+  `pyarrow.ipc.open_file(pyarrow.memory_map(path))` to map it without copying.
+- parquet: one row group per read.
+- npz: one NumPy array per column (`np.load(path)`). Each .npy entry needs its
+  full length up front, so the batches are concatenated per column first.
+  np.load cannot memory-map the entries of an .npz, so it is read into memory.
+
+Columns from the operation and machine joins and sub_batch_id can be NULL.
+Arrow and Parquet store those as nulls; npz has no nulls, so it fills them
+(0, NaN or '') and adds a `<column>_valid` mask for each.
+
+Arrow and Parquet need pyarrow (in requirements.txt); npz only needs NumPy.
+"""
+
+from app import db
+from app.services.archive import HISTORY_VIEW
+from app.shop_calendar import get_calendar
+from datetime import date
+from importlib.util import find_spec
+from sqlalchemy import text
+import io
+import zipfile
+import numpy as np
+
+FORMATS = {
+    'arrow': ('application/vnd.apache.arrow.file', 'arrow'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'npz': ('application/octet-stream', 'npz'),
+}
+
+# Rows per record batch (and per cursor read)
+BATCH_ROWS = 65536
+
+# Snapshot columns and their kind: int, float, date, str or bool
+COLUMNS = [
+    ('schedule_id', 'int'),
+    ('date', 'date'),
+    ('shift_number', 'int'),
+    ('slot_number', 'int'),
+    ('slot_key', 'int'),
+    ('part_id', 'int'),
+    ('operation_id', 'int'),
+    ('sequence_number', 'int'),
+    ('machining_time', 'float'),
+    ('loading_time', 'float'),
+    ('machine_id', 'int'),
+    ('machine_type', 'str'),
+    ('quantity_scheduled', 'int'),
+    ('sub_batch_id', 'str'),
+    ('status', 'str'),
+    ('archived', 'bool'),
+]
+
+# Columns that can be NULL: the LEFT JOINed operation and machine columns and sub_batch_id
+NULLABLE = ('sequence_number', 'machining_time', 'loading_time', 'machine_type', 'sub_batch_id')
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+def available(fmt):
+    """True when the packages a format needs are installed"""
+    return fmt == 'npz' or find_spec('pyarrow') is not None
+
+
+def _snapshot_sql(date_from, date_to):
+    conditions, params = [], {}
+    if date_from:
+        conditions.append("s.date >= :date_from")
+        params['date_from'] = date_from.isoformat()
+    if date_to:
+        conditions.append("s.date <= :date_to")
+        params['date_to'] = date_to.isoformat()
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # The archive has no slot_key column, so it is computed for every row
+    slot_key = get_calendar().slot_key_sql('s.date', 's.shift_number', 's.slot_number')
+    sql = (
+        f"SELECT s.schedule_id, s.date, s.shift_number, s.slot_number, {slot_key} AS slot_key, "
+        f"s.part_id, s.operation_id, o.sequence_number, o.machining_time, o.loading_time, "
+        f"s.machine_id, m.type AS machine_type, s.quantity_scheduled, s.sub_batch_id, s.status, s.archived "
+        f"FROM {HISTORY_VIEW} s "
+        f"LEFT JOIN operations o ON o.operation_id = s.operation_id "
+        f"LEFT JOIN machines m ON m.machine_id = s.machine_id "
+        f"{where} ORDER BY s.date, s.shift_number, s.slot_number, s.machine_id"
+    )
+    return sql, params
+
+
+def read_batches(date_from=None, date_to=None, batch_rows=BATCH_ROWS):
+    """Yield the snapshot as dicts of NumPy column arrays, batch_rows rows at a time"""
+    sql, params = _snapshot_sql(date_from, date_to)
+    result = db.session.execute(text(sql), params)
+    try:
+        for rows in result.partitions(batch_rows):
+            yield _columns(list(zip(*rows)))
+    finally:
+        result.close()
+
+
+def _columns(values):
+    columns = {}
+    for (name, kind), column in zip(COLUMNS, values):
+        if name in NULLABLE:
+            columns[f'{name}_valid'] = np.array([v is not None for v in column], dtype=np.bool_)
+        if kind == 'int':
+            columns[name] = np.array([v if v is not None else 0 for v in column], dtype=np.int64)
+        elif kind == 'float':
+            columns[name] = np.array([v if v is not None else np.nan for v in column], dtype=np.float64)
+        elif kind == 'bool':
+            columns[name] = np.array(column, dtype=np.bool_)
+        elif kind == 'date':
+            # Dates come back as YYYY-MM-DD strings
+            columns[name] = np.array(column, dtype='datetime64[D]')
+        else:
+            columns[name] = np.array([v if v is not None else '' for v in column], dtype=np.str_)
+    return columns
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only stream whose written bytes are collected and drained by the generator"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _arrow_schema(pa):
+    types = {'int': pa.int64(), 'float': pa.float64(), 'date': pa.date32(), 'str': pa.string(), 'bool': pa.bool_()}
+    return pa.schema([(name, types[kind]) for name, kind in COLUMNS])
+
+
+def _record_batch(pa, schema, columns):
+    arrays = []
+    for field, (name, kind) in zip(schema, COLUMNS):
+        values = columns[name]
+        mask = ~columns[f'{name}_valid'] if name in NULLABLE else None
+        if kind == 'date':
+            values = (values - _EPOCH).astype(np.int32)
+            arrays.append(pa.array(values, type=pa.int32()).cast(pa.date32()))
+        else:
+            arrays.append(pa.array(values, type=field.type, mask=mask))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _stream_arrow(batches, fmt):
+    import pyarrow as pa
+    schema = _arrow_schema(pa)
+    sink = _ChunkSink()
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, schema)
+        write = lambda batch: writer.write_table(pa.Table.from_batches([batch], schema=schema))
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+        write = writer.write_batch
+    for columns in batches:
+        write(_record_batch(pa, schema, columns))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def _npz_columns():
+    for name, kind in COLUMNS:
+        yield name, kind
+        if name in NULLABLE:
+            yield f'{name}_valid', 'bool'
+
+
+def _stream_npz(batches):
+    parts = {name: [] for name, _ in _npz_columns()}
+    for columns in batches:
+        for name, values in columns.items():
+            parts[name].append(values)
+
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for name, kind in _npz_columns():
+            chunks = parts.pop(name)
+            values = np.concatenate(chunks) if chunks else _empty(kind)
+            with archive.open(f'{name}.npy', mode='w', force_zip64=True) as entry:
+                np.lib.format.write_array(entry, values, allow_pickle=False)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _empty(kind):
+    dtypes = {'int': np.int64, 'float': np.float64, 'bool': np.bool_, 'date': 'datetime64[D]', 'str': np.str_}
+    return np.array([], dtype=dtypes[kind])
+
+
+def stream_snapshot(fmt, date_from=None, date_to=None, batch_rows=BATCH_ROWS):
+    """Yield the snapshot file in chunks of bytes, one per record batch read.
+
+    Raises ValueError for an unknown format. Check `available(fmt)` first:
+    arrow and parquet raise ImportError without pyarrow.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    batches = read_batches(date_from, date_to, batch_rows)
+    if fmt == 'npz':
+        return _stream_npz(batches)
+    return _stream_arrow(batches, fmt)
+
+
+def snapshot_filename(fmt, date_from=None, date_to=None):
+    start = date_from.isoformat() if date_from else 'start'
+    end = (date_to or date.today()).isoformat()
+    return f"schedule_snapshot_{start}_{end}.{FORMATS[fmt][1]}"
@@ -0,0 +1,169 @@
+from app import db
+from datetime import date, timedelta
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import text
+import click
+
+
+class ShopCalendar:
+    """Shifts, slots and working days of the shop, and the integer slot key.
+
+    Every slot maps to one integer:
+
+        slot_key = date.toordinal() * slots_per_day
+                   + (shift_number - 1) * slots_per_shift + (slot_number - 1)
+
+    so slots sort by key, all slots of a day are a contiguous key range and
+    the slot after key k on the same day is k + 1. Keys depend on the shift
+    and slot counts; after changing them run `flask rebuild-slot-keys`.
+    Working days and holidays only decide which slots the scheduler may use.
+    """
+
+    def __init__(self, shifts_per_day, slots_per_shift, slot_minutes, working_days, holidays=()):
+        self.shifts_per_day = shifts_per_day
+        self.slots_per_shift = slots_per_shift
+        self.slots_per_day = shifts_per_day * slots_per_shift
+        self.slot_minutes = slot_minutes
+        self.working_days = frozenset(working_days)
+        self.holidays = frozenset(
+            day if isinstance(day, date) else date.fromisoformat(day) for day in holidays
+        )
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            shifts_per_day=config['SHIFTS_PER_DAY'],
+            slots_per_shift=config['SLOTS_PER_SHIFT'],
+            slot_minutes=config['SLOT_MINUTES'],
+            working_days=config['WORKING_DAYS'],
+            holidays=config.get('HOLIDAYS', ())
+        )
+
+    # Validation
+
+    @staticmethod
+    def _choices(count):
+        if count == 1:
+            return "1"
+        if count == 2:
+            return "1 or 2"
+        return f"between 1 and {count}"
+
+    def valid_shift(self, shift_number):
+        return isinstance(shift_number, int) and 1 <= shift_number <= self.shifts_per_day
+
+    def valid_slot(self, slot_number):
+        return isinstance(slot_number, int) and 1 <= slot_number <= self.slots_per_shift
+
+    @property
+    def shift_error(self):
+        return f"Shift number must be {self._choices(self.shifts_per_day)}"
+
+    @property
+    def slot_error(self):
+        return f"Slot number must be {self._choices(self.slots_per_shift)}"
+
+    # Slot keys
+
+    def slot_key(self, day, shift_number, slot_number):
+        return (day.toordinal() * self.slots_per_day
+                + (shift_number - 1) * self.slots_per_shift
+                + (slot_number - 1))
+
+    def from_slot_key(self, key):
+        """Return (date, shift_number, slot_number) for a slot key"""
+        ordinal, index = divmod(key, self.slots_per_day)
+        shift_index, slot_index = divmod(index, self.slots_per_shift)
+        return date.fromordinal(ordinal), shift_index + 1, slot_index + 1
+
+    def day_keys(self, start, end):
+        """Half-open key range [first, last) covering the dates start..end"""
+        return start.toordinal() * self.slots_per_day, (end.toordinal() + 1) * self.slots_per_day
+
+    def slot_key_sql(self, date_column='date', shift_column='shift_number', slot_column='slot_number'):
+        """The slot key as a SQLite expression (julianday of 0001-01-01 is 1721425.5)"""
+        return (
+            f"(CAST(julianday({date_column}) - 1721424.5 AS INTEGER) * {self.slots_per_day} "
+            f"+ ({shift_column} - 1) * {self.slots_per_shift} + ({slot_column} - 1))"
+        )
+
+    # Working time
+
+    def is_working_day(self, day):
+        return day.weekday() in self.working_days and day not in self.holidays
+
+    def working_slot_keys(self, start, end):
+        """Keys of every working slot from date start to date end (inclusive), in order"""
+        keys = []
+        day = start
+        while day <= end:
+            if self.is_working_day(day):
+                first = day.toordinal() * self.slots_per_day
+                keys.extend(range(first, first + self.slots_per_day))
+            day += timedelta(days=1)
+        return keys
+
+    def working_slot_count(self, start, end):
+        days = sum(1 for offset in range((end - start).days + 1)
+                   if self.is_working_day(start + timedelta(days=offset)))
+        return days * self.slots_per_day
+
+    def next_slot_keys(self, key, count):
+        """The `count` working slots after `key`"""
+        return self._walk(key, count, 1) if count > 0 else []
+
+    def add_working_slots(self, key, offset):
+        """Move a slot key by `offset` working slots (negative moves back)"""
+        if offset == 0:
+            return key
+        return self._walk(key, abs(offset), 1 if offset > 0 else -1)[-1]
+
+    def _walk(self, key, count, step):
+        if not self.working_days:
+            raise ValueError("The shop calendar has no working days")
+        keys = []
+        while len(keys) < count:
+            key += step
+            day = date.fromordinal(key // self.slots_per_day)
+            if self.is_working_day(day):
+                keys.append(key)
+            elif step > 0:
+                key = (day.toordinal() + 1) * self.slots_per_day - 1  # skip to the end of the day
+            else:
+                key = day.toordinal() * self.slots_per_day  # skip to the start of the day
+        return keys
+
+    def weekly_minutes(self):
+        """Nominal working minutes per machine in a week without holidays"""
+        return len(self.working_days) * self.slots_per_day * self.slot_minutes
+
+
+def get_calendar():
+    """Return the app's shop calendar, built from its config on first use"""
+    calendar = current_app.extensions.get('shop_calendar')
+    if calendar is None:
+        calendar = ShopCalendar.from_config(current_app.config)
+        current_app.extensions['shop_calendar'] = calendar
+    return calendar
+
+
+def rebuild_slot_keys(calendar):
+    """Recompute every schedule's and downtime's slot keys with the given calendar (caller commits)"""
+    db.session.execute(text(
+        f"UPDATE machine_downtimes SET "
+        f"start_key = {calendar.slot_key_sql('start_date', 'start_shift', 'start_slot')}, "
+        f"end_key = {calendar.slot_key_sql('end_date', 'end_shift', 'end_slot')}"
+    ))
+    return db.session.execute(text(
+        f"UPDATE production_schedules SET slot_key = {calendar.slot_key_sql()}"
+    )).rowcount
+
+
+@click.command('rebuild-slot-keys')
+@with_appcontext
+def rebuild_slot_keys_command():
+    """Recompute slot keys after changing shifts per day or slots per shift."""
+    updated = rebuild_slot_keys(get_calendar())
+    db.session.commit()
+    click.echo(f"Recomputed slot keys for {updated} schedules.")
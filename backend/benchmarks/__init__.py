@@ -0,0 +1 @@
+# Benchmark suite: run from the backend directory, e.g. python -m benchmarks.bench_throughput
@@ -0,0 +1,62 @@
+"""
+Auto-scheduler scaling: a month-wide run on the synthetic shop with 1..N
+worker processes.
+
+    python -m benchmarks.bench_auto_schedule --processes 1 2 4
+
+Runs are dry runs, so every run schedules the same month from the same state.
+The shop is seeded with part families (each part stays on one machine type),
+giving one independent machine group per type; how far a run can scale is
+bounded by the number of groups that can be solved side by side.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_seeded_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time month-wide auto-scheduling runs")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--parts", type=int, default=300)
+    args = parser.parse_args()
+
+    from app import db
+    from app.services.auto_scheduler import auto_schedule_month
+
+    # Plans for a future month with only a day of schedules seeded into it
+    month = date(date.today().year + 1, 1, 1)
+    workdir = tempfile.mkdtemp(prefix="bench_auto_schedule_")
+    try:
+        app = create_seeded_app(workdir, parts=args.parts, days=1, end=month, part_families=True)
+        with app.app_context():
+            print(f"cpus: {os.cpu_count()}")
+            baseline = None
+            for processes in args.processes:
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    result = auto_schedule_month(month, app.config, processes=processes, dry_run=True, today=month)
+                    timings.append(time.perf_counter() - started)
+                median = statistics.median(timings)
+                baseline = baseline or median
+                print(f"processes={result['processes']:>2}  components={result['components']}  "
+                      f"levels={result['levels']}  rows={result['schedules_created']:>6}  "
+                      f"median={median * 1000:8.1f} ms  speedup={baseline / median:4.2f}x")
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Monte Carlo capacity simulation on the synthetic shop: 10k forecast scenarios
+over two months with 1..N sampler processes.
+
+    python -m benchmarks.bench_capacity --scenarios 10000 --processes 1 2 4
+
+Target: 10k scenarios for two months in under 5 seconds. Every run uses the
+same seed, so all process counts must return identical probabilities.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_seeded_app
+
+TARGET_SECONDS = 5.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time POST /capacity/simulate")
+    parser.add_argument("--scenarios", type=int, default=10000)
+    parser.add_argument("--months", type=int, default=2)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_capacity_")
+    try:
+        app = create_seeded_app(workdir, days=30)
+        client = app.test_client()
+        body = {"start": date.today().replace(day=1).isoformat(), "months": args.months,
+                "scenarios": args.scenarios, "seed": 7}
+
+        results, failed = {}, False
+        for processes in args.processes:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                response = client.post("/capacity/simulate", json={**body, "processes": processes})
+                timings.append(time.perf_counter() - started)
+                assert response.status_code == 200
+            results[processes] = response.get_json()["machine_types"]
+            median = statistics.median(timings)
+            failed = failed or median >= TARGET_SECONDS
+            print(f"processes={processes}: median {median:.2f} s, max {max(timings):.2f} s "
+                  f"(target < {TARGET_SECONDS:.0f} s)")
+
+        reference = next(iter(results.values()))
+        assert all(result == reference for result in results.values()), "results differ between process counts"
+        for machine_type, stats in reference.items():
+            print(f"{machine_type}: max weekly overload probability {max(stats['overload_probability']):.3f}")
+        with app.app_context():
+            from app import db
+            db.engine.dispose()
+        if failed:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
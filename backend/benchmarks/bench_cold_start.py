@@ -0,0 +1,77 @@
+"""
+Cold start: time from a fresh interpreter importing the app to the first
+request served, against an existing database at the current schema.
+
+    python -m benchmarks.bench_cold_start --runs 10
+
+Each run is a separate process, so imports are never cached in memory.
+Target: well under one second.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from benchmarks.synthetic import create_seeded_app
+
+TARGET_SECONDS = 1.0
+
+PROBE = """
+import time
+started = time.perf_counter()
+from app import create_app
+app = create_app()
+imported = time.perf_counter()
+response = app.test_client().get("/")
+assert response.status_code == 200
+served = time.perf_counter()
+print(f"{imported - started:.4f} {served - started:.4f}")
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import-to-first-request time")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_cold_start_")
+    try:
+        app = create_seeded_app(workdir, days=365)
+        with app.app_context():
+            from app import db
+            db.engine.dispose()
+
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'scheduling.db')}",
+            ARCHIVE_DATABASE_PATH=os.path.join(workdir, "scheduling_archive.db"),
+        )
+        app_ready, first_request = [], []
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env,
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            app_ready.append(float(output[0]))
+            first_request.append(float(output[1]))
+
+        median = statistics.median(first_request)
+        print(f"runs: {args.runs}")
+        print(f"create_app() median: {statistics.median(app_ready) * 1000:.1f} ms")
+        print(f"first request served median: {median * 1000:.1f} ms "
+              f"(max {max(first_request) * 1000:.1f} ms, target < {TARGET_SECONDS * 1000:.0f} ms)")
+        if median >= TARGET_SECONDS:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Dashboard latency on a year of synthetic history.
+
+    python -m benchmarks.bench_dashboard --requests 50
+
+Cold: the first request after a schedule write (every tile reading schedules
+is recomputed). Warm: repeated requests served from the tile cache.
+Target: under 50 ms either way.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_seeded_app
+
+TARGET_SECONDS = 0.05
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time GET /dashboard")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    from app import db
+    from app.models.production_schedule import ProductionSchedule
+
+    workdir = tempfile.mkdtemp(prefix="bench_dashboard_")
+    try:
+        app = create_seeded_app(workdir, days=args.days)
+        client = app.test_client()
+        url = f"/dashboard?date={date.today().isoformat()}"
+
+        def timed():
+            started = time.perf_counter()
+            response = client.get(url)
+            assert response.status_code == 200
+            return time.perf_counter() - started
+
+        with app.app_context():
+            schedule = ProductionSchedule.query.filter_by(status='planned').first()
+
+        cold, warm = [], []
+        for i in range(args.requests):
+            # Touch one schedule so the next request recomputes
+            with app.app_context():
+                db.session.get(ProductionSchedule, schedule.schedule_id).quantity_scheduled = 10 + i % 5
+                db.session.commit()
+            cold.append(timed())
+            warm.append(timed())
+
+        for label, timings in [("cold", cold), ("warm", warm)]:
+            print(f"{label}: median {statistics.median(timings) * 1000:.1f} ms, "
+                  f"max {max(timings) * 1000:.1f} ms (target < {TARGET_SECONDS * 1000:.0f} ms)")
+        with app.app_context():
+            db.engine.dispose()
+        if statistics.median(cold) >= TARGET_SECONDS:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Machine breakdown reallocation on a year of synthetic schedules.
+
+    python -m benchmarks.bench_downtime --runs 20
+
+Each run records a one-day downtime for a different machine and future day
+and reallocates that machine's planned work. Target: under 1 s.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_seeded_app
+
+TARGET_SECONDS = 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time POST /machines/<id>/downtime")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    from app import db
+    from app.models.machine import Machine
+    from app.shop_calendar import get_calendar
+
+    workdir = tempfile.mkdtemp(prefix="bench_downtime_")
+    try:
+        # Half of the history lies ahead, so there is planned work to move
+        app = create_seeded_app(workdir, days=args.days, end=date.today() + timedelta(days=args.days // 2))
+        client = app.test_client()
+        with app.app_context():
+            machine_ids = [row[0] for row in db.session.query(Machine.machine_id).order_by(Machine.machine_id)]
+            calendar = get_calendar()
+        days = []
+        day = date.today() + timedelta(days=7)
+        while len(days) < args.runs:
+            if calendar.is_working_day(day):
+                days.append(day)
+            day += timedelta(days=1)
+
+        timings, moved, affected = [], 0, 0
+        for i, day in enumerate(days):
+            started = time.perf_counter()
+            response = client.post(f"/machines/{machine_ids[i % len(machine_ids)]}/downtime", json={
+                "start_date": day.isoformat(), "end_date": day.isoformat()
+            })
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 201
+            report = response.get_json()
+            affected += report["affected"]
+            moved += len(report["reassigned"])
+
+        print(f"{affected / len(days):.1f} planned rows per machine-day, {moved / max(affected, 1):.0%} reassigned")
+        print(f"median {statistics.median(timings) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms "
+              f"(target < {TARGET_SECONDS * 1000:.0f} ms)")
+        with app.app_context():
+            db.engine.dispose()
+        if statistics.median(timings) >= TARGET_SECONDS:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
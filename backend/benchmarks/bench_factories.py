@@ -0,0 +1,79 @@
+"""
+Cross-factory aggregates over several synthetic factories.
+
+    python -m benchmarks.bench_factories --factories 4 --requests 10
+
+Seeds a year of history into every factory (the default database plus
+--factories - 1 shards), then times GET /factories/utilization and
+GET /factories/plan-vs-actual with caches cleared before every request, with
+one thread (factories queried in turn) and one thread per factory.
+Target: the fan-out no slower than querying the factories in turn.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the cross-factory aggregate endpoints")
+    parser.add_argument("--factories", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from app.factories import factory_context, factory_names
+
+    workdir = tempfile.mkdtemp(prefix="bench_factories_")
+    try:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(workdir, "scheduling.db")}',
+            'ARCHIVE_DATABASE_PATH': os.path.join(workdir, "scheduling_archive.db"),
+            'FACTORIES': {f'plant{i}': os.path.join(workdir, f"plant{i}.db") for i in range(1, args.factories)},
+        })
+        for i, name in enumerate(factory_names(app)):
+            with factory_context(app, name):
+                seed(days=args.days, seed=42 + i)
+
+        client = app.test_client()
+        today = date.today()
+        urls = {
+            "utilization": f"/factories/utilization?date={today}",
+            "plan vs actual": f"/factories/plan-vs-actual?date={today}",
+        }
+        timings = {}
+        for threads in (1, None):
+            app.config['FACTORY_THREADS'] = threads
+            for label, url in urls.items():
+                name = f"{label}, {threads or args.factories} thread(s)"
+                timings[name] = []
+                for _ in range(args.requests):
+                    for cache in app.extensions.get('caches', {}).values():
+                        cache.clear()
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    timings[name].append(time.perf_counter() - started)
+                    assert response.status_code == 200 and not response.get_json()["errors"]
+
+        for label, values in timings.items():
+            print(f"{label}: median {statistics.median(values) * 1000:.1f} ms, max {max(values) * 1000:.1f} ms")
+
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Serialization of a large schedule list: 50k rows before and after the JSON
+provider change.
+
+    python -m benchmarks.bench_json --rows 50000
+
+before: ORM objects, to_dict() with isoformat() per row, Flask's default
+provider. after: ProductionSchedule.rows() (plain tuples, native dates) and
+the app's provider (orjson when installed). Times cover loading the rows and
+building the response.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_seeded_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time JSON responses for a large schedule list")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from flask.json.provider import DefaultJSONProvider
+    from app import db, json_provider
+    from app.models.production_schedule import ProductionSchedule
+
+    workdir = tempfile.mkdtemp(prefix="bench_json_")
+    try:
+        # About 56 rows per day at the default density
+        app = create_seeded_app(workdir, days=max(1, args.rows // 50))
+        default_provider = DefaultJSONProvider(app)
+
+        def load_objects():
+            return [schedule.to_dict() for schedule in ProductionSchedule.query.limit(args.rows).all()]
+
+        def load_rows():
+            return ProductionSchedule.rows(ProductionSchedule.query.limit(args.rows))
+
+        with app.test_request_context():
+            results = {}
+            for label, load_schedules, provider in [("before", load_objects, default_provider),
+                                                    ("after", load_rows, app.json)]:
+                load, encode = [], []
+                for _ in range(args.repeat):
+                    db.session.expunge_all()
+                    started = time.perf_counter()
+                    rows = load_schedules()
+                    loaded = time.perf_counter()
+                    response = provider.response(rows)
+                    encode.append(time.perf_counter() - loaded)
+                    load.append(loaded - started)
+                results[label] = response.get_json()
+                print(f"{label}: {len(rows)} rows, load {statistics.median(load) * 1000:.0f} ms, "
+                      f"encode {statistics.median(encode) * 1000:.0f} ms, "
+                      f"total {statistics.median([a + b for a, b in zip(load, encode)]) * 1000:.0f} ms")
+            assert results["before"] == results["after"], "responses differ"
+            print(f"encoder: {'orjson' if json_provider.orjson else 'stdlib'}")
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
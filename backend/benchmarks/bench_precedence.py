@@ -0,0 +1,75 @@
+"""
+Precedence checks on a year of synthetic history.
+
+    python -m benchmarks.bench_precedence --requests 20
+
+Times GET /production-schedules/precedence-violations over the whole year and
+over one month, and the per-sub-batch check run by a schedule update.
+Target: the whole year in under 250 ms.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_seeded_app
+
+TARGET_SECONDS = 0.25
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the sub-batch precedence checker")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    from app import db
+    from app.models.production_schedule import ProductionSchedule
+    from app.services.precedence import sub_batch_violations
+
+    workdir = tempfile.mkdtemp(prefix="bench_precedence_")
+    try:
+        app = create_seeded_app(workdir, days=args.days)
+        client = app.test_client()
+        today = date.today()
+        urls = {
+            "year": f"/production-schedules/precedence-violations?from={today - timedelta(days=args.days)}&to={today}",
+            "month": f"/production-schedules/precedence-violations?from={today.replace(day=1)}&to={today}",
+        }
+
+        timings = {}
+        for label, url in urls.items():
+            timings[label] = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                response = client.get(url)
+                timings[label].append(time.perf_counter() - started)
+                assert response.status_code == 200
+            print(f"{label}: {response.get_json()['violation_count']} violations")
+
+        with app.app_context():
+            row = ProductionSchedule.query.filter(ProductionSchedule.sub_batch_id.isnot(None)).first()
+            timings["sub-batch"] = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                sub_batch_violations(row.part_id, row.sub_batch_id)
+                timings["sub-batch"].append(time.perf_counter() - started)
+            db.engine.dispose()
+
+        for label, values in timings.items():
+            print(f"{label}: median {statistics.median(values) * 1000:.1f} ms, max {max(values) * 1000:.1f} ms")
+        if statistics.median(timings["year"]) >= TARGET_SECONDS:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Bulk plan projections on a year of synthetic history.
+
+    python -m benchmarks.bench_projections --requests 20
+
+Cold: the first request after a schedule write to one part (one plan is
+recomputed). Warm: repeated requests served from the per-plan cache. First:
+every plan computed. Target: under 100 ms after a write.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_seeded_app
+
+TARGET_SECONDS = 0.1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time GET /monthly-plans/projections")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    from app import db
+    from app.models.production_schedule import ProductionSchedule
+
+    workdir = tempfile.mkdtemp(prefix="bench_projections_")
+    try:
+        app = create_seeded_app(workdir, days=args.days)
+        client = app.test_client()
+        url = f"/monthly-plans/projections?month={date.today().replace(day=1).isoformat()}"
+
+        def timed():
+            started = time.perf_counter()
+            response = client.get(url)
+            assert response.status_code == 200
+            return time.perf_counter() - started, response.get_json()
+
+        first, result = timed()
+        with app.app_context():
+            schedule = ProductionSchedule.query.filter_by(status='planned').first()
+
+        cold, warm = [], []
+        for i in range(args.requests):
+            # Touch one part's schedule so the next request recomputes that part's plan
+            with app.app_context():
+                db.session.get(ProductionSchedule, schedule.schedule_id).quantity_scheduled = 10 + i % 5
+                db.session.commit()
+            cold.append(timed()[0])
+            warm.append(timed()[0])
+
+        print(f"{result['plans']} plans, {result['late']} projected late")
+        print(f"first: {first * 1000:.1f} ms (every plan computed)")
+        for label, timings in [("cold", cold), ("warm", warm)]:
+            print(f"{label}: median {statistics.median(timings) * 1000:.1f} ms, "
+                  f"max {max(timings) * 1000:.1f} ms (target < {TARGET_SECONDS * 1000:.0f} ms)")
+        with app.app_context():
+            db.engine.dispose()
+        if statistics.median(cold) >= TARGET_SECONDS:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Daily production and overdue reports on a year of synthetic history.
+
+    python -m benchmarks.bench_reports --requests 20
+
+Times GET /reports/daily for a past day and GET /reports/overdue as of today
+(one past row in ten reopened as delayed),
+each computed from scratch (report cache cleared before every request) and
+served from the cache.
+Target: each report computed in under 50 ms.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_seeded_app
+from sqlalchemy import text
+
+TARGET_SECONDS = 0.05
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the daily and overdue reports")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    from app import db
+    from app.cache import get_cache
+
+    workdir = tempfile.mkdtemp(prefix="bench_reports_")
+    try:
+        app = create_seeded_app(workdir, days=args.days)
+        client = app.test_client()
+        today = date.today()
+        urls = {
+            "daily": f"/reports/daily?date={today - timedelta(days=30)}",
+            "overdue": f"/reports/overdue?as_of={today}",
+        }
+
+        timings = {}
+        with app.app_context():
+            # The synthetic history is all completed: reopen one past row in ten
+            db.session.execute(text(
+                "UPDATE production_schedules SET status = 'delayed' WHERE date < :today AND schedule_id % 10 = 0"
+            ), {"today": today.isoformat()})
+            db.session.commit()
+            cache = get_cache("reports")
+            for label, url in urls.items():
+                for cached in (False, True):
+                    name = f"{label} ({'cached' if cached else 'computed'})"
+                    timings[name] = []
+                    for _ in range(args.requests):
+                        if not cached:
+                            cache.clear()
+                        started = time.perf_counter()
+                        response = client.get(url)
+                        timings[name].append(time.perf_counter() - started)
+                        assert response.status_code == 200
+                print(f"{label}: {response.get_json()['totals']['rows']} rows")
+            db.engine.dispose()
+
+        for label, values in timings.items():
+            print(f"{label}: median {statistics.median(values) * 1000:.1f} ms, max {max(values) * 1000:.1f} ms")
+        if max(statistics.median(timings[f"{label} (computed)"]) for label in urls) >= TARGET_SECONDS:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+ScheduleFrame vs ORM instances on a large synthetic schedule.
+
+    python -m benchmarks.bench_schedule_frame --days 1825
+
+Loads every schedule both ways and reports memory allocated (tracemalloc)
+and median load time, then times a filter and a group-by on the frame.
+Target: 100k rows in a few MB.
+"""
+
+import argparse
+import gc
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_seeded_app
+
+
+def allocated(load):
+    """(result, bytes still allocated, peak bytes) of a load, under tracemalloc"""
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def median_ms(operation, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ScheduleFrame with ORM instances")
+    parser.add_argument("--days", type=int, default=1825)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from app import db
+    from app.models.production_schedule import ProductionSchedule
+    from app.services.schedule_frame import ScheduleFrame
+
+    workdir = tempfile.mkdtemp(prefix="bench_schedule_frame_")
+    try:
+        app = create_seeded_app(workdir, days=args.days)
+        with app.app_context():
+            schedules, orm_kept, orm_peak = allocated(lambda: ProductionSchedule.query.all())
+            rows = len(schedules)
+            del schedules
+            db.session.expunge_all()
+            frame, frame_kept, frame_peak = allocated(ScheduleFrame.load)
+
+            def load_orm():
+                ProductionSchedule.query.all()
+                db.session.expunge_all()
+
+            print(f"{rows} rows")
+            print(f"ORM:   load median {median_ms(load_orm, args.repeat):.0f} ms, "
+                  f"{orm_kept / 1e6:.1f} MB kept, peak {orm_peak / 1e6:.1f} MB")
+            print(f"frame: load median {median_ms(ScheduleFrame.load, args.repeat):.0f} ms, "
+                  f"{frame_kept / 1e6:.1f} MB kept ({frame.nbytes / 1e6:.1f} MB of arrays), "
+                  f"peak {frame_peak / 1e6:.1f} MB")
+
+            machine_id = int(frame.machine_ids[0])
+            for label, operation in [
+                ("filter machine + open statuses", lambda: frame.filter(machine_id=machine_id, status=["planned", "delayed"])),
+                ("group by machine, status", lambda: frame.group_by("machine", "status")),
+                ("group by part, day", lambda: frame.group_by("part", "day")),
+                ("sort by machine, slot", lambda: frame.sort("machine", "slot_key")),
+            ]:
+                print(f"{label}: median {median_ms(operation, args.repeat):.1f} ms")
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+By-date and by-machine schedule views on a year of synthetic history.
+
+    python -m benchmarks.bench_schedule_views --requests 50
+
+Times GET /production-schedules/by-date/<date> and
+GET /production-schedules/by-machine/<id>?date= (and without a date) when
+computed (view cache cleared before every request) and when served from the
+cache, then reports the hit rate of a grid-like mix with a write every ten reads.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_seeded_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the cached schedule views")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    from app import db
+    from app.cache import get_cache
+    from app.models.production_schedule import ProductionSchedule
+
+    workdir = tempfile.mkdtemp(prefix="bench_schedule_views_")
+    try:
+        app = create_seeded_app(workdir, days=args.days)
+        client = app.test_client()
+        day = date.today() - timedelta(days=7)
+        with app.app_context():
+            machine_id = db.session.query(ProductionSchedule.machine_id).filter_by(date=day).first()[0]
+        urls = {
+            "by date": f"/production-schedules/by-date/{day}",
+            "by machine and date": f"/production-schedules/by-machine/{machine_id}?date={day}",
+            "by machine": f"/production-schedules/by-machine/{machine_id}",
+        }
+
+        timings = {}
+        with app.app_context():
+            cache = get_cache("schedule_views", app.config["SCHEDULE_VIEW_CACHE_ENTRIES"])
+            for label, url in urls.items():
+                for cached in (False, True):
+                    name = f"{label} ({'cached' if cached else 'computed'})"
+                    timings[name] = []
+                    for _ in range(args.requests):
+                        if not cached:
+                            cache.clear()
+                        started = time.perf_counter()
+                        response = client.get(url)
+                        timings[name].append(time.perf_counter() - started)
+                        assert response.status_code == 200
+                print(f"{label}: {len(response.get_json())} rows")
+
+            # Reads spread over a week of dates and the machines, one status write per ten reads
+            rng = random.Random(42)
+            week = [day - timedelta(days=offset) for offset in range(7)]
+            rows = db.session.query(ProductionSchedule.schedule_id, ProductionSchedule.machine_id) \
+                .filter(ProductionSchedule.date.in_(week)).all()
+            machines = sorted({machine for _, machine in rows})
+            cache.clear()
+            before = cache.stats()
+            for i in range(args.requests * 10):
+                if i % 10 == 9:
+                    client.put(f"/production-schedules/{rng.choice(rows)[0]}/status", json={"status": "in_progress"})
+                elif rng.random() < 0.5:
+                    client.get(f"/production-schedules/by-date/{rng.choice(week)}")
+                else:
+                    client.get(f"/production-schedules/by-machine/{rng.choice(machines)}?date={rng.choice(week)}")
+            after = cache.stats()
+            hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+            db.engine.dispose()
+
+        for label, values in timings.items():
+            print(f"{label}: median {statistics.median(values) * 1000:.2f} ms, max {max(values) * 1000:.2f} ms")
+        print(f"mixed reads: {hits} hits, {misses} misses, hit rate {hits / (hits + misses):.0%}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Columnar snapshot export of a year of synthetic history.
+
+    python -m benchmarks.bench_snapshot --format npz
+
+Times GET /export/snapshot and loading the file back (np.load for npz,
+a memory-mapped Arrow IPC file for arrow). Arrow and Parquet need pyarrow.
+"""
+
+import argparse
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_seeded_app
+
+
+def load(fmt, path):
+    if fmt == "npz":
+        import numpy as np
+        with np.load(path) as snapshot:
+            return len({name: snapshot[name] for name in snapshot.files}["schedule_id"])
+    import pyarrow as pa
+    if fmt == "arrow":
+        return pa.ipc.open_file(pa.memory_map(path)).read_all().num_rows
+    import pyarrow.parquet as pq
+    return pq.read_table(path).num_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time GET /export/snapshot")
+    parser.add_argument("--format", choices=["arrow", "parquet", "npz"], default="npz")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_snapshot_")
+    try:
+        app = create_seeded_app(workdir, days=args.days)
+        client = app.test_client()
+        today = date.today()
+        url = f"/export/snapshot?format={args.format}&from={today - timedelta(days=args.days)}&to={today}"
+        path = os.path.join(workdir, f"snapshot.{args.format}")
+
+        export, loading = [], []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            response = client.get(url)
+            if response.status_code != 200:
+                print(f"{args.format}: {response.status_code} {response.get_json()['error']}")
+                sys.exit(1)
+            with open(path, "wb") as handle:
+                for chunk in response.response:
+                    handle.write(chunk)
+            export.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            rows = load(args.format, path)
+            loading.append(time.perf_counter() - started)
+
+        print(f"{args.format}: {rows} rows, {os.path.getsize(path) / 1e6:.1f} MB")
+        print(f"export: median {statistics.median(export) * 1000:.0f} ms, max {max(export) * 1000:.0f} ms")
+        print(f"load: median {statistics.median(loading) * 1000:.1f} ms")
+        with app.app_context():
+            from app import db
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
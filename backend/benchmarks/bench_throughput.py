@@ -0,0 +1,155 @@
+"""
+Throughput of the production server (gunicorn, see gunicorn.conf.py) at
+different worker counts, against one seeded SQLite file in WAL mode.
+
+    python -m benchmarks.bench_throughput --workers 1 4 8 --duration 10
+
+The request mix is read-heavy, like the grid and shop-floor tablets: day
+views, machine views, conflict checks, plus ~5% status updates.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from benchmarks.synthetic import create_seeded_app
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(base_url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"{base_url}/", timeout=1).read()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def make_request_mix(days, machine_ids, schedule_ids, rng):
+    roll = rng.random()
+    day = rng.choice(days).isoformat()
+    if roll < 0.45:
+        return "GET", f"/production-schedules/by-date/{day}", None
+    if roll < 0.80:
+        return "GET", f"/production-schedules/by-machine/{rng.choice(machine_ids)}?date={day}", None
+    if roll < 0.95:
+        return "GET", f"/production-schedules/conflicts/by-date/{day}", None
+    body = json.dumps({"status": rng.choice(["planned", "in_progress", "delayed"])}).encode()
+    return "PUT", f"/production-schedules/{rng.choice(schedule_ids)}/status", body
+
+
+def run_load(base_url, duration, concurrency, days, machine_ids, schedule_ids):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.time() + duration
+
+    def client(seed):
+        rng = random.Random(seed)
+        local = []
+        while time.time() < stop_at:
+            method, path, body = make_request_mix(days, machine_ids, schedule_ids, rng)
+            request = urllib.request.Request(f"{base_url}{path}", data=body, method=method,
+                                             headers={"Content-Type": "application/json"})
+            started = time.perf_counter()
+            try:
+                urllib.request.urlopen(request, timeout=30).read()
+                local.append(time.perf_counter() - started)
+            except OSError:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors[0],
+        "req_per_sec": round(count / duration, 1),
+        "p50_ms": round(latencies[count // 2] * 1000, 1) if count else None,
+        "p95_ms": round(latencies[int(count * 0.95)] * 1000, 1) if count else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_throughput_")
+    try:
+        app = create_seeded_app(workdir, days=args.days)
+        with app.app_context():
+            from app import db
+            from app.models.machine import Machine
+            from app.models.production_schedule import ProductionSchedule
+            machine_ids = [row[0] for row in db.session.query(Machine.machine_id).all()]
+            schedule_ids = [row[0] for row in db.session.query(ProductionSchedule.schedule_id).limit(5000).all()]
+            db.engine.dispose()
+        today = date.today()
+        days = [today - timedelta(days=n) for n in range(60)]
+
+        print(f"CPUs: {os.cpu_count()}, concurrency: {args.concurrency}, duration: {args.duration}s")
+        print(f"{'workers':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for workers in args.workers:
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            env = dict(
+                os.environ,
+                DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'scheduling.db')}",
+                ARCHIVE_DATABASE_PATH=os.path.join(workdir, "scheduling_archive.db"),
+                GUNICORN_BIND=f"127.0.0.1:{port}",
+                GUNICORN_WORKERS=str(workers),
+                GUNICORN_ACCESS_LOG="/dev/null",
+            )
+            server = subprocess.Popen(
+                [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+                cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            try:
+                if not wait_for_server(base_url):
+                    print(f"{workers:>8} server failed to start")
+                    continue
+                result = run_load(base_url, args.duration, args.concurrency, days, machine_ids, schedule_ids)
+                print(f"{workers:>8} {result['req_per_sec']:>8} {result['p50_ms']:>8} "
+                      f"{result['p95_ms']:>8} {result['errors']:>7}")
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait(timeout=60)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Synthetic workshop dataset for benchmarks and query-plan tests.
+
+Shaped after the PRD's target size: ~20 machines, ~8 companies, a few hundred
+parts with 2-4 operations each, and a year of schedules where most machine
+slots are filled. Rows are bulk inserted, so seeding a year takes seconds.
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.shop_calendar import get_calendar
+from app.models.company import Company
+from app.models.part import Part
+from app.models.operation import Operation
+from app.models.machine import Machine
+from app.models.operation_machine import OperationMachine
+from app.models.monthly_plan import MonthlyPlan
+from app.models.forecast_plan import ForecastPlan
+from app.models.production_schedule import ProductionSchedule
+from sqlalchemy import insert
+
+MACHINE_TYPES = ["CNC Lathe", "VMC", "Robot"]
+
+
+def seed(machines=20, companies=8, parts=300, days=365, fill=0.8, end=None, seed=42, part_families=False):
+    """Populate the current app's database. Must run inside an app context.
+
+    Schedules cover `days` calendar days ending at `end` (default: today);
+    rows before today are marked completed, the rest planned. With
+    `part_families` all operations of a part use one machine type, so the
+    machine types form independent groups. Returns the number of schedule
+    rows inserted.
+    """
+    rng = random.Random(seed)
+    end = end or date.today()
+    start = end - timedelta(days=days - 1)
+
+    db.session.execute(insert(Company), [{"name": f"Company {i + 1}"} for i in range(companies)])
+    db.session.execute(insert(Machine), [
+        {"name": f"Machine {i + 1}", "type": MACHINE_TYPES[i % len(MACHINE_TYPES)]}
+        for i in range(machines)
+    ])
+    company_ids = [row[0] for row in db.session.query(Company.company_id).all()]
+    machine_rows = db.session.query(Machine.machine_id, Machine.type).all()
+    machines_by_type = {}
+    for machine_id, machine_type in machine_rows:
+        machines_by_type.setdefault(machine_type, []).append(machine_id)
+
+    db.session.execute(insert(Part), [
+        {"company_id": rng.choice(company_ids), "name": f"Part {i + 1}", "total_operations": rng.randint(2, 4)}
+        for i in range(parts)
+    ])
+    part_rows = db.session.query(Part.part_id, Part.company_id, Part.total_operations).all()
+
+    db.session.execute(insert(Operation), [
+        {
+            "part_id": part_id,
+            "sequence_number": (n + 1) * 10,
+            "machining_time": round(rng.uniform(2.0, 30.0), 1),
+            "loading_time": round(rng.uniform(0.5, 3.0), 1)
+        }
+        for part_id, _, total_operations in part_rows
+        for n in range(total_operations)
+    ])
+    operation_rows = db.session.query(Operation.operation_id, Operation.part_id).all()
+    family = {part_id: rng.choice(MACHINE_TYPES) for part_id, _, _ in part_rows}
+
+    # Each operation is eligible on 1-3 machines of one type
+    eligibility = {}
+    links = []
+    for operation_id, part_id in operation_rows:
+        candidates = machines_by_type[family[part_id] if part_families else rng.choice(MACHINE_TYPES)]
+        chosen = rng.sample(candidates, k=min(len(candidates), rng.randint(1, 3)))
+        eligibility[operation_id] = chosen
+        links.extend({"operation_id": operation_id, "machine_id": machine_id} for machine_id in chosen)
+    db.session.execute(insert(OperationMachine), links)
+
+    # Plans and forecasts for the current and next two months
+    this_month = end.replace(day=1)
+    months = [this_month]
+    for _ in range(2):
+        months.append((months[-1] + timedelta(days=32)).replace(day=1))
+    plans, forecasts = [], []
+    for part_id, company_id, _ in part_rows:
+        plans.append({"part_id": part_id, "company_id": company_id, "month": this_month,
+                      "planned_quantity": rng.randint(50, 500)})
+        for month in months[1:]:
+            for week in range(1, 5):
+                forecasts.append({"part_id": part_id, "company_id": company_id, "month": month,
+                                  "week": week, "forecasted_quantity": rng.randint(10, 150)})
+    db.session.execute(insert(MonthlyPlan), plans)
+    db.session.execute(insert(ForecastPlan), forecasts)
+
+    # Schedules: fill most machine slots, with a few double-bookings
+    operations_by_machine = {}
+    part_of_operation = dict(operation_rows)
+    for operation_id, machine_ids in eligibility.items():
+        for machine_id in machine_ids:
+            operations_by_machine.setdefault(machine_id, []).append(operation_id)
+
+    calendar = get_calendar()
+    rows = []
+    day = start
+    while day <= end:
+        if calendar.is_working_day(day):
+            status_for_day = "completed" if day < date.today() else "planned"
+            for machine_id, _ in machine_rows:
+                machine_operations = operations_by_machine.get(machine_id)
+                if not machine_operations:
+                    continue
+                for shift_number in range(1, calendar.shifts_per_day + 1):
+                    for slot_number in range(1, calendar.slots_per_shift + 1):
+                        bookings = 0
+                        if rng.random() < fill:
+                            bookings = 2 if rng.random() < 0.02 else 1
+                        for _ in range(bookings):
+                            operation_id = rng.choice(machine_operations)
+                            part_id = part_of_operation[operation_id]
+                            rows.append({
+                                "date": day,
+                                "shift_number": shift_number,
+                                "slot_number": slot_number,
+                                "part_id": part_id,
+                                "operation_id": operation_id,
+                                "machine_id": machine_id,
+                                "quantity_scheduled": rng.randint(5, 60),
+                                "sub_batch_id": f"P{part_id}-{day:%Y%m}-{rng.randint(1, 8)}",
+                                "status": status_for_day,
+                                "slot_key": calendar.slot_key(day, shift_number, slot_number)
+                            })
+        day += timedelta(days=1)
+
+    for i in range(0, len(rows), 5000):
+        db.session.execute(insert(ProductionSchedule), rows[i:i + 5000])
+    db.session.commit()
+    return len(rows)
+
+
+def create_seeded_app(directory, **kwargs):
+    """Create an app on fresh database files in `directory` and seed it"""
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(directory, "scheduling.db")}',
+        'ARCHIVE_DATABASE_PATH': os.path.join(directory, "scheduling_archive.db"),
+    })
+    with app.app_context():
+        seed(**kwargs)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed a database with a synthetic workshop dataset")
+    parser.add_argument("directory", help="Directory for scheduling.db and scheduling_archive.db")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--parts", type=int, default=300)
+    parser.add_argument("--machines", type=int, default=20)
+    args = parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    app = create_seeded_app(args.directory, days=args.days, parts=args.parts, machines=args.machines)
+    with app.app_context():
+        print(f"Seeded {ProductionSchedule.query.count()} schedules into {args.directory}")
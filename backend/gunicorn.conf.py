@@ -0,0 +1,26 @@
+# Production server settings: gunicorn -c gunicorn.conf.py wsgi:app
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# One worker per CPU; SQLite allows a single writer, so more workers only
+# help read-heavy traffic
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+worker_class = "sync"
+
+# Build the app once in the master and fork workers from it
+preload_app = True
+
+# Recycle workers periodically (jitter avoids restarting them all at once)
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# Kill a worker stuck on one request for longer than this many seconds
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+
+# On SIGTERM, let in-flight requests finish for up to this many seconds
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for archiving completed production schedules.
+This script checks that old completed rows move to the archive database and
+stay visible through the history endpoint.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import db
+from app.models.company import Company
+from app.models.part import Part
+from app.models.operation import Operation
+from app.models.machine import Machine
+from app.models.production_schedule import ProductionSchedule
+from app.services.archive import archive_completed_schedules
+from datetime import date, timedelta
+from sqlalchemy import text
+from testing import create_test_app, run_tests
+
+def test_archive_completed_schedules():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+
+        with app.app_context():
+            company = Company(name="Archive Test Company")
+            machine = Machine(name="Archive Lathe", type="CNC Lathe")
+            db.session.add_all([company, machine])
+            db.session.commit()
+
+            part = Part(company_id=company.company_id, name="Archive Gear", total_operations=1)
+            db.session.add(part)
+            db.session.commit()
+
+            operation = Operation(part_id=part.part_id, sequence_number=10, machining_time=10.0, loading_time=1.0)
+            db.session.add(operation)
+            db.session.commit()
+
+            today = date.today()
+            old_day = today - timedelta(days=200)
+
+            def schedule(day, status):
+                return ProductionSchedule(
+                    date=day, shift_number=1, slot_number=1,
+                    part_id=part.part_id, operation_id=operation.operation_id,
+                    machine_id=machine.machine_id, quantity_scheduled=10, status=status
+                )
+
+            # 5 old completed rows (archivable), 1 old planned row, 1 recent completed row
+            db.session.add_all([schedule(old_day + timedelta(days=i), "completed") for i in range(5)])
+            db.session.add(schedule(old_day, "planned"))
+            db.session.add(schedule(today, "completed"))
+            db.session.commit()
+
+            moved = archive_completed_schedules(horizon_days=90, batch_size=2)
+            assert moved == 5
+            print(f"✅ Archived {moved} completed schedules in batches of 2")
+
+            assert ProductionSchedule.query.count() == 2
+            archived = db.session.execute(text("SELECT COUNT(*) FROM archive.production_schedules")).scalar()
+            assert archived == 5
+            print("✅ Live table only keeps recent and unfinished schedules")
+
+            # Running again is a no-op
+            assert archive_completed_schedules(horizon_days=90, batch_size=2) == 0
+
+            # Archiving the newest row does not let its id be issued again
+            assert archive_completed_schedules(horizon_days=0, batch_size=2, today=today + timedelta(days=1)) == 1
+            newest = db.session.execute(text("SELECT MAX(schedule_id) FROM archive.production_schedules")).scalar()
+            replacement = schedule(today, "planned")
+            db.session.add(replacement)
+            db.session.commit()
+            assert replacement.schedule_id > newest
+            print("✅ Schedule ids are never reused after archiving")
+
+        client = app.test_client()
+        response = client.get("/production-schedules/history")
+        assert response.status_code == 200
+        history = response.get_json()
+        assert len(history) == 8
+        assert len({row["schedule_id"] for row in history}) == 8
+        assert sum(1 for row in history if row["archived"]) == 6
+
+        response = client.get(f"/production-schedules/history?to={(today - timedelta(days=100)).isoformat()}")
+        assert response.status_code == 200
+        assert len(response.get_json()) == 6
+        print("✅ History endpoint reads across live and archived schedules")
+
+        response = client.get("/production-schedules/history?from=not-a-date")
+        assert response.status_code == 400
+
+        # Hot endpoints only see the live table
+        response = client.get("/production-schedules")
+        assert len(response.get_json()) == 2
+        print("✅ Hot endpoints only read the live table")
+
+        # A table from before AUTOINCREMENT is rebuilt on upgrade, keeping rows
+        # and triggers. Without a sequence the next id would be max(live) + 1,
+        # which is already in the archive once the newest live row is gone.
+        with app.app_context():
+            triggers = "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'production_schedules'"
+            expected = sorted(db.session.execute(text(triggers)).scalars())
+            db.session.execute(text("DELETE FROM production_schedules WHERE schedule_id = :id"),
+                               {"id": replacement.schedule_id})
+            db.session.execute(text("DELETE FROM sqlite_sequence"))
+            db.session.execute(text("UPDATE schema_version SET version = 11"))
+            db.session.commit()
+            db.engine.dispose()
+
+        app = create_test_app(tmpdir)
+        with app.app_context():
+            table_sql = db.session.execute(text(
+                "SELECT sql FROM sqlite_master WHERE name = 'production_schedules'"
+            )).scalar()
+            assert "AUTOINCREMENT" in table_sql
+            assert sorted(db.session.execute(text(triggers)).scalars()) == expected
+            planned = ProductionSchedule.query.one()
+            upgraded = ProductionSchedule(
+                date=today, shift_number=1, slot_number=2, part_id=planned.part_id,
+                operation_id=planned.operation_id, machine_id=planned.machine_id, quantity_scheduled=10
+            )
+            db.session.add(upgraded)
+            db.session.commit()
+            assert upgraded.schedule_id > newest
+        print("✅ Upgrade rebuilds the table and keeps rows and triggers")
+
+        with app.app_context():
+            db.engine.dispose()
+
+if __name__ == "__main__":
+    run_tests("archive", test_archive_completed_schedules)
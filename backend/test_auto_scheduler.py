@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test script for the component-parallel auto-scheduler.
+This script checks the machine-group decomposition, precedence across groups,
+runs that stop at locked days, sub-batch numbering and that parallel and
+single-process runs agree.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import db
+from app.models.production_schedule import ProductionSchedule
+from app.services.auto_scheduler import build_scheduling_problem, find_components, solve_component
+from datetime import date
+from testing import create_test_app, run_tests
+
+def test_find_components():
+    def op(operation_id, *machine_ids):
+        return {'operation_id': operation_id, 'cycle_minutes': 10, 'machine_ids': list(machine_ids)}
+    parts = [
+        {'part_id': 1, 'operations': [op(1, 'L1'), op(2, 'V1', 'V2')], 'batches': []},
+        {'part_id': 2, 'operations': [op(3, 'L1', 'L2')], 'batches': []},
+        {'part_id': 3, 'operations': [op(4, 'G1')], 'batches': []},
+    ]
+    levels = find_components(parts)
+    assert sorted(map(sorted, levels[0])) == [[1, 3], [4]]
+    assert levels[1] == [{2}]
+    print("✅ Lathes and grinder solved first, VMCs after the lathe operations they follow")
+
+    # Lathe -> VMC for one part and VMC -> lathe for another couples both groups
+    parts.append({'part_id': 4, 'operations': [op(5, 'V2'), op(6, 'L2')], 'batches': []})
+    levels = find_components(parts)
+    assert sorted(map(sorted, levels[0])) == [[1, 2, 3, 5, 6], [4]]
+    assert len(levels) == 1
+    print("✅ Groups with precedence both ways are merged")
+
+def test_solve_component_breaks():
+    # One 30-minute operation of 3 slots; slot 4 follows a locked day
+    component = {
+        'segments': [{'part_id': 1, 'operations': [{'operation_id': 1, 'cycle_minutes': 30, 'machine_ids': [1]}],
+                      'batches': [(1, 3, 2)]}],
+        'busy': {1: []}, 'n_slots': 8, 'slot_minutes': 30, 'breaks': [4]
+    }
+    assert solve_component(component)['placed'] == [((1, 1), [(1, 1, 4, 3)])]
+    component['breaks'] = []
+    assert solve_component(component)['placed'] == [((1, 1), [(1, 1, 2, 3)])]
+    component['breaks'] = [3, 5, 7]
+    assert solve_component(component)['failed'] == [(1, 1)]
+    print("✅ A run of slots never spans a locked day")
+
+def setup_shop(client, month):
+    company_id = client.post("/companies", json={"name": "Auto Co"}).get_json()["company_id"]
+    machines = {}
+    for name, machine_type in [("Lathe 1", "CNC Lathe"), ("Lathe 2", "CNC Lathe"),
+                               ("VMC 1", "VMC"), ("Grinder 1", "Grinder")]:
+        machines[name] = client.post("/machines", json={"name": name, "type": machine_type}).get_json()["machine_id"]
+
+    def add_part(name, routing, quantity):
+        part_id = client.post("/parts", json={"name": name, "company_id": company_id}).get_json()["part_id"]
+        for sequence, (minutes, machine_names) in enumerate(routing, start=1):
+            operation_id = client.post("/operations", json={
+                "part_id": part_id, "sequence_number": sequence * 10, "machining_time": minutes, "loading_time": 0
+            }).get_json()["operation_id"]
+            for machine_name in machine_names:
+                client.post(f"/operations/{operation_id}/machines/{machines[machine_name]}")
+        response = client.post("/monthly-plans", json={
+            "part_id": part_id, "company_id": company_id, "month": month.isoformat(), "planned_quantity": quantity
+        })
+        assert response.status_code == 201
+        return part_id
+
+    shaft = add_part("Shaft", [(4.0, ["Lathe 1", "Lathe 2"]), (8.0, ["VMC 1"])], 90)
+    bush = add_part("Bush", [(2.0, ["Lathe 1", "Lathe 2"])], 200)
+    pin = add_part("Pin", [(1.0, ["Grinder 1"])], 100)
+    return shaft, bush, pin
+
+def test_auto_schedule():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        month = date(2030, 3, 1)
+        shaft, bush, pin = setup_shop(client, month)
+
+        single = client.post("/schedule/auto", json={"month": month.isoformat(), "dry_run": True, "processes": 1})
+        assert single.status_code == 200
+        parallel = client.post("/schedule/auto", json={"month": month.isoformat(), "dry_run": True, "processes": 2})
+        assert parallel.status_code == 200
+        single, parallel = single.get_json(), parallel.get_json()
+        assert single["components"] == 3 and single["levels"] == 2
+        assert parallel["processes"] == 2
+        key = lambda row: (row["part_id"], row["operation_id"], row["sub_batch_id"], row["date"], row["shift_number"], row["slot_number"])
+        assert sorted(single["schedules"], key=key) == sorted(parallel["schedules"], key=key)
+        print("✅ Parallel run matches the single-process run")
+
+        response = client.post("/schedule/auto", json={"month": month.isoformat()})
+        assert response.status_code == 201
+        result = response.get_json()
+        assert result["unplaced"] == []
+        assert result["schedules_created"] == len(single["schedules"])
+
+        with app.app_context():
+            rows = ProductionSchedule.query.all()
+            slots = {}
+            for row in rows:
+                slot = (row.machine_id, row.date, row.shift_number, row.slot_number)
+                assert slot not in slots, f"Double booking at {slot}"
+                slots[slot] = row
+            for part_id, quantity in [(shaft, 90), (bush, 200), (pin, 100)]:
+                operations = {row.operation_id for row in rows if row.part_id == part_id}
+                for operation_id in operations:
+                    assert sum(r.quantity_scheduled for r in rows if r.operation_id == operation_id) == quantity
+
+            # Every shaft sub-batch is milled after it was turned
+            position = lambda r: (r.date, r.shift_number, r.slot_number)
+            batches = {}
+            for row in rows:
+                if row.part_id == shaft:
+                    batches.setdefault(row.sub_batch_id, []).append(row)
+            assert len(batches) == 3
+            for batch in batches.values():
+                first_op = min(r.operation_id for r in batch)
+                turned = max(position(r) for r in batch if r.operation_id == first_op)
+                milled = min(position(r) for r in batch if r.operation_id != first_op)
+                assert turned < milled
+        print("✅ Month scheduled without double bookings and with precedence across groups")
+
+        response = client.post("/schedule/auto", json={"month": month.isoformat()})
+        assert response.get_json()["schedules_created"] == 0
+        print("✅ Re-running schedules nothing new")
+
+        # Dropping the first shaft sub-batch leaves a gap: its quantity is
+        # planned again under a new number, not one already in use
+        with app.app_context():
+            ProductionSchedule.query.filter_by(sub_batch_id=f"P{shaft}-203003-B001").delete()
+            db.session.commit()
+        response = client.post("/schedule/auto", json={"month": month.isoformat()})
+        assert response.status_code == 201
+        with app.app_context():
+            shaft_batches = {row.sub_batch_id for row in ProductionSchedule.query.filter_by(part_id=shaft)}
+        assert shaft_batches == {f"P{shaft}-203003-B{number:03d}" for number in (2, 3, 4)}
+        print("✅ New sub-batches are numbered after the highest existing one")
+
+        with app.app_context():
+            from app.models.schedule_lock import ScheduleLock
+            db.session.add(ScheduleLock(start_date=date(2030, 3, 12), end_date=date(2030, 3, 12)))
+            db.session.commit()
+            _, slots, breaks, _, _, _ = build_scheduling_problem(month, app.config, today=month)
+            from app.shop_calendar import get_calendar
+            after_lock = get_calendar().slot_key(date(2030, 3, 13), 1, 1)
+            assert breaks == [slots.index(after_lock)]
+            db.session.execute(db.delete(ScheduleLock))
+            db.session.commit()
+        print("✅ Slots after a locked day start a new run")
+
+        response = client.post("/schedule/auto", json={})
+        assert response.status_code == 400
+        response = client.post("/schedule/auto", json={"month": "bad"})
+        assert response.status_code == 400
+        response = client.post("/schedule/auto", json={"month": month.isoformat(), "processes": 0})
+        assert response.status_code == 400
+        print("✅ Invalid parameters handled correctly")
+
+        with app.app_context():
+            db.engine.dispose()
+
+if __name__ == "__main__":
+    run_tests("auto-scheduler", test_find_components, test_solve_component_breaks, test_auto_schedule)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for the sub-batch sizing engine.
+This script checks the projected makespan of candidate splits, the chosen
+sub-batch plan and GET /monthly-plans/<id>/sub-batch-plan.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.batch_sizing import evaluate_splits, plan_sub_batches, split_quantity
+from testing import create_test_app, run_tests
+
+def op(operation_id, cycle_minutes, machines=1):
+    return {'operation_id': operation_id, 'cycle_minutes': cycle_minutes, 'machine_ids': list(range(machines))}
+
+def test_evaluate_splits():
+    # 90 pieces, 4 min on two lathes then 8 min on one VMC, 240-minute slots
+    counts, durations, makespans = evaluate_splits([4.0, 8.0], [2, 1], 90, 240, max_batches=4)
+    assert list(counts) == [1, 2, 3, 4]
+    assert durations.tolist() == [[2, 3], [1, 2], [1, 1], [1, 1]]
+    # C(k) = sum(d) + (k - 1) * max(d / m)
+    assert makespans.tolist() == [5, 5, 4, 5]
+    print("✅ Makespan of every split is computed in one pass")
+
+    assert split_quantity(10, 3) == [4, 3, 3]
+    assert sum(split_quantity(997, 13)) == 997
+    print("✅ Quantities split into near-equal sub-batches")
+
+def test_plan_sub_batches():
+    plan = plan_sub_batches([op(1, 4.0, 2), op(2, 8.0)], 90, 240)
+    assert plan['batch_count'] == 3 and plan['batch_sizes'] == [30, 30, 30]
+    assert plan['makespan_slots'] == 4 and plan['makespan_minutes'] == 960
+    assert plan['bottleneck_operation_id'] == 2
+    assert [o['slots_per_batch'] for o in plan['operations']] == [1, 1]
+    assert plan['slot_utilization'] == 0.75
+    print("✅ The split with the shortest makespan is chosen")
+
+    # A single quick operation is never split: every extra sub-batch only adds slots
+    plan = plan_sub_batches([op(1, 1.0)], 100, 240)
+    assert plan['batch_sizes'] == [100] and plan['makespan_slots'] == 1
+    # A long chain benefits from overlapping many small sub-batches
+    plan = plan_sub_batches([op(1, 10.0), op(2, 10.0), op(3, 10.0)], 240, 240)
+    assert plan['batch_count'] > 1
+    assert plan['makespan_slots'] < 3 * 10
+    assert sum(plan['batch_sizes']) == 240
+    print("✅ Overlap is used when it shortens the chain")
+
+    assert plan_sub_batches([op(1, 5.0)], 0, 240)['batch_count'] == 0
+    assert plan_sub_batches([op(1, 5.0)], 50, 240, max_batches=1)['batch_sizes'] == [50]
+    print("✅ Empty plans and batch limits are handled")
+
+def test_sub_batch_plan_endpoint():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        company_id = client.post("/companies", json={"name": "Batch Co"}).get_json()["company_id"]
+        part_id = client.post("/parts", json={"name": "Shaft", "company_id": company_id}).get_json()["part_id"]
+        machines = [client.post("/machines", json={"name": name, "type": machine_type}).get_json()["machine_id"]
+                    for name, machine_type in [("Lathe 1", "CNC Lathe"), ("Lathe 2", "CNC Lathe"), ("VMC 1", "VMC")]]
+        for sequence_number, minutes, eligible in [(10, 4.0, machines[:2]), (20, 8.0, machines[2:])]:
+            operation_id = client.post("/operations", json={
+                "part_id": part_id, "sequence_number": sequence_number, "machining_time": minutes, "loading_time": 0
+            }).get_json()["operation_id"]
+            for machine_id in eligible:
+                client.post(f"/operations/{operation_id}/machines/{machine_id}")
+        plan_id = client.post("/monthly-plans", json={
+            "part_id": part_id, "company_id": company_id, "month": "2030-03-01", "planned_quantity": 90
+        }).get_json()["plan_id"]
+
+        response = client.get(f"/monthly-plans/{plan_id}/sub-batch-plan")
+        assert response.status_code == 200
+        result = response.get_json()
+        assert result["plan_id"] == plan_id and result["batch_sizes"] == [30, 30, 30]
+
+        response = client.get(f"/monthly-plans/{plan_id}/sub-batch-plan?quantity=30")
+        assert response.get_json()["batch_sizes"] == [30]
+        assert client.get(f"/monthly-plans/{plan_id}/sub-batch-plan?max_batches=0").status_code == 400
+        assert client.get("/monthly-plans/999/sub-batch-plan").status_code == 404
+        print("✅ Sub-batch plan endpoint works")
+
+if __name__ == "__main__":
+    run_tests("sub-batch sizing", test_evaluate_splits, test_plan_sub_batches, test_sub_batch_plan_endpoint)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the Monte Carlo capacity simulation.
+This script checks overload probabilities per machine type and week,
+seeded determinism across process counts and POST /capacity/simulate validation.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing import create_test_app, run_tests
+
+def setup_shop(client):
+    # One lathe (96 h/week on the default calendar) and one VMC; 60 min per piece on each
+    company_id = client.post("/companies", json={"name": "Capacity Co"}).get_json()["company_id"]
+    lathe = client.post("/machines", json={"name": "Lathe 1", "type": "CNC Lathe"}).get_json()["machine_id"]
+    vmc = client.post("/machines", json={"name": "VMC 1", "type": "VMC"}).get_json()["machine_id"]
+    part_id = client.post("/parts", json={"name": "Flange", "company_id": company_id}).get_json()["part_id"]
+    for sequence_number, machine_id in [(10, lathe), (20, vmc)]:
+        operation_id = client.post("/operations", json={
+            "part_id": part_id, "sequence_number": sequence_number, "machining_time": 60.0, "loading_time": 0
+        }).get_json()["operation_id"]
+        client.post(f"/operations/{operation_id}/machines/{machine_id}")
+    # Week 1 needs 50 h, week 2 exactly the 96 h available, week 3 150 h, week 4 nothing
+    for week, quantity in [(1, 50), (2, 96), (3, 150)]:
+        response = client.post("/forecast-plans", json={
+            "part_id": part_id, "company_id": company_id, "month": "2030-03-01",
+            "week": week, "forecasted_quantity": quantity
+        })
+        assert response.status_code == 201
+
+def test_capacity_simulation():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        setup_shop(client)
+        body = {"start": "2030-03-01", "months": 1, "scenarios": 2500, "spread": 0.2, "seed": 11}
+
+        response = client.post("/capacity/simulate", json={**body, "processes": 1})
+        assert response.status_code == 200
+        result = response.get_json()
+        assert result["scenarios"] == 2500 and len(result["weeks"]) == 4
+        lathe = result["machine_types"]["CNC Lathe"]
+        assert lathe["machines"] == 1 and lathe["available_hours"] == 96.0
+        probability = lathe["overload_probability"]
+        assert all(0 <= p <= 1 for p in probability)
+        assert probability[0] == 0 and probability[2] == 1 and probability[3] == 0
+        # Demand right at capacity overloads in about half of the scenarios
+        assert 0.4 < probability[1] < 0.6
+        assert abs(lathe["expected_hours"][1] - 96) < 2 and lathe["p90_hours"][1] > lathe["p50_hours"][1]
+        assert lathe["any_week_overload_probability"] == 1
+        assert result["machine_types"]["VMC"]["overload_probability"] == probability
+        print("✅ Overload probability per machine type and week")
+
+        again = client.post("/capacity/simulate", json={**body, "processes": 2}).get_json()
+        assert again["machine_types"] == result["machine_types"]
+        print("✅ A seed gives the same result for any number of processes")
+
+        flat = client.post("/capacity/simulate", json={**body, "spread": 0}).get_json()
+        assert flat["machine_types"]["CNC Lathe"]["overload_probability"] == [0, 0, 1, 0]
+        normal = client.post("/capacity/simulate", json={**body, "distribution": "normal"}).get_json()
+        assert 0.4 < normal["machine_types"]["CNC Lathe"]["overload_probability"][1] < 0.6
+        print("✅ Spread and distribution are applied")
+
+        for bad in [{"months": 0}, {"scenarios": 0}, {"scenarios": 10 ** 6}, {"spread": 1.5},
+                    {"distribution": "poisson"}, {"seed": "x"}, {"processes": 0}, {"start": "March"}]:
+            assert client.post("/capacity/simulate", json={**body, **bad}).status_code == 400, bad
+        print("✅ Invalid parameters are rejected")
+
+if __name__ == "__main__":
+    run_tests("capacity simulation", test_capacity_simulation)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for the dashboard summary endpoint.
+This script checks every tile and that writes invalidate only the cached
+tiles that read the changed data.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import db
+from app.cache import GenerationCache, get_cache
+from testing import create_test_app, run_tests
+
+def test_dashboard():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+
+        company_id = client.post("/companies", json={"name": "Dashboard Co"}).get_json()["company_id"]
+        lathe = client.post("/machines", json={"name": "Lathe 1", "type": "CNC Lathe"}).get_json()["machine_id"]
+        vmc = client.post("/machines", json={"name": "VMC 1", "type": "VMC"}).get_json()["machine_id"]
+        part_id = client.post("/parts", json={"name": "Dashboard Flange", "company_id": company_id}).get_json()["part_id"]
+        op10, op20 = [client.post("/operations", json={
+            "part_id": part_id, "sequence_number": sequence, "machining_time": 5.0, "loading_time": 1.0
+        }).get_json()["operation_id"] for sequence in (10, 20)]
+        client.post("/monthly-plans", json={
+            "part_id": part_id, "company_id": company_id, "month": "2030-04-01", "planned_quantity": 100
+        })
+        client.post("/forecast-plans", json={
+            "part_id": part_id, "company_id": company_id, "month": "2030-04-01", "week": 1, "forecasted_quantity": 120
+        })
+
+        def schedule(day, shift, slot, operation_id, machine_id, quantity, status="planned"):
+            response = client.post("/production-schedules", json={
+                "date": day, "shift_number": shift, "slot_number": slot, "part_id": part_id,
+                "operation_id": operation_id, "machine_id": machine_id, "quantity_scheduled": quantity, "status": status
+            })
+            assert response.status_code == 201
+            return response.get_json()["schedule_id"]
+
+        # Week of Monday 2030-04-08; the dashboard is read on Wednesday 2030-04-10
+        schedule("2030-04-08", 1, 1, op10, lathe, 40, "completed")
+        schedule("2030-04-08", 2, 1, op20, vmc, 40, "completed")
+        schedule("2030-04-09", 1, 1, op10, lathe, 30)
+        schedule("2030-04-09", 1, 1, op10, lathe, 30, "delayed")
+        schedule("2030-04-11", 1, 1, op20, vmc, 30)
+
+        response = client.get("/dashboard?date=2030-04-10")
+        assert response.status_code == 200
+        dashboard = response.get_json()
+
+        utilization = {m["machine_id"]: m for m in dashboard["utilization"]["machines"]}
+        assert dashboard["utilization"]["available_slots_per_machine"] == 24  # 6 days x 4 slots
+        assert utilization[lathe]["occupied_slots"] == 2
+        assert utilization[vmc]["occupied_slots"] == 2
+        print("✅ Utilization tile counts occupied slots per machine")
+
+        assert dashboard["delays"]["delayed"] == 1
+        assert dashboard["delays"]["overdue"] == 2
+        assert dashboard["delays"]["oldest_overdue"][0]["date"] == "2030-04-09"
+        print("✅ Delays tile counts delayed and overdue operations")
+
+        forecast = dashboard["forecast_vs_actual"]
+        assert (forecast["forecasted"], forecast["planned"]) == (120, 100)
+        assert (forecast["scheduled"], forecast["completed"]) == (70, 40)
+        print("✅ Forecast vs actual tile counts the last operation only")
+
+        assert dashboard["conflicts"]["week"]["conflicted_slots"] == 1
+        assert dashboard["conflicts"]["warning"] is True
+        print("✅ Conflicts tile warns about double-booked slots")
+
+        with app.app_context():
+            cache = get_cache('dashboard')
+            misses = cache.stats()["misses"]
+        client.get("/dashboard?date=2030-04-10")
+        with app.app_context():
+            assert cache.stats()["misses"] == misses
+
+        # A forecast write only recomputes the forecast tile
+        client.post("/forecast-plans", json={
+            "part_id": part_id, "company_id": company_id, "month": "2030-04-01", "week": 2, "forecasted_quantity": 30
+        })
+        dashboard = client.get("/dashboard?date=2030-04-10").get_json()
+        assert dashboard["forecast_vs_actual"]["forecasted"] == 150
+        with app.app_context():
+            assert cache.stats()["misses"] == misses + 1
+
+        # A schedule write recomputes every tile that reads schedules
+        schedule("2030-04-12", 1, 2, op20, lathe, 5)
+        dashboard = client.get("/dashboard?date=2030-04-10").get_json()
+        utilization = {m["machine_id"]: m for m in dashboard["utilization"]["machines"]}
+        assert utilization[lathe]["occupied_slots"] == 3
+        with app.app_context():
+            assert cache.stats()["misses"] == misses + 5
+        print("✅ Writes invalidate only the tiles that read the changed tables")
+
+        # The week of Monday 2030-09-30 ends in October: each month keeps its own count
+        schedule("2030-09-10", 1, 1, op10, vmc, 5)
+        schedule("2030-09-10", 1, 1, op20, vmc, 5)
+        september = client.get("/dashboard?date=2030-09-30").get_json()["conflicts"]
+        october = client.get("/dashboard?date=2030-10-02").get_json()["conflicts"]
+        assert september["week"] == october["week"]
+        assert september["month"]["conflicted_slots"] == 1
+        assert october["month"]["conflicted_slots"] == 0
+        print("✅ Conflicts tile keeps months apart within a week")
+
+        response = client.get("/dashboard?date=bad-date")
+        assert response.status_code == 400
+        print("✅ Invalid parameters handled correctly")
+
+        with app.app_context():
+            db.engine.dispose()
+
+def test_cache_eviction():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        with app.app_context():
+            cache = GenerationCache(max_entries=2)
+            for key in ["a", "b", "a", "c"]:
+                cache.get_or_compute(key, ["schedules"], lambda: key.upper())
+            assert cache.stats()["entries"] == 2
+            assert cache.stats()["hits"] == 1
+            cache.get_or_compute("b", ["schedules"], lambda: "B")
+            assert cache.stats()["misses"] == 4  # "b" was the least recently used entry
+            db.engine.dispose()
+        print("✅ Cache is bounded and evicts the least recently used entry")
+
+if __name__ == "__main__":
+    run_tests("dashboard", test_dashboard, test_cache_eviction)
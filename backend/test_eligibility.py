@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process operation/machine eligibility matrix.
+This script checks that the bitsets follow the assign/remove endpoints, also
+when the writes come from another worker process.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import db
+from app.services.eligibility import EligibilityMatrix, get_eligibility
+from testing import create_test_app, run_tests
+
+def test_eligibility_matrix():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+
+        company_id = client.post("/companies", json={"name": "Eligibility Co"}).get_json()["company_id"]
+        lathe_id = client.post("/machines", json={"name": "Lathe", "type": "CNC Lathe"}).get_json()["machine_id"]
+        vmc_id = client.post("/machines", json={"name": "VMC", "type": "VMC"}).get_json()["machine_id"]
+        part_id = client.post("/parts", json={"name": "Flange", "company_id": company_id}).get_json()["part_id"]
+        op10 = client.post("/operations", json={
+            "part_id": part_id, "sequence_number": 10, "machining_time": 5.0, "loading_time": 1.0
+        }).get_json()["operation_id"]
+        op20 = client.post("/operations", json={
+            "part_id": part_id, "sequence_number": 20, "machining_time": 5.0, "loading_time": 1.0
+        }).get_json()["operation_id"]
+
+        assert client.post(f"/operations/{op10}/machines/{lathe_id}").status_code == 201
+        assert client.post(f"/operations/{op10}/machines/{vmc_id}").status_code == 201
+        assert client.post(f"/operations/{op20}/machines/{vmc_id}").status_code == 201
+        assert client.post(f"/operations/{op20}/machines/{vmc_id}").status_code == 200
+
+        with app.app_context():
+            matrix = get_eligibility()
+            assert matrix.is_eligible(op10, lathe_id)
+            assert not matrix.is_eligible(op20, lathe_id)
+            assert sorted(matrix.eligible_machines(op10)) == sorted([lathe_id, vmc_id])
+            assert sorted(matrix.operations_for_machine(vmc_id)) == sorted([op10, op20])
+
+            # A fresh load from the database agrees with the cached copy
+            loaded = EligibilityMatrix.load()
+            assert sorted(loaded.eligible_machines(op10)) == sorted(matrix.eligible_machines(op10))
+        print("✅ Eligibility matrix follows machine assignments")
+
+        assert client.delete(f"/operations/{op10}/machines/{vmc_id}").status_code == 200
+        assert client.delete(f"/operations/{op10}/machines/{vmc_id}").status_code == 404
+        with app.app_context():
+            matrix = get_eligibility()
+            assert matrix.eligible_machines(op10) == [lathe_id]
+            assert matrix.operations_for_machine(vmc_id) == [op20]
+
+        response = client.get(f"/machines/{vmc_id}/eligible-operations")
+        assert [op["operation_id"] for op in response.get_json()] == [op20]
+        print("✅ Removing a machine updates both lookup directions")
+
+        # A second app on the same database stands in for another gunicorn worker
+        other = create_test_app(tmpdir).test_client()
+        ids = lambda response: [op["operation_id"] for op in response.get_json()]
+        assert ids(other.get(f"/machines/{vmc_id}/eligible-operations")) == [op20]
+        assert other.post(f"/operations/{op10}/machines/{vmc_id}").status_code == 201
+        assert client.post(f"/operations/{op10}/machines/{vmc_id}").status_code == 200
+        assert sorted(ids(client.get(f"/machines/{vmc_id}/eligible-operations"))) == sorted([op10, op20])
+        assert client.delete(f"/operations/{op20}/machines/{vmc_id}").status_code == 200
+        assert other.delete(f"/operations/{op20}/machines/{vmc_id}").status_code == 404
+        assert ids(other.get(f"/machines/{vmc_id}/eligible-operations")) == [op10]
+        print("✅ Writes from another worker reload the matrix")
+
+        with app.app_context():
+            db.engine.dispose()
+
+if __name__ == "__main__":
+    run_tests("eligibility", test_eligibility_matrix)
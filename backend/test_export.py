@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for the columnar schedule snapshot export.
+This script checks GET /export/snapshot in npz format (live and archived
+rows, joined operation times and machine type, NULL masks, date ranges,
+multiple record batches) and the Arrow/Parquet formats when pyarrow is
+installed (501 otherwise).
+"""
+
+import sys
+import os
+import io
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.archive import archive_completed_schedules
+from app.services.snapshot import stream_snapshot, available
+from datetime import date
+from sqlalchemy import text
+import numpy as np
+from testing import create_test_app, run_tests
+
+def setup_schedules(client):
+    company_id = client.post("/companies", json={"name": "Export Co"}).get_json()["company_id"]
+    part_id = client.post("/parts", json={"name": "Flange", "company_id": company_id}).get_json()["part_id"]
+    machine_id = client.post("/machines", json={"name": "VMC 1", "type": "VMC"}).get_json()["machine_id"]
+    operation_id = client.post("/operations", json={
+        "part_id": part_id, "sequence_number": 10, "machining_time": 3.5, "loading_time": 0.5
+    }).get_json()["operation_id"]
+    ids = []
+    for day, status, sub_batch_id in [("2030-01-07", "completed", None), ("2030-03-04", "planned", "B1"),
+                                      ("2030-03-05", "planned", "B1"), ("2030-04-01", "planned", "B2")]:
+        ids.append(client.post("/production-schedules", json={
+            "part_id": part_id, "operation_id": operation_id, "machine_id": machine_id, "date": day,
+            "shift_number": 2, "slot_number": 1, "quantity_scheduled": 12, "sub_batch_id": sub_batch_id,
+            "status": status
+        }).get_json()["schedule_id"])
+    return ids
+
+def orphan_archived_row(app):
+    # The archived row's operation no longer exists, so its joined columns are NULL
+    with app.app_context():
+        from app import db
+        assert archive_completed_schedules(30, 100, today=date(2030, 6, 1)) == 1
+        db.session.execute(text("UPDATE archive.production_schedules SET operation_id = 999"))
+        db.session.commit()
+
+def load_npz(data):
+    with np.load(io.BytesIO(data)) as snapshot:
+        return {name: snapshot[name] for name in snapshot.files}
+
+def test_npz_snapshot():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        ids = setup_schedules(client)
+        orphan_archived_row(app)
+
+        response = client.get("/export/snapshot?format=npz")
+        assert response.status_code == 200
+        assert "attachment" in response.headers["Content-Disposition"]
+        columns = load_npz(response.get_data())
+        assert columns["schedule_id"].tolist() == ids
+        assert columns["date"].dtype == np.dtype("datetime64[D]")
+        assert str(columns["date"][0]) == "2030-01-07"
+        assert columns["archived"].tolist() == [True, False, False, False]
+        assert columns["machine_type"].tolist() == ["VMC"] * 4
+        assert columns["machining_time"][1] == 3.5 and columns["loading_time"][1] == 0.5
+        assert columns["sub_batch_id"].tolist() == ["", "B1", "B1", "B2"]
+        with app.app_context():
+            from app.shop_calendar import get_calendar
+            assert columns["slot_key"][1] == get_calendar().slot_key(date(2030, 3, 4), 2, 1)
+        print("✅ npz snapshot holds live and archived rows with operation times and machine type")
+
+        assert columns["sequence_number"].tolist() == [0, 10, 10, 10]
+        assert columns["sequence_number_valid"].tolist() == [False, True, True, True]
+        assert np.isnan(columns["machining_time"][0]) and not columns["machining_time_valid"][0]
+        assert columns["sub_batch_id_valid"].tolist() == [False, True, True, True]
+        assert columns["machine_type_valid"].all()
+        print("✅ NULLs come with a validity mask in npz")
+
+        columns = load_npz(client.get("/export/snapshot?format=npz&from=2030-03-01&to=2030-03-31").get_data())
+        assert columns["schedule_id"].tolist() == ids[1:3]
+        columns = load_npz(client.get("/export/snapshot?format=npz&from=2031-01-01").get_data())
+        assert columns["schedule_id"].tolist() == [] and columns["date"].dtype == np.dtype("datetime64[D]")
+        print("✅ Date ranges, including empty ones")
+
+        with app.test_request_context():
+            data = b"".join(stream_snapshot("npz", batch_rows=1))
+        assert load_npz(data)["schedule_id"].tolist() == ids
+        print("✅ Record batches are joined into whole columns")
+
+        assert client.get("/export/snapshot?format=csv").status_code == 400
+        assert client.get("/export/snapshot?format=npz&from=March").status_code == 400
+
+def test_arrow_snapshot():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        ids = setup_schedules(client)
+        orphan_archived_row(app)
+
+        if not available("arrow"):
+            assert client.get("/export/snapshot?format=arrow").status_code == 501
+            assert client.get("/export/snapshot?format=parquet").status_code == 501
+            print("✅ Arrow and Parquet answer 501 without pyarrow")
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        response = client.get("/export/snapshot?format=arrow")
+        assert response.status_code == 200
+        table = pa.ipc.open_file(pa.BufferReader(response.get_data())).read_all()
+        assert table.column("schedule_id").to_pylist() == ids
+        assert table.column("date").to_pylist()[1] == date(2030, 3, 4)
+        assert table.column("sequence_number").to_pylist() == [None, 10, 10, 10]
+        assert table.column("machining_time").to_pylist()[0] is None
+        response = client.get("/export/snapshot")
+        assert response.headers["Content-Type"] == "application/vnd.apache.arrow.file"
+        response.close()
+        # pre_buffer reads on pyarrow's IO thread pool, which can abort the interpreter at exit
+        table = pq.read_table(io.BytesIO(client.get("/export/snapshot?format=parquet").get_data()), pre_buffer=False)
+        assert table.column("machine_type").to_pylist() == ["VMC"] * 4
+        assert table.column("sub_batch_id").to_pylist() == [None, "B1", "B1", "B2"]
+        assert "sequence_number_valid" not in table.column_names
+        print("✅ Arrow and Parquet snapshots, with NULLs as nulls")
+
+if __name__ == "__main__":
+    run_tests("export", test_npz_snapshot, test_arrow_snapshot)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for factory shards.
+This script checks that each factory gets its own database, archive, caches
+and jobs, selected by header or path prefix, and the cross-factory endpoints.
+"""
+
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.jobs import register_job
+from testing import create_test_app, run_tests
+
+@register_job('test_factory_machines')
+def factory_machines_job(params, progress):
+    from app.models.machine import Machine
+    progress(0.5, "Reading machines")
+    return sorted(machine.name for machine in Machine.query.all())
+
+def test_factories():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir, FACTORIES={
+            'north': os.path.join(tmpdir, "north.db"),
+            'south': os.path.join(tmpdir, "south.db"),
+        })
+        client = app.test_client()
+        assert os.path.exists(os.path.join(tmpdir, "north.db"))
+        assert os.path.exists(os.path.join(tmpdir, "north_archive.db"))
+        assert client.get("/factories").get_json() == {"default": "default", "factories": ["default", "north", "south"]}
+        print("✅ Every factory gets its own database and archive")
+
+        north = {"X-Factory": "north"}
+        client.post("/machines", json={"name": "Home Lathe", "type": "CNC Lathe"})
+        client.post("/machines", json={"name": "North Lathe", "type": "CNC Lathe"}, headers=north)
+        client.post("/machines", json={"name": "North Mill", "type": "VMC"}, headers=north)
+        assert client.post("/factory/south/machines", json={"name": "South Mill", "type": "VMC"}).status_code == 201
+
+        names = lambda response: sorted(machine["name"] for machine in response.get_json())
+        assert names(client.get("/machines")) == ["Home Lathe"]
+        assert names(client.get("/machines", headers=north)) == ["North Lathe", "North Mill"]
+        assert names(client.get("/factory/north/machines")) == ["North Lathe", "North Mill"]
+        assert names(client.get("/machines", headers={"X-Factory": "south"})) == ["South Mill"]
+        assert names(client.get("/factory/default/machines")) == ["Home Lathe"]
+        assert client.get("/machines", headers={"X-Factory": "west"}).status_code == 404
+        assert client.get("/factory/west/machines").status_code == 404
+        print("✅ Factory selected by header or path prefix")
+
+        # Each factory has written its machines table once, so the generations
+        # match: only per-factory caches keep the tiles apart
+        home = client.get("/dashboard?date=2030-04-10").get_json()["utilization"]["machines"]
+        south = client.get("/factory/south/dashboard?date=2030-04-10").get_json()["utilization"]["machines"]
+        assert [machine["name"] for machine in home] == ["Home Lathe"]
+        assert [machine["name"] for machine in south] == ["South Mill"]
+        print("✅ Caches are kept per factory")
+
+        for path, quantity in [("", 100), ("/factory/north", 40)]:
+            company_id = client.post(f"{path}/companies", json={"name": "Co"}).get_json()["company_id"]
+            part_id = client.post(f"{path}/parts", json={"name": "Shaft", "company_id": company_id}).get_json()["part_id"]
+            response = client.post(f"{path}/monthly-plans", json={
+                "part_id": part_id, "company_id": company_id, "month": "2030-04-01", "planned_quantity": quantity
+            })
+            assert response.status_code == 201
+
+        # Operation 1 and machine 1 exist in both factories but are different rows:
+        # eligibility assigned in one must not show up in the other
+        for path in ("", "/factory/north"):
+            part_id = client.get(f"{path}/parts").get_json()[0]["part_id"]
+            response = client.post(f"{path}/operations", json={
+                "part_id": part_id, "sequence_number": 10, "machining_time": 1.0, "loading_time": 0
+            })
+            assert response.get_json()["operation_id"] == 1
+        operation_ids = lambda response: [op["operation_id"] for op in response.get_json()]
+        assert client.post("/operations/1/machines/1").status_code == 201
+        assert operation_ids(client.get("/machines/1/eligible-operations")) == [1]
+        assert operation_ids(client.get("/machines/1/eligible-operations", headers=north)) == []
+        assert client.delete("/operations/1/machines/1", headers=north).status_code == 404
+        assert client.post("/operations/1/machines/1", headers=north).status_code == 201
+        assert client.delete("/operations/1/machines/1").status_code == 200
+        assert operation_ids(client.get("/machines/1/eligible-operations")) == []
+        assert operation_ids(client.get("/factory/north/machines/1/eligible-operations")) == [1]
+        assert client.get("/factory/north/operations/1/eligible-machines").get_json()[0]["name"] == "North Lathe"
+        print("✅ Machine eligibility is kept per factory")
+
+        utilization = client.get("/factories/utilization?date=2030-04-10").get_json()
+        assert utilization["from"] == "2030-04-08" and utilization["errors"] == {}
+        assert [f["factory"] for f in utilization["factories"]] == ["default", "north", "south"]
+        assert [f["machines"] for f in utilization["factories"]] == [1, 2, 1]
+        assert sorted((m["factory"], m["name"]) for m in utilization["machines"]) == [
+            ("default", "Home Lathe"), ("north", "North Lathe"), ("north", "North Mill"), ("south", "South Mill")
+        ]
+        plan = client.get("/factories/plan-vs-actual?date=2030-04-10").get_json()
+        assert plan["month"] == "2030-04-01" and plan["planned"] == 140
+        assert {f["factory"]: f["planned"] for f in plan["factories"]} == {"default": 100, "north": 40, "south": 0}
+        assert client.get("/factories/utilization?date=April").status_code == 400
+        print("✅ Cross-factory utilization and plan vs actual")
+
+        with app.app_context():
+            from app.factories import fan_out, current_factory
+
+            def machine_count():
+                from app.models.machine import Machine
+                if current_factory() == "south":
+                    raise RuntimeError("south is down")
+                return Machine.query.count()
+
+            app.logger.disabled = True  # the failure is logged with its traceback
+            results, errors = fan_out(machine_count)
+            app.logger.disabled = False
+            assert results == {"default": 1, "north": 2} and errors == {"south": "south is down"}
+        print("✅ A failing factory does not stop the others")
+
+        job_id = client.post("/jobs", json={"name": "test_factory_machines"}, headers=north).get_json()["job_id"]
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            job = client.get(f"/jobs/{job_id}", headers=north).get_json()
+            if job["status"] in ("succeeded", "failed"):
+                break
+            time.sleep(0.05)
+        assert job["status"] == "succeeded", job
+        assert job["result"] == ["North Lathe", "North Mill"] and job["message"] == "Reading machines"
+        assert client.get(f"/jobs/{job_id}").status_code == 404
+        print("✅ Jobs run on the factory they were submitted to")
+
+def test_default_app_after_factories():
+    # The factory binds of one app must not leak into a later app in the same process
+    from app import db
+    with tempfile.TemporaryDirectory() as tmpdir:
+        create_test_app(tmpdir, FACTORIES={'north': os.path.join(tmpdir, "north.db")})
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+        app = create_test_app(tmpdir)
+        assert app.test_client().get("/machines").status_code == 200
+    print("✅ A default app after a factories app creates and drops its tables")
+
+if __name__ == "__main__":
+    run_tests("factory", test_factories, test_default_app_after_factories)
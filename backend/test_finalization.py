@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for schedule finalization.
+This script checks that POST /schedule/finalize reports double-bookings,
+ineligible machines, part/operation mismatches and out-of-order operations
+in one response, locks only clean ranges, and that locked ranges reject
+plan changes but still accept status updates.
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import db
+from app.services.archive import archive_completed_schedules
+from datetime import date
+from testing import create_test_app, run_tests
+
+def setup_shop(client):
+    company_id = client.post("/companies", json={"name": "Final Co"}).get_json()["company_id"]
+    lathe = client.post("/machines", json={"name": "Lathe 1", "type": "CNC Lathe"}).get_json()["machine_id"]
+    vmc = client.post("/machines", json={"name": "VMC 1", "type": "VMC"}).get_json()["machine_id"]
+    shop = {"lathe": lathe, "vmc": vmc, "parts": []}
+    for name in ["Flange", "Shaft"]:
+        part_id = client.post("/parts", json={"name": name, "company_id": company_id}).get_json()["part_id"]
+        operations = []
+        for sequence_number, machine_id in [(10, lathe), (20, vmc)]:
+            operation_id = client.post("/operations", json={
+                "part_id": part_id, "sequence_number": sequence_number, "machining_time": 2.0, "loading_time": 0
+            }).get_json()["operation_id"]
+            client.post(f"/operations/{operation_id}/machines/{machine_id}")
+            operations.append(operation_id)
+        shop["parts"].append({"part_id": part_id, "operations": operations})
+    return shop
+
+def book(client, part, operation_index, machine_id, day, shift_number, slot_number, sub_batch="B1", part_id=None):
+    response = client.post("/production-schedules", json={
+        "part_id": part_id or part["part_id"], "operation_id": part["operations"][operation_index],
+        "machine_id": machine_id, "date": day, "shift_number": shift_number, "slot_number": slot_number,
+        "quantity_scheduled": 10, "sub_batch_id": sub_batch
+    })
+    assert response.status_code == 201
+    return response.get_json()["schedule_id"]
+
+def test_finalization():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        shop = setup_shop(client)
+        flange, shaft = shop["parts"]
+        lathe, vmc = shop["lathe"], shop["vmc"]
+
+        # A clean sub-batch: OP10 on the lathe, then OP20 on the VMC
+        flange_op10 = book(client, flange, 0, lathe, "2030-03-04", 1, 1)
+        book(client, flange, 1, vmc, "2030-03-04", 1, 2)
+        # Shaft OP20 is scheduled before its OP10, and double-books the VMC with Flange OP20
+        late_op10 = book(client, shaft, 0, lathe, "2030-03-05", 1, 1)
+        book(client, shaft, 1, vmc, "2030-03-04", 1, 2)
+        # Shaft OP10 on the VMC (not eligible), and a row naming the wrong part
+        ineligible = book(client, shaft, 0, vmc, "2030-03-06", 2, 1, sub_batch="B2")
+        mismatch = book(client, shaft, 0, lathe, "2030-03-06", 2, 2, sub_batch=None, part_id=flange["part_id"])
+
+        response = client.post("/schedule/finalize?from=2030-03-01&to=2030-03-31")
+        assert response.status_code == 409
+        result = response.get_json()
+        violations = result["violations"]
+        assert result["clean"] is False and result["lock"] is None
+        assert len(violations["double_bookings"]) == 1
+        assert violations["double_bookings"][0]["bookings"] == 2
+        assert len(violations["double_bookings"][0]["schedule_ids"]) == 2
+        assert [v["schedule_id"] for v in violations["ineligible_machines"]] == [ineligible]
+        assert [v["schedule_id"] for v in violations["part_mismatches"]] == [mismatch]
+        assert len(violations["precedence"]) == 1
+        assert violations["precedence"][0]["part_id"] == shaft["part_id"]
+        assert result["violation_count"] == 4
+        assert client.get("/schedule/locks").get_json() == []
+        print("✅ Every violation is reported in one response and nothing is locked")
+
+        # Fix everything: Shaft goes to a later sub-batch slot order, bad rows removed
+        client.put(f"/production-schedules/{late_op10}", json={"date": "2030-03-02"})
+        client.delete(f"/production-schedules/{ineligible}")
+        client.delete(f"/production-schedules/{mismatch}")
+        shaft_op20 = [s for s in client.get("/production-schedules/by-part/" + str(shaft["part_id"])).get_json()
+                      if s["operation_id"] == shaft["operations"][1]][0]["schedule_id"]
+        client.put(f"/production-schedules/{shaft_op20}", json={"shift_number": 2})
+
+        response = client.post("/schedule/finalize?from=2030-03-01&to=2030-03-31")
+        assert response.status_code == 201
+        result = response.get_json()
+        assert result["clean"] and result["violation_count"] == 0
+        lock_id = result["lock"]["lock_id"]
+        assert client.get("/schedule/locks").get_json()[0]["from"] == "2030-03-01"
+        print("✅ A clean range is locked")
+
+        response = client.put(f"/production-schedules/{shaft_op20}", json={"slot_number": 1})
+        assert response.status_code == 409
+        assert client.put(f"/production-schedules/{shaft_op20}", json={"date": "2030-04-01"}).status_code == 409
+        assert client.delete(f"/production-schedules/{shaft_op20}").status_code == 409
+        response = client.post("/production-schedules", json={
+            "part_id": flange["part_id"], "operation_id": flange["operations"][0], "machine_id": lathe,
+            "date": "2030-03-10", "shift_number": 1, "slot_number": 1, "quantity_scheduled": 5
+        })
+        assert response.status_code == 409
+        # Mass shifts leave locked rows in place and report them
+        response = client.post("/production-schedules/shift", json={"part_id": shaft["part_id"], "offset_slots": 1})
+        assert response.status_code == 200
+        result = response.get_json()
+        assert result["moved"] == 0 and shaft_op20 in [row["schedule_id"] for row in result["unplaced"]]
+        assert {row["reason"] for row in result["unplaced"]} == {"Schedule is in a finalized range"}
+        print("✅ Plan changes inside a locked range are rejected")
+
+        response = client.put(f"/production-schedules/{shaft_op20}/status", json={"status": "completed"})
+        assert response.status_code == 200
+        assert client.get(f"/production-schedules/{shaft_op20}").get_json()["slot_number"] == 2
+        with app.app_context():
+            assert archive_completed_schedules(0, 100, today=date(2030, 6, 1)) == 1
+        print("✅ Status updates and archiving still work in a locked range")
+
+        assert client.post("/schedule/finalize?from=2030-03-31&to=2030-03-01").status_code == 400
+        assert client.post("/schedule/finalize?from=2030-03-01").status_code == 400
+        assert client.post("/schedule/finalize?from=March&to=2030-03-31").status_code == 400
+        print("✅ Invalid ranges are rejected")
+
+        assert client.delete(f"/schedule/locks/{lock_id}").status_code == 200
+        assert client.put(f"/production-schedules/{late_op10}", json={"slot_number": 2}).status_code == 200
+        print("✅ Removing the lock reopens the range")
+
+        # The write lock is held from the first check, so another connection
+        # cannot write schedules between the checks and the lock insert
+        from app.services import finalization
+        other = sqlite3.connect(os.path.join(tmpdir, "scheduling.db"), timeout=0)
+        concurrent = "UPDATE production_schedules SET quantity_scheduled = 1 WHERE schedule_id = ?"
+        checks = finalization.precedence_violations
+        errors = []
+
+        def write_during_checks(date_from, date_to):
+            try:
+                other.execute(concurrent, (late_op10,))
+                other.commit()
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+            return checks(date_from, date_to)
+
+        finalization.precedence_violations = write_during_checks
+        try:
+            with app.app_context():
+                assert finalization.finalize_range(date(2031, 1, 1), date(2031, 1, 31))["clean"]
+                db.session.commit()
+        finally:
+            finalization.precedence_violations = checks
+        assert errors and "locked" in errors[0]
+        other.execute(concurrent, (late_op10,))
+        other.commit()
+        other.close()
+        print("✅ Checks and the lock insert run under one write lock")
+
+if __name__ == "__main__":
+    run_tests("finalization", test_finalization)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for rolling forecasts up to machine-type load.
+This script checks required vs available machine-hours per week.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import db
+from datetime import date
+from testing import create_test_app, run_tests
+
+def setup_routing(client):
+    """One part with OP10 on a lathe or two VMCs and OP20 without eligible machines"""
+    company_id = client.post("/companies", json={"name": "Forecast Co"}).get_json()["company_id"]
+    lathe_id = client.post("/machines", json={"name": "Lathe 1", "type": "CNC Lathe"}).get_json()["machine_id"]
+    vmc_ids = [
+        client.post("/machines", json={"name": f"VMC {i}", "type": "VMC"}).get_json()["machine_id"]
+        for i in (1, 2)
+    ]
+    part_id = client.post("/parts", json={"name": "Forecast Hub", "company_id": company_id}).get_json()["part_id"]
+    op10 = client.post("/operations", json={
+        "part_id": part_id, "sequence_number": 10, "machining_time": 50.0, "loading_time": 10.0
+    }).get_json()["operation_id"]
+    client.post("/operations", json={
+        "part_id": part_id, "sequence_number": 20, "machining_time": 20.0, "loading_time": 10.0
+    })
+    for machine_id in [lathe_id] + vmc_ids:
+        client.post(f"/operations/{op10}/machines/{machine_id}")
+    return company_id, part_id
+
+def test_forecast_load():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        company_id, part_id = setup_routing(client)
+
+        start = date(2030, 1, 1)
+        client.post("/forecast-plans", json={
+            "part_id": part_id, "company_id": company_id, "month": "2030-01-01", "week": 2, "forecasted_quantity": 60
+        })
+        client.post("/forecast-plans", json={
+            "part_id": part_id, "company_id": company_id, "month": "2030-02-01", "week": 4, "forecasted_quantity": 30
+        })
+
+        response = client.get(f"/forecast/load?months=2&start={start.isoformat()}")
+        assert response.status_code == 200
+        load = response.get_json()
+        assert len(load["weeks"]) == 8
+
+        # 60 pieces x 60 min = 60 h in week 2, split 1/3 lathe and 2/3 VMC
+        lathe = load["machine_types"]["CNC Lathe"]
+        vmc = load["machine_types"]["VMC"]
+        assert lathe["required_hours"][1] == 20.0
+        assert vmc["required_hours"][1] == 40.0
+        assert vmc["required_hours"][7] == 20.0
+        assert vmc["available_hours"][0] == 2 * lathe["available_hours"][0]
+        # OP20 has no eligible machine: 60 x 30 min = 30 h unassigned
+        assert load["unassigned_hours"][1] == 30.0
+        print("✅ Forecast rolled up to required vs available hours per machine type")
+
+        response = client.get("/forecast/load?months=0")
+        assert response.status_code == 400
+        response = client.get("/forecast/load?start=bad-date")
+        assert response.status_code == 400
+        print("✅ Invalid parameters handled correctly")
+
+        with app.app_context():
+            db.engine.dispose()
+
+if __name__ == "__main__":
+    run_tests("forecast load", test_forecast_load)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the local background job runner.
+This script checks job submission, progress/results, the bounded queue and
+recovery of jobs interrupted by a restart.
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import db
+from app.models.job import Job
+from app.services.jobs import register_job
+from testing import create_test_app, run_tests
+
+release_blocking_job = threading.Event()
+
+@register_job('test_blocking')
+def blocking_job(params, progress):
+    progress(0.5, "waiting")
+    release_blocking_job.wait(10)
+    return {"done": True}
+
+def wait_for_job(client, job_id, statuses=("succeeded", "failed"), timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/jobs/{job_id}").get_json()
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not reach {statuses}")
+
+def test_jobs():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir, JOB_WORKERS=1, JOB_QUEUE_SIZE=1)
+        client = app.test_client()
+
+        # Submit a job and poll for its result
+        response = client.post("/jobs", json={"name": "forecast_load", "params": {"months": 1}})
+        assert response.status_code == 202
+        job_id = response.get_json()["job_id"]
+        assert response.headers["Location"] == f"/jobs/{job_id}"
+        job = wait_for_job(client, job_id)
+        assert job["status"] == "succeeded", job["error"]
+        assert job["progress"] == 1.0
+        assert len(job["result"]["weeks"]) == 4
+        print("✅ Job ran in the background and stored its result")
+
+        # Failing jobs are recorded with the error
+        response = client.post("/jobs", json={"name": "reconcile_plan", "params": {"plan_id": 12345}})
+        job = wait_for_job(client, response.get_json()["job_id"])
+        assert job["status"] == "failed"
+        assert "not found" in job["error"]
+        print("✅ Failed job recorded with its error")
+
+        # Bounded queue: one running + one waiting, the third is rejected
+        release_blocking_job.clear()
+        running = client.post("/jobs", json={"name": "test_blocking"}).get_json()["job_id"]
+        job = wait_for_job(client, running, statuses=("running",))
+        deadline = time.time() + 10
+        while job["message"] != "waiting" and time.time() < deadline:
+            time.sleep(0.05)
+            job = client.get(f"/jobs/{running}").get_json()
+        assert job["progress"] == 0.5
+        assert client.post("/jobs", json={"name": "test_blocking"}).status_code == 202
+        assert client.post("/jobs", json={"name": "test_blocking"}).status_code == 503
+        # Interactive endpoints keep answering while the job runs
+        assert client.get("/companies").status_code == 200
+        release_blocking_job.set()
+        wait_for_job(client, running)
+        print("✅ Bounded queue rejects submissions when full")
+
+        assert client.post("/jobs", json={"name": "no_such_job"}).status_code == 400
+        assert client.post("/jobs", json={}).status_code == 400
+        assert client.get("/jobs/does-not-exist").status_code == 404
+
+        # A job left running by a dead process is failed on the next start
+        with app.app_context():
+            db.session.add(Job(job_id="interrupted", name="forecast_load", status="running", worker="nohost:1"))
+            db.session.add(Job(job_id="orphan", name="forecast_load", status="running",
+                               worker=f"{__import__('socket').gethostname()}:999999999"))
+            db.session.commit()
+            db.engine.dispose()
+
+        restarted = create_test_app(tmpdir)
+        client = restarted.test_client()
+        assert client.get("/jobs/orphan").get_json()["status"] == "failed"
+        assert client.get("/jobs/interrupted").get_json()["status"] == "running"  # other host: left alone
+        jobs = client.get("/jobs?status=succeeded").get_json()
+        assert any(j["job_id"] == job_id for j in jobs)
+        print("✅ Job state survives a restart and orphaned jobs are failed")
+
+        with restarted.app_context():
+            db.engine.dispose()
+
+if __name__ == "__main__":
+    run_tests("job runner", test_jobs)
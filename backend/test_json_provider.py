@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the JSON provider.
+This script checks that responses encode dates as ISO strings with the
+native encoder and with the standard-library fallback, and that schedule
+list views return the same rows as to_dict().
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import json_provider
+from app.models.production_schedule import ProductionSchedule
+from datetime import date, datetime
+import numpy as np
+from testing import create_test_app, run_tests
+
+PAYLOAD = {"b": date(2030, 3, 4), "a": datetime(2030, 3, 4, 6, 30), "rows": [1, "x", None]}
+EXPECTED = '{"a":"2030-03-04T06:30:00","b":"2030-03-04","rows":[1,"x",null]}'
+
+def test_encoders():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        assert isinstance(app.json, json_provider.ScheduleJSONProvider)
+        native = json_provider.orjson
+        try:
+            for encoder in ([native, None] if native else [None]):
+                json_provider.orjson = encoder
+                with app.test_request_context():
+                    response = app.json.response(PAYLOAD)
+                assert response.get_data(as_text=True) == EXPECTED + "\n"
+                assert app.json.loads(app.json.dumps(PAYLOAD)) == app.json.loads(EXPECTED)
+                print(f"✅ Dates encode as ISO strings ({'orjson' if encoder else 'stdlib'})")
+        finally:
+            json_provider.orjson = native
+
+        if native:
+            # NumPy scalars and integer keys, as returned by the NumPy services
+            assert app.json.loads(app.json.dumps({7: np.float64(1.5)})) == {"7": 1.5}
+            print("✅ NumPy values and integer keys encode natively")
+
+def test_schedule_rows():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        company_id = client.post("/companies", json={"name": "JSON Co"}).get_json()["company_id"]
+        part_id = client.post("/parts", json={"name": "Flange", "company_id": company_id}).get_json()["part_id"]
+        machine_id = client.post("/machines", json={"name": "Lathe 1", "type": "CNC Lathe"}).get_json()["machine_id"]
+        operation_id = client.post("/operations", json={
+            "part_id": part_id, "sequence_number": 10, "machining_time": 2.0, "loading_time": 0
+        }).get_json()["operation_id"]
+        for slot_number in (1, 2):
+            client.post("/production-schedules", json={
+                "part_id": part_id, "operation_id": operation_id, "machine_id": machine_id,
+                "date": "2030-03-04", "shift_number": 1, "slot_number": slot_number,
+                "quantity_scheduled": 5, "sub_batch_id": "B1"
+            })
+
+        with app.app_context():
+            expected = [schedule.to_dict() for schedule in ProductionSchedule.query.all()]
+        for url in ["/production-schedules", "/production-schedules/by-date/2030-03-04",
+                    f"/production-schedules/by-machine/{machine_id}?date=2030-03-04",
+                    f"/production-schedules/by-part/{part_id}"]:
+            assert client.get(url).get_json() == expected, url
+        assert client.get(f"/production-schedules/by-machine/{machine_id}?date=2030-03-05").get_json() == []
+        print("✅ Schedule views return the same rows as to_dict()")
+
+if __name__ == "__main__":
+    run_tests("JSON provider", test_encoders, test_schedule_rows)
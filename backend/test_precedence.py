@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the sub-batch precedence checker.
+This script checks GET /production-schedules/precedence-violations and the
+precedence warnings returned by schedule creates and updates.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing import create_test_app, run_tests
+
+def setup_part(client):
+    company_id = client.post("/companies", json={"name": "Sequence Co"}).get_json()["company_id"]
+    machine_id = client.post("/machines", json={"name": "Lathe 1", "type": "CNC Lathe"}).get_json()["machine_id"]
+    part_id = client.post("/parts", json={"name": "Shaft", "company_id": company_id}).get_json()["part_id"]
+    operations = [client.post("/operations", json={
+        "part_id": part_id, "sequence_number": sequence_number, "machining_time": 2.0, "loading_time": 0
+    }).get_json()["operation_id"] for sequence_number in (10, 20, 30)]
+    return part_id, operations, machine_id
+
+def test_precedence():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        part_id, (op10, op20, op30), machine_id = setup_part(client)
+
+        def book(operation_id, day, shift_number, slot_number, sub_batch_id="B1"):
+            response = client.post("/production-schedules", json={
+                "part_id": part_id, "operation_id": operation_id, "machine_id": machine_id, "date": day,
+                "shift_number": shift_number, "slot_number": slot_number, "quantity_scheduled": 10,
+                "sub_batch_id": sub_batch_id
+            })
+            assert response.status_code == 201
+            return response.get_json()
+
+        # OP10 split over two slots, then OP20 and OP30 in order
+        book(op10, "2030-03-04", 1, 1)
+        book(op10, "2030-03-04", 1, 2)
+        created = book(op20, "2030-03-04", 2, 1)
+        assert created["warnings"]["precedence_violations"] == []
+        op30_row = book(op30, "2030-03-05", 1, 1)["schedule_id"]
+        result = client.get("/production-schedules/precedence-violations").get_json()
+        assert result["violation_count"] == 0
+        print("✅ Operations of one sequence number may share or split slots")
+
+        # OP30 moved into the slot of OP20: both occupy the same slot
+        response = client.put(f"/production-schedules/{op30_row}", json={"date": "2030-03-04", "shift_number": 2})
+        violations = response.get_json()["warnings"]["precedence_violations"]
+        assert [v["schedule_id"] for v in violations] == [op30_row]
+        assert violations[0]["predecessor"] == {"date": "2030-03-04", "shift_number": 2, "slot_number": 1}
+        print("✅ Updates report the touched sub-batch's violations")
+
+        # A new OP10 row after everything else breaks OP20 and OP30
+        created = book(op10, "2030-03-06", 1, 1)
+        assert len(created["warnings"]["precedence_violations"]) == 2
+        # Another sub-batch is checked on its own
+        assert book(op30, "2030-03-01", 1, 1, sub_batch_id="B2")["warnings"]["precedence_violations"] == []
+        print("✅ Creates report the touched sub-batch's violations")
+
+        # The range picks sub-batches with a row in it and checks them whole
+        result = client.get("/production-schedules/precedence-violations?from=2030-03-06&to=2030-03-06").get_json()
+        assert result["violation_count"] == 2 and result["sub_batches"] == 1
+        assert {v["operation_id"] for v in result["violations"]} == {op20, op30}
+        result = client.get("/production-schedules/precedence-violations?from=2030-03-01&to=2030-03-01").get_json()
+        assert result["violation_count"] == 0
+
+        # Sub-batch ids are per part: another part's B1 in the range does not pull in this part's B1
+        company_id = client.get("/companies").get_json()[0]["company_id"]
+        other_part = client.post("/parts", json={"name": "Flange", "company_id": company_id}).get_json()["part_id"]
+        other_operation = client.post("/operations", json={
+            "part_id": other_part, "sequence_number": 10, "machining_time": 2.0, "loading_time": 0
+        }).get_json()["operation_id"]
+        response = client.post("/production-schedules", json={
+            "part_id": other_part, "operation_id": other_operation, "machine_id": machine_id, "date": "2030-03-02",
+            "shift_number": 1, "slot_number": 1, "quantity_scheduled": 10, "sub_batch_id": "B1"
+        })
+        assert response.status_code == 201
+        result = client.get("/production-schedules/precedence-violations?from=2030-03-02&to=2030-03-02").get_json()
+        assert result["violation_count"] == 0 and result["sub_batches"] == 0
+        assert client.get("/production-schedules/precedence-violations").get_json()["violation_count"] == 2
+        assert client.get("/production-schedules/precedence-violations?from=March").status_code == 400
+        print("✅ Precedence violations by date range")
+
+if __name__ == "__main__":
+    run_tests("precedence", test_precedence)
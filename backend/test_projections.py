@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for monthly plan projections.
+This script checks projected completion slots and lateness from the live
+schedule, overdue rows, the bulk endpoint and per-part cache invalidation.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import db
+from app.models.monthly_plan import MonthlyPlan
+from app.services.projections import plan_projections
+from datetime import date
+from testing import create_test_app, run_tests
+
+def setup_shop(client):
+    company_id = client.post("/companies", json={"name": "Projection Co"}).get_json()["company_id"]
+    lathe = client.post("/machines", json={"name": "Lathe 1", "type": "CNC Lathe"}).get_json()["machine_id"]
+    vmc = client.post("/machines", json={"name": "VMC 1", "type": "VMC"}).get_json()["machine_id"]
+    parts = {}
+    for name, quantity in [("Flange", 100), ("Shaft", 50), ("Bush", 80)]:
+        part_id = client.post("/parts", json={"name": name, "company_id": company_id}).get_json()["part_id"]
+        operations = []
+        for sequence_number, machine_id in [(10, lathe), (20, vmc)]:
+            operation_id = client.post("/operations", json={
+                "part_id": part_id, "sequence_number": sequence_number, "machining_time": 2.0, "loading_time": 0
+            }).get_json()["operation_id"]
+            client.post(f"/operations/{operation_id}/machines/{machine_id}")
+            operations.append(operation_id)
+        plan_id = client.post("/monthly-plans", json={
+            "part_id": part_id, "company_id": company_id, "month": "2030-03-01", "planned_quantity": quantity
+        }).get_json()["plan_id"]
+        parts[name] = {"part_id": part_id, "operations": operations, "plan_id": plan_id, "machine_id": vmc}
+    return parts
+
+def add_last_operation(client, part, day, shift_number, slot_number, quantity):
+    response = client.post("/production-schedules", json={
+        "part_id": part["part_id"], "operation_id": part["operations"][-1], "machine_id": part["machine_id"],
+        "date": day, "shift_number": shift_number, "slot_number": slot_number, "quantity_scheduled": quantity
+    })
+    assert response.status_code == 201
+    return response.get_json()["schedule_id"]
+
+def test_projections():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        parts = setup_shop(client)
+        flange, shaft, bush = parts["Flange"], parts["Shaft"], parts["Bush"]
+
+        add_last_operation(client, flange, "2030-03-05", 1, 1, 60)
+        add_last_operation(client, flange, "2030-03-06", 2, 2, 40)
+        add_last_operation(client, flange, "2030-03-20", 1, 1, 10)
+        shaft_row = add_last_operation(client, shaft, "2030-04-02", 1, 1, 50)
+
+        response = client.get(f"/monthly-plans/{flange['plan_id']}/projection")
+        assert response.status_code == 200
+        projection = response.get_json()
+        assert projection["projected_completion"]["date"] == "2030-03-06"
+        assert projection["projected_completion"]["shift_number"] == 2
+        assert projection["scheduled_quantity"] == 110 and projection["fully_scheduled"]
+        assert projection["due"]["date"] == "2030-03-30"  # Sunday the 31st is not a working day
+        assert projection["late"] is False and projection["lateness_days"] == 0
+        print("✅ Completion is the slot where the last operation reaches the planned quantity")
+
+        projection = client.get(f"/monthly-plans/{shaft['plan_id']}/projection").get_json()
+        assert projection["projected_completion"]["date"] == "2030-04-02"
+        assert projection["late"] is True
+        assert projection["lateness_days"] == 3
+        assert projection["lateness_slots"] == 5  # Monday's four slots and Tuesday's first
+        print("✅ Lateness is measured from the month's last working slot")
+
+        projection = client.get(f"/monthly-plans/{bush['plan_id']}/projection").get_json()
+        assert projection["shortfall"] == 80 and projection["fully_scheduled"] is False
+        assert projection["projected_completion"] is not None and projection["late"] is False
+        print("✅ Unscheduled quantity is projected with the sub-batch makespan")
+
+        with app.app_context():
+            plan = db.session.get(MonthlyPlan, flange["plan_id"])
+            projection = plan_projections([plan], app.config["SLOT_MINUTES"], today=date(2030, 3, 10))[0]
+            assert projection["overdue_quantity"] == 100
+            assert projection["scheduled_quantity"] == 10 and projection["shortfall"] == 90
+        print("✅ Planned rows in the past count as overdue, not as done")
+
+        response = client.get("/monthly-plans/projections?month=2030-03-15")
+        assert response.status_code == 200
+        result = response.get_json()
+        assert result["plans"] == 3 and result["late"] == 1
+        assert client.get("/monthly-plans/projections?month=March").status_code == 400
+        print("✅ Bulk projections for a month")
+
+        cache = app.extensions["caches"]["projections"]
+        before = cache.stats()
+        client.get("/monthly-plans/projections?month=2030-03-01")
+        after = cache.stats()
+        assert after["hits"] - before["hits"] == 3 and after["misses"] == before["misses"]
+
+        client.put(f"/production-schedules/{shaft_row}", json={"date": "2030-03-28"})
+        before = cache.stats()
+        result = client.get("/monthly-plans/projections?month=2030-03-01").get_json()
+        after = cache.stats()
+        assert after["misses"] - before["misses"] == 1 and after["hits"] - before["hits"] == 2
+        assert result["late"] == 0
+        print("✅ Only the plan whose part changed is recomputed")
+
+        client.put(f"/monthly-plans/{flange['plan_id']}", json={"planned_quantity": 200})
+        projection = client.get(f"/monthly-plans/{flange['plan_id']}/projection").get_json()
+        assert projection["planned_quantity"] == 200 and projection["shortfall"] == 90
+        assert client.get("/monthly-plans/999/projection").status_code == 404
+        print("✅ Plan changes invalidate the plan's projection")
+
+if __name__ == "__main__":
+    run_tests("projection", test_projections)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for query plans of the hot schedule queries.
+This script seeds the synthetic dataset, runs each hot endpoint, captures the
+SQL it sends and fails if EXPLAIN QUERY PLAN shows a full scan of a large table.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import db
+from app.models.production_schedule import ProductionSchedule
+from app.models.monthly_plan import MonthlyPlan
+from benchmarks.synthetic import create_seeded_app
+from datetime import date, timedelta
+from sqlalchemy import event
+from testing import run_tests
+
+# Tables that grow with history; a full scan of any of them is a regression
+LARGE_TABLES = ['production_schedules', 'slot_occupancy']
+
+def full_scans(plan_rows):
+    scans = []
+    for row in plan_rows:
+        detail = row[-1]
+        for table in LARGE_TABLES:
+            if detail.startswith(f"SCAN {table}") or detail.startswith(f"SCAN main.{table}"):
+                scans.append(detail)
+    return scans
+
+def hot_requests(sample):
+    day = sample["date"]
+    return [
+        ("schedules by date", "GET", f"/production-schedules?date={day}", None),
+        ("schedules by machine and date", "GET", f"/production-schedules?machine_id={sample['machine_id']}&date={day}", None),
+        ("schedules by part", "GET", f"/production-schedules?part_id={sample['part_id']}", None),
+        ("schedules by sub-batch", "GET", f"/production-schedules?sub_batch_id={sample['sub_batch_id']}", None),
+        ("delayed schedules", "GET", "/production-schedules?status=delayed", None),
+        ("by-date view", "GET", f"/production-schedules/by-date/{day}", None),
+        ("by-machine view", "GET", f"/production-schedules/by-machine/{sample['machine_id']}?date={day}", None),
+        ("by-part view", "GET", f"/production-schedules/by-part/{sample['part_id']}", None),
+        ("conflicts by date", "GET", f"/production-schedules/conflicts/by-date/{day}", None),
+        ("conflicts by machine", "GET", f"/production-schedules/conflicts/by-machine/{sample['machine_id']}?date={day}", None),
+        ("slot conflict check", "POST", "/production-schedules/conflicts/check-slot", {
+            "machine_id": sample["machine_id"], "date": day, "shift_number": 1, "slot_number": 2
+        }),
+        ("conflict summary", "GET", f"/production-schedules/conflicts/summary?from={sample['month']}&to={day}", None),
+        ("conflict heatmap", "GET", f"/production-schedules/conflicts/heatmap?from={sample['month']}&to={day}", None),
+        ("precedence violations", "GET", f"/production-schedules/precedence-violations?from={sample['month']}&to={day}", None),
+        ("history", "GET", f"/production-schedules/history?from={sample['month']}&to={day}", None),
+        ("dashboard", "GET", f"/dashboard?date={day}", None),
+        ("reconcile preview", "GET", f"/monthly-plans/{sample['plan_id']}/reconcile", None),
+    ]
+
+def test_query_plans():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_seeded_app(tmpdir, days=365)
+        client = app.test_client()
+
+        with app.app_context():
+            row = ProductionSchedule.query.filter(ProductionSchedule.date == date.today() - timedelta(days=1)).first() \
+                or ProductionSchedule.query.order_by(ProductionSchedule.date.desc()).first()
+            plan = MonthlyPlan.query.first()
+            sample = {
+                "date": row.date.isoformat(),
+                "month": row.date.replace(day=1).isoformat(),
+                "machine_id": row.machine_id,
+                "part_id": row.part_id,
+                "sub_batch_id": row.sub_batch_id,
+                "plan_id": plan.plan_id,
+            }
+            engine = db.engine
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                statements.append((statement, parameters))
+
+        failures = []
+        for name, method, url, body in hot_requests(sample):
+            statements.clear()
+            event.listen(engine, "before_cursor_execute", capture)
+            try:
+                response = client.open(url, method=method, json=body)
+            finally:
+                event.remove(engine, "before_cursor_execute", capture)
+            assert response.status_code == 200, f"{name}: {response.status_code}"
+
+            with app.app_context():
+                connection = db.session.connection()
+                for statement, parameters in statements:
+                    plan_rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+                    for scan in full_scans(plan_rows):
+                        failures.append(f"{name}: {scan}\n    {' '.join(statement.split())[:200]}")
+                db.session.remove()
+            print(f"✅ {name}: {len(statements)} queries checked")
+
+        with app.app_context():
+            db.engine.dispose()
+
+        assert not failures, "Full table scans:\n  " + "\n  ".join(failures)
+        print("✅ No hot query falls back to a full table scan")
+
+if __name__ == "__main__":
+    run_tests("query plan", test_query_plans)
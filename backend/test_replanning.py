@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for re-planning when a monthly plan supersedes an older one.
+This script checks the dry-run diff and that completed work is never touched.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import db
+from app.models.production_schedule import ProductionSchedule
+from app.services.precedence import precedence_violations
+from datetime import date
+from sqlalchemy import text
+from testing import create_test_app, run_tests
+
+def next_month():
+    today = date.today()
+    if today.month == 12:
+        return date(today.year + 1, 1, 1)
+    return date(today.year, today.month + 1, 1)
+
+def test_plan_reconcile():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+
+        company_id = client.post("/companies", json={"name": "Replan Co"}).get_json()["company_id"]
+        machine_id = client.post("/machines", json={"name": "Replan VMC", "type": "VMC"}).get_json()["machine_id"]
+        part_id = client.post("/parts", json={"name": "Replan Bracket", "company_id": company_id, "total_operations": 3}).get_json()["part_id"]
+        op_ids = []
+        for sequence in [10, 20, 30]:
+            op = client.post("/operations", json={
+                "part_id": part_id, "sequence_number": sequence, "machining_time": 5.0, "loading_time": 1.0
+            }).get_json()
+            op_ids.append(op["operation_id"])
+        # OP30 runs on another machine, which is free in the slot of OP20
+        other_machine_id = client.post("/machines", json={"name": "Replan VMC 2", "type": "VMC"}).get_json()["machine_id"]
+        client.post(f"/operations/{op_ids[2]}/machines/{other_machine_id}")
+
+        month = next_month()
+        response = client.post("/monthly-plans", json={
+            "part_id": part_id, "company_id": company_id, "month": month.isoformat(), "planned_quantity": 100
+        })
+        assert response.status_code == 201
+        assert "reconciliation" not in response.get_json()
+
+        def schedule(day, slot, operation_id, quantity, status):
+            response = client.post("/production-schedules", json={
+                "date": month.replace(day=day).isoformat(), "shift_number": 1, "slot_number": slot,
+                "part_id": part_id, "operation_id": operation_id, "machine_id": machine_id,
+                "quantity_scheduled": quantity, "status": status
+            })
+            assert response.status_code == 201
+            return response.get_json()["schedule_id"]
+
+        completed_id = schedule(1, 1, op_ids[0], 30, "completed")
+        schedule(2, 1, op_ids[0], 40, "planned")
+        last_open_id = schedule(3, 1, op_ids[0], 30, "planned")
+        op20_id = schedule(4, 1, op_ids[1], 100, "planned")
+
+        # Supersede with a smaller quantity, preview first
+        response = client.post("/monthly-plans", json={
+            "part_id": part_id, "company_id": company_id, "month": month.isoformat(),
+            "planned_quantity": 80, "reconcile": False
+        })
+        new_plan_id = response.get_json()["plan_id"]
+        assert "reconciliation" not in response.get_json()
+
+        response = client.get(f"/monthly-plans/{new_plan_id}/reconcile")
+        assert response.status_code == 200
+        diff = response.get_json()
+        updates = {u["schedule_id"]: u["new_quantity"] for u in diff["updates"]}
+        assert updates == {last_open_id: 10, op20_id: 80}
+        assert diff["deletes"] == []
+        assert len(diff["inserts"]) == 1
+        assert diff["inserts"][0]["operation_id"] == op_ids[2]
+        assert diff["inserts"][0]["quantity_scheduled"] == 80
+        assert diff["inserts"][0]["machine_id"] == other_machine_id
+        assert (diff["inserts"][0]["date"], diff["inserts"][0]["slot_number"]) == (month.replace(day=4).isoformat(), 2)
+        print("✅ Dry-run diff computes minimal updates and inserts")
+
+        # Preview did not write anything
+        with app.app_context():
+            assert ProductionSchedule.query.count() == 4
+
+        response = client.post(f"/monthly-plans/{new_plan_id}/reconcile")
+        assert response.status_code == 200
+        with app.app_context():
+            assert ProductionSchedule.query.count() == 5
+            assert db.session.get(ProductionSchedule, last_open_id).quantity_scheduled == 10
+            assert db.session.get(ProductionSchedule, completed_id).quantity_scheduled == 30
+            # Taken as one sub-batch, the re-planned rows pass the precedence check
+            db.session.execute(text("UPDATE production_schedules SET sub_batch_id = 'M' WHERE part_id = :part_id"),
+                               {"part_id": part_id})
+            assert precedence_violations() == []
+            db.session.execute(text("UPDATE production_schedules SET sub_batch_id = NULL"))
+            db.session.commit()
+        print("✅ Reconcile applied without touching completed rows")
+
+        # Superseding below the completed quantity deletes open rows only
+        response = client.post("/monthly-plans", json={
+            "part_id": part_id, "company_id": company_id, "month": month.isoformat(), "planned_quantity": 20
+        })
+        assert response.status_code == 201
+        reconciliation = response.get_json()["reconciliation"]
+        assert len(reconciliation["deletes"]) == 2
+        with app.app_context():
+            op10_rows = ProductionSchedule.query.filter_by(operation_id=op_ids[0]).all()
+            assert [row.schedule_id for row in op10_rows] == [completed_id]
+        print("✅ Superseding plan reconciles schedules in the same request")
+
+        with app.app_context():
+            db.engine.dispose()
+
+if __name__ == "__main__":
+    run_tests("re-planning", test_plan_reconcile)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for the daily production and overdue reports.
+This script checks GET /reports/daily and GET /reports/overdue, including
+archived rows and per-day caching.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing import create_test_app, run_tests
+
+def test_reports():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        company_id = client.post("/companies", json={"name": "Report Co"}).get_json()["company_id"]
+        m1, m2, m3 = [client.post("/machines", json={"name": f"Mill {n}", "type": "VMC"}).get_json()["machine_id"]
+                      for n in (1, 2, 3)]
+        parts, operations = [], []
+        for name in ("Bracket", "Housing"):
+            part_id = client.post("/parts", json={"name": name, "company_id": company_id}).get_json()["part_id"]
+            parts.append(part_id)
+            operations.append(client.post("/operations", json={
+                "part_id": part_id, "sequence_number": 10, "machining_time": 1.0, "loading_time": 0
+            }).get_json()["operation_id"])
+        p1, p2 = parts
+
+        def book(part_id, machine_id, day, shift_number, slot_number, quantity, status):
+            response = client.post("/production-schedules", json={
+                "part_id": part_id, "operation_id": operations[parts.index(part_id)], "machine_id": machine_id,
+                "date": day, "shift_number": shift_number, "slot_number": slot_number,
+                "quantity_scheduled": quantity, "status": status
+            })
+            assert response.status_code == 201
+            return response.get_json()["schedule_id"]
+
+        book(p1, m1, "2020-03-02", 1, 1, 10, "completed")
+        book(p1, m1, "2020-03-02", 1, 2, 5, "completed")
+        planned = book(p2, m2, "2020-03-02", 1, 1, 8, "planned")
+        book(p1, m2, "2020-03-02", 1, 1, 2, "delayed")
+        in_progress = book(p2, m1, "2020-03-03", 2, 1, 6, "in_progress")
+        book(p2, m3, "2030-01-07", 1, 1, 4, "planned")
+
+        with app.app_context():
+            from app.services.archive import archive_completed_schedules
+            assert archive_completed_schedules(horizon_days=90, batch_size=10) == 2
+
+        report = client.get("/reports/daily?date=2020-03-02").get_json()
+        assert report["date"] == "2020-03-02"
+        assert report["totals"]["rows"] == 4 and report["totals"]["quantity"] == 25
+        assert report["totals"]["statuses"]["completed"] == {"rows": 2, "quantity": 15}
+        assert report["totals"]["statuses"]["in_progress"] == {"rows": 0, "quantity": 0}
+        print("✅ Daily report includes archived rows")
+
+        available = report["available_slots_per_machine"]
+        machines = {machine["machine_id"]: machine for machine in report["machines"]}
+        assert list(machines) == [m1, m2, m3]
+        assert machines[m1]["occupied_slots"] == 2 and machines[m1]["quantity"] == 15
+        assert machines[m1]["utilization"] == round(2 / available, 3)
+        # Two rows in one slot occupy it once
+        assert machines[m2]["rows"] == 2 and machines[m2]["occupied_slots"] == 1
+        assert machines[m2]["statuses"]["delayed"] == {"rows": 1, "quantity": 2}
+        assert machines[m3]["rows"] == 0 and machines[m3]["utilization"] == 0.0
+        report_parts = {part["part_id"]: part for part in report["parts"]}
+        assert report_parts[p1]["quantity"] == 17 and report_parts[p2]["quantity"] == 8
+        assert report_parts[p1]["statuses"]["completed"]["quantity"] == 15
+        print("✅ Daily report per machine and part")
+
+        overdue = client.get("/reports/overdue?as_of=2020-03-04").get_json()
+        assert overdue["totals"]["rows"] == 3 and overdue["totals"]["quantity"] == 16
+        assert set(overdue["totals"]["statuses"]) == {"planned", "in_progress", "delayed"}
+        assert overdue["max_days_overdue"] == 2
+        assert overdue["age_buckets"] == {"1-7": 3, "8-30": 0, "31-90": 0, ">90": 0}
+        overdue_machines = {machine["machine_id"]: machine for machine in overdue["machines"]}
+        assert set(overdue_machines) == {m1, m2}
+        assert overdue_machines[m1]["quantity"] == 6 and overdue_machines[m2]["quantity"] == 10
+        assert overdue_machines[m2]["name"] == "Mill 2"
+        overdue_parts = {part["part_id"]: part for part in overdue["parts"]}
+        assert overdue_parts[p2]["oldest_date"] == "2020-03-02" and overdue_parts[p2]["days_overdue"] == 2
+        assert overdue_parts[p2]["statuses"]["in_progress"] == {"rows": 1, "quantity": 6}
+        assert overdue_parts[p1]["quantity"] == 2
+        print("✅ Overdue report per status, machine and part")
+
+        later = client.get("/reports/overdue?as_of=2020-07-01").get_json()
+        assert later["age_buckets"][">90"] == 3
+        assert client.get("/reports/overdue?as_of=2020-03-02").get_json()["totals"]["rows"] == 0
+        empty = client.get("/reports/overdue?as_of=2020-01-01").get_json()
+        assert empty["machines"] == [] and empty["parts"] == [] and empty["max_days_overdue"] == 0
+        print("✅ Overdue ages by as_of date")
+
+        with app.app_context():
+            from app.cache import get_cache
+            stats = get_cache("reports").stats
+            hits = stats()["hits"]
+            client.get("/reports/daily?date=2020-03-02")
+            assert stats()["hits"] == hits + 1
+
+            # A write to another day leaves the cached report in place
+            assert client.put(f"/production-schedules/{in_progress}", json={"status": "completed"}).status_code == 200
+            client.get("/reports/daily?date=2020-03-02")
+            assert stats()["hits"] == hits + 2
+
+            # A write to the day itself recomputes it
+            assert client.put(f"/production-schedules/{planned}", json={"status": "completed"}).status_code == 200
+            report = client.get("/reports/daily?date=2020-03-02").get_json()
+            assert stats()["hits"] == hits + 2
+            assert report["totals"]["statuses"]["completed"] == {"rows": 3, "quantity": 23}
+            overdue = client.get("/reports/overdue?as_of=2020-03-04").get_json()
+            assert overdue["totals"]["rows"] == 1
+        print("✅ Daily reports are cached until their own day changes")
+
+        # Both reports read the archive: an open row there is still overdue
+        with app.app_context():
+            from app import db
+            from sqlalchemy import text
+            db.session.execute(text(
+                "INSERT INTO archive.production_schedules (schedule_id, date, shift_number, slot_number, part_id, "
+                "operation_id, machine_id, quantity_scheduled, status) VALUES (900, '2020-03-02', 2, 1, :part_id, "
+                ":operation_id, :machine_id, 3, 'delayed')"
+            ), {"part_id": p1, "operation_id": operations[0], "machine_id": m3})
+            db.session.commit()
+        overdue = client.get("/reports/overdue?as_of=2020-03-05").get_json()
+        assert overdue["totals"]["rows"] == 2
+        assert {machine["machine_id"] for machine in overdue["machines"]} == {m2, m3}
+        print("✅ Overdue report includes archived open rows")
+
+        assert client.get("/reports/daily?date=March").status_code == 400
+        assert client.get("/reports/overdue?as_of=2020-13-01").status_code == 400
+        assert client.get("/reports/daily").status_code == 200
+        print("✅ Date validation")
+
+if __name__ == "__main__":
+    run_tests("report", test_reports)
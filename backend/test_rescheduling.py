@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Test script for mass rescheduling.
+This script checks POST /production-schedules/shift (working-day-aware slot
+offsets, moves to another machine, the conflict report) and the machine
+downtime reallocation of POST /machines/<id>/downtime.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.occupancy import check_slot_occupancy
+from testing import create_test_app, run_tests
+
+def setup_shop(client):
+    company_id = client.post("/companies", json={"name": "Shift Co"}).get_json()["company_id"]
+    machines = [
+        client.post("/machines", json={"name": name, "type": "CNC Lathe"}).get_json()["machine_id"]
+        for name in ["Lathe 1", "Lathe 2", "Lathe 3"]
+    ]
+    part_id = client.post("/parts", json={"name": "Shift Pin", "company_id": company_id}).get_json()["part_id"]
+    operation_id = client.post("/operations", json={
+        "part_id": part_id, "sequence_number": 10, "machining_time": 5.0, "loading_time": 1.0
+    }).get_json()["operation_id"]
+    for machine_id in machines[:2]:
+        client.post(f"/operations/{operation_id}/machines/{machine_id}")
+    return machines, {"part_id": part_id, "operation_id": operation_id, "quantity_scheduled": 10}
+
+def add_schedule(client, fields, machine_id, day, shift_number, slot_number, **extra):
+    response = client.post("/production-schedules", json={
+        **fields, "machine_id": machine_id, "date": day,
+        "shift_number": shift_number, "slot_number": slot_number, **extra
+    })
+    assert response.status_code == 201
+    return response.get_json()["schedule_id"]
+
+def slot_of(client, schedule_id):
+    schedule = client.get(f"/production-schedules/{schedule_id}").get_json()
+    return schedule["machine_id"], schedule["date"], schedule["shift_number"], schedule["slot_number"]
+
+def test_shift_by_slots():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        machines, fields = setup_shop(client)
+        lathe = machines[0]
+
+        # Saturday 2030-02-09 afternoon and Monday morning; Sunday is not a working day
+        saturday_first = add_schedule(client, fields, lathe, "2030-02-09", 2, 1, sub_batch_id="B1")
+        saturday_second = add_schedule(client, fields, lathe, "2030-02-09", 2, 2, sub_batch_id="B1")
+        monday = add_schedule(client, fields, lathe, "2030-02-11", 1, 1, sub_batch_id="B2")
+        blocker = add_schedule(client, fields, lathe, "2030-02-11", 1, 2, status="completed")
+
+        response = client.post("/production-schedules/shift", json={
+            "machine_id": lathe, "from": "2030-02-09", "to": "2030-02-11",
+            "status": "planned", "offset_slots": 2
+        })
+        assert response.status_code == 200
+        result = response.get_json()
+        assert result["moved"] == 3
+
+        assert slot_of(client, saturday_first) == (lathe, "2030-02-11", 1, 1)
+        assert slot_of(client, saturday_second) == (lathe, "2030-02-11", 1, 2)
+        assert slot_of(client, monday) == (lathe, "2030-02-11", 2, 1)
+        assert slot_of(client, blocker) == (lathe, "2030-02-11", 1, 2)
+        print("✅ Rows move by working slots and skip Sunday")
+
+        assert result["conflicted_slots"] == 1
+        assert result["conflicts"] == [{
+            "machine_id": lathe, "date": "2030-02-11", "shift_number": 1, "slot_number": 2, "bookings": 2
+        }]
+        print("✅ The response reports the double-booked slots the moved rows landed in")
+
+        response = client.post("/production-schedules/shift", json={"sub_batch_id": "B1", "offset_slots": -2})
+        assert response.status_code == 200
+        assert slot_of(client, saturday_first) == (lathe, "2030-02-09", 2, 1)
+        assert response.get_json()["conflicted_slots"] == 0
+        print("✅ Negative offsets move rows back")
+
+        with app.app_context():
+            assert check_slot_occupancy() == []
+        print("✅ Slot occupancy stays consistent")
+
+def test_shift_to_machine():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        machines, fields = setup_shop(client)
+
+        first = add_schedule(client, fields, machines[0], "2030-02-12", 1, 1, sub_batch_id="B1")
+        second = add_schedule(client, fields, machines[0], "2030-02-12", 1, 2, sub_batch_id="B1")
+
+        response = client.post("/production-schedules/shift", json={
+            "sub_batch_id": "B1", "target_machine_id": machines[2]
+        })
+        assert response.status_code == 400
+        assert "not eligible" in response.get_json()["error"]
+        assert slot_of(client, first)[0] == machines[0]
+        print("✅ Moving to an ineligible machine is rejected")
+
+        response = client.post("/production-schedules/shift", json={
+            "sub_batch_id": "B1", "target_machine_id": machines[1], "offset_slots": 1
+        })
+        assert response.status_code == 200
+        assert response.get_json()["moved"] == 2
+        assert slot_of(client, first) == (machines[1], "2030-02-12", 1, 2)
+        assert slot_of(client, second) == (machines[1], "2030-02-12", 2, 1)
+        print("✅ Rows move to the target machine and by the offset together")
+
+def test_shift_validation():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        machines, fields = setup_shop(client)
+
+        response = client.post("/production-schedules/shift", json={"offset_slots": 1})
+        assert response.status_code == 400
+        assert "filter is required" in response.get_json()["error"]
+
+        response = client.post("/production-schedules/shift", json={"machine_id": machines[0]})
+        assert response.status_code == 400
+
+        response = client.post("/production-schedules/shift", json={"machine_id": machines[0], "offset_slots": "2"})
+        assert response.status_code == 400
+
+        response = client.post("/production-schedules/shift", json={"from": "02/12/2030", "offset_slots": 1})
+        assert response.status_code == 400
+        print("✅ Invalid shift requests are rejected")
+
+def test_downtime_reallocation():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        machines, fields = setup_shop(client)
+        lathe, spare = machines[0], machines[1]
+
+        # Operations 10 and 20 run on both lathes, operation 30 and the solo part only on the first
+        later_ops = {}
+        for sequence_number, eligible in [(20, machines[:2]), (30, machines[:1])]:
+            later_ops[sequence_number] = client.post("/operations", json={
+                "part_id": fields["part_id"], "sequence_number": sequence_number,
+                "machining_time": 5.0, "loading_time": 1.0
+            }).get_json()["operation_id"]
+            for machine_id in eligible:
+                client.post(f"/operations/{later_ops[sequence_number]}/machines/{machine_id}")
+        solo_part = client.post("/parts", json={"name": "Solo Pin", "company_id": 1}).get_json()["part_id"]
+        solo_op = client.post("/operations", json={
+            "part_id": solo_part, "sequence_number": 10, "machining_time": 5.0, "loading_time": 1.0
+        }).get_json()["operation_id"]
+        client.post(f"/operations/{solo_op}/machines/{lathe}")
+
+        # Sub-batch B1 on the first lathe: 10 and 20 on Tuesday morning, 30 on Wednesday
+        op10 = add_schedule(client, fields, lathe, "2030-02-12", 1, 1, sub_batch_id="B1")
+        op20 = add_schedule(client, {**fields, "operation_id": later_ops[20]}, lathe, "2030-02-12", 1, 2, sub_batch_id="B1")
+        op30 = add_schedule(client, {**fields, "operation_id": later_ops[30]}, lathe, "2030-02-13", 1, 1, sub_batch_id="B1")
+        solo = add_schedule(client, {**fields, "part_id": solo_part, "operation_id": solo_op}, lathe, "2030-02-12", 2, 2)
+        running = add_schedule(client, fields, lathe, "2030-02-12", 2, 1, status="in_progress")
+        # The spare lathe is busy on Tuesday morning
+        for slot_number in [1, 2]:
+            add_schedule(client, fields, spare, "2030-02-12", 1, slot_number, sub_batch_id="X")
+
+        response = client.post(f"/machines/{lathe}/downtime", json={
+            "start_date": "2030-02-12", "end_date": "2030-02-12", "reason": "Spindle failure"
+        })
+        assert response.status_code == 201
+        report = response.get_json()
+        assert report["downtime"]["end"] == {"date": "2030-02-12", "shift_number": 2, "slot_number": 2}
+        assert report["affected"] == 3
+        print("✅ Planned work on the machine in the window is collected")
+
+        # Operation 10 takes the nearest free slot (Monday evening, before Tuesday's second slot on ties)
+        assert slot_of(client, op10) == (spare, "2030-02-11", 2, 2)
+        # Operation 20 cannot move before operation 10 or after operation 30; Tuesday S2:1 is the nearest free slot
+        assert slot_of(client, op20) == (spare, "2030-02-12", 2, 1)
+        assert slot_of(client, op30) == (lathe, "2030-02-13", 1, 1)
+        assert slot_of(client, running) == (lathe, "2030-02-12", 2, 1)
+        assert [entry["schedule_id"] for entry in report["reassigned"]] == [op10, op20]
+        assert report["reassigned"][0]["to"] == {"machine_id": spare, "date": "2030-02-11", "shift_number": 2, "slot_number": 2}
+        print("✅ Work moves to an eligible alternate at the nearest free slot within precedence bounds")
+
+        assert report["unplaced"] == [{
+            "schedule_id": solo, "operation_id": solo_op, "sub_batch_id": None,
+            "reason": "No eligible alternate machine"
+        }]
+        assert slot_of(client, solo) == (lathe, "2030-02-12", 2, 2)
+        print("✅ Work with no eligible alternate stays and is reported")
+
+        downtimes = client.get(f"/machines/{lathe}/downtime").get_json()
+        assert len(downtimes) == 1 and downtimes[0]["reason"] == "Spindle failure"
+        with app.app_context():
+            assert check_slot_occupancy() == []
+        print("✅ The downtime is recorded")
+
+        # Windows that end before they start or use a shift outside the calendar
+        response = client.post(f"/machines/{lathe}/downtime", json={
+            "start_date": "2030-02-12", "end_date": "2030-02-11"
+        })
+        assert response.status_code == 400
+        response = client.post(f"/machines/{lathe}/downtime", json={
+            "start_date": "2030-02-12", "end_date": "2030-02-12", "start_shift": 3
+        })
+        assert response.status_code == 400
+        print("✅ Invalid downtime windows are rejected")
+
+def test_locked_ranges():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        machines, fields = setup_shop(client)
+        lathe, spare = machines[0], machines[1]
+
+        monday = add_schedule(client, fields, lathe, "2030-02-11", 1, 1)
+        tuesday = add_schedule(client, fields, lathe, "2030-02-12", 2, 2)
+        thursday = add_schedule(client, fields, lathe, "2030-02-14", 1, 1)
+        for shift_number, slot_number in [(1, 1), (1, 2), (2, 1), (2, 2)]:
+            add_schedule(client, fields, spare, "2030-02-12", shift_number, slot_number)
+        response = client.post("/schedule/finalize?from=2030-02-13&to=2030-02-14")
+        assert response.status_code == 201
+
+        # Thursday is locked, and Tuesday's last slot would move onto locked Wednesday
+        response = client.post("/production-schedules/shift", json={"machine_id": lathe, "offset_slots": 1})
+        assert response.status_code == 200
+        result = response.get_json()
+        assert result["moved"] == 1
+        assert result["unplaced"] == [
+            {"schedule_id": thursday, "reason": "Schedule is in a finalized range"},
+            {"schedule_id": tuesday, "reason": "Target day is in a finalized range"}
+        ]
+        assert slot_of(client, monday) == (lathe, "2030-02-11", 1, 2)
+        assert slot_of(client, tuesday) == (lathe, "2030-02-12", 2, 2)
+        assert slot_of(client, thursday) == (lathe, "2030-02-14", 1, 1)
+        print("✅ Shifts leave locked rows and locked target days alone and report them")
+
+        # The spare lathe is full on Tuesday and Wednesday/Thursday are locked: Monday is the nearest free slot
+        response = client.post(f"/machines/{lathe}/downtime", json={
+            "start_date": "2030-02-12", "end_date": "2030-02-14"
+        })
+        assert response.status_code == 201
+        report = response.get_json()
+        assert report["affected"] == 2
+        assert slot_of(client, tuesday) == (spare, "2030-02-11", 2, 2)
+        assert report["unplaced"] == [{
+            "schedule_id": thursday, "operation_id": fields["operation_id"], "sub_batch_id": None,
+            "reason": "Schedule is in a finalized range"
+        }]
+        assert len(client.get(f"/machines/{lathe}/downtime").get_json()) == 1
+        with app.app_context():
+            assert check_slot_occupancy() == []
+        print("✅ Downtime reallocation skips locked rows and locked days and is recorded")
+
+        # Writes into a locked range from any blueprint answer 409
+        response = client.put(f"/production-schedules/{thursday}", json={"quantity_scheduled": 5})
+        assert response.status_code == 409
+
+if __name__ == "__main__":
+    run_tests("rescheduling", test_shift_by_slots, test_shift_to_machine, test_shift_validation,
+              test_downtime_reallocation, test_locked_ranges)
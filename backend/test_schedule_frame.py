@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for the array-backed ScheduleFrame.
+This script checks loading schedules into a frame, filtering, sorting and
+grouping it, and that the results match the database.
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing import create_test_app, run_tests
+
+def test_schedule_frame():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        company_id = client.post("/companies", json={"name": "Frame Co"}).get_json()["company_id"]
+        machines = [client.post("/machines", json={"name": f"Mill {n}", "type": "VMC"}).get_json()["machine_id"]
+                    for n in (1, 2)]
+        parts, operations = [], []
+        for name in ("Bracket", "Housing"):
+            part_id = client.post("/parts", json={"name": name, "company_id": company_id}).get_json()["part_id"]
+            parts.append(part_id)
+            operations.append(client.post("/operations", json={
+                "part_id": part_id, "sequence_number": 10, "machining_time": 1.0, "loading_time": 0
+            }).get_json()["operation_id"])
+
+        bookings = [
+            # part index, machine index, date, shift, slot, quantity, sub-batch, status
+            (0, 0, "2030-05-06", 1, 1, 10, "A", "planned"),
+            (0, 0, "2030-05-06", 1, 2, 12, "A", "completed"),
+            (1, 1, "2030-05-06", 1, 1, 5, None, "planned"),
+            (1, 0, "2030-05-07", 2, 1, 7, "B", "delayed"),
+            (0, 1, "2030-05-08", 1, 2, 9, None, "in_progress"),
+            (1, 0, "2030-05-08", 1, 2, 4, "B", "planned"),
+        ]
+        for part, machine, day, shift_number, slot_number, quantity, sub_batch_id, status in bookings:
+            response = client.post("/production-schedules", json={
+                "part_id": parts[part], "operation_id": operations[part], "machine_id": machines[machine],
+                "date": day, "shift_number": shift_number, "slot_number": slot_number,
+                "quantity_scheduled": quantity, "sub_batch_id": sub_batch_id, "status": status
+            })
+            assert response.status_code == 201, response.get_json()
+
+        with app.app_context():
+            from app.services.schedule_frame import ScheduleFrame, table_records
+            from app.shop_calendar import get_calendar
+
+            frame = ScheduleFrame.load()
+            assert len(frame) == len(bookings)
+            assert frame.nbytes == 37 * len(bookings)
+            assert list(frame.machine_ids) == machines and list(frame.part_ids) == parts
+            assert list(frame.sub_batch_ids) == ["A", "B"]
+            records = {record["schedule_id"]: record for record in frame.records()}
+            listed = client.get("/production-schedules").get_json()
+            for schedule in listed:
+                record = records[schedule["schedule_id"]]
+                for field in ("machine_id", "part_id", "operation_id", "sub_batch_id", "quantity_scheduled", "status"):
+                    assert record[field] == schedule[field]
+                assert record["date"].isoformat() == schedule["date"]
+                calendar = get_calendar()
+                assert record["slot_key"] == calendar.slot_key(record["date"], schedule["shift_number"],
+                                                               schedule["slot_number"])
+            print("✅ Frame loads every schedule in typed arrays")
+
+            assert len(ScheduleFrame.load(date_from=date(2030, 5, 7))) == 3
+            assert len(ScheduleFrame.load(machine_ids=[machines[1]], statuses=["planned"])) == 1
+            assert len(ScheduleFrame.load(part_ids=[parts[0]], date_to=date(2030, 5, 6))) == 2
+            print("✅ Load filters run in the query")
+
+            assert len(frame.filter(machine_id=machines[0])) == 4
+            assert len(frame.filter(part_id=[parts[1]], status=["planned", "delayed"])) == 3
+            assert len(frame.filter(day_from=date(2030, 5, 7), day_to=date(2030, 5, 7))) == 1
+            assert len(frame.filter(machine_id=999)) == 0
+            assert len(frame.filter(status="completed", operation_id=operations[0])) == 1
+            # Filtered frames keep the dictionaries, so codes stay comparable
+            subset = frame.filter(machine_id=machines[1])
+            assert subset.machine_ids is frame.machine_ids
+            assert set(subset.machine_ids[subset.machine]) == {machines[1]}
+            print("✅ Filtering by ids, status and days")
+
+            ordered = frame.sort("machine", "slot_key")
+            keys = list(zip(ordered.machine_ids[ordered.machine].tolist(), ordered.slot_key.tolist()))
+            assert keys == sorted(keys)
+            by_quantity = frame.sort("quantity")
+            assert by_quantity.quantity.tolist() == sorted(q for *_, q, _, _ in bookings)
+            print("✅ Sorting by several columns")
+
+            table = table_records(frame.group_by("machine", "status"))
+            assert {(row["machine_id"], row["status"]): (row["count"], row["quantity"]) for row in table} == {
+                (machines[0], "planned"): (2, 14),
+                (machines[0], "completed"): (1, 12),
+                (machines[0], "delayed"): (1, 7),
+                (machines[1], "planned"): (1, 5),
+                (machines[1], "in_progress"): (1, 9),
+            }
+            by_day = table_records(frame.group_by("day"))
+            assert [(date.fromordinal(row["day"]), row["count"]) for row in by_day] == [
+                (date(2030, 5, 6), 3), (date(2030, 5, 7), 1), (date(2030, 5, 8), 2)
+            ]
+            by_batch = table_records(frame.group_by("sub_batch"))
+            assert [(row["sub_batch_id"], row["quantity"]) for row in by_batch] == [(None, 14), ("A", 22), ("B", 11)]
+            assert all(type(row["sub_batch_id"]) in (str, type(None)) for row in by_batch)
+            assert table_records(frame.group_by()) == [{"count": 6, "quantity": 47}]
+            print("✅ Group-by counts and quantities")
+
+            assert frame.conflicts() == []
+            double = client.post("/production-schedules", json={
+                "part_id": parts[1], "operation_id": operations[1], "machine_id": machines[0],
+                "date": "2030-05-06", "shift_number": 1, "slot_number": 1, "quantity_scheduled": 3
+            })
+            assert double.status_code == 201
+            slot_key = get_calendar().slot_key(date(2030, 5, 6), 1, 1)
+            assert ScheduleFrame.load().conflicts() == [(machines[0], slot_key, 2)]
+            print("✅ Double-booked slots found from the arrays")
+
+            empty = ScheduleFrame.load(date_from=date(2031, 1, 1))
+            assert len(empty) == 0 and empty.nbytes == 0
+            assert empty.records() == [] and empty.conflicts() == []
+            assert table_records(empty.group_by("machine", "day")) == []
+            assert len(empty.filter(machine_id=machines[0]).sort("slot_key")) == 0
+            print("✅ Empty frames")
+
+if __name__ == "__main__":
+    run_tests("schedule frame", test_schedule_frame)
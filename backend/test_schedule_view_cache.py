@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the by-date and by-machine schedule view cache.
+This script checks that cached views are reused, that writes invalidate
+exactly the dates and machines they touch (old and new on moves), and the
+GET /cache/stats counters.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing import create_test_app, run_tests
+
+def test_schedule_view_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir, SCHEDULE_VIEW_CACHE_ENTRIES=4)
+        client = app.test_client()
+        company_id = client.post("/companies", json={"name": "View Co"}).get_json()["company_id"]
+        m1, m2 = [client.post("/machines", json={"name": f"Mill {n}", "type": "VMC"}).get_json()["machine_id"]
+                  for n in (1, 2)]
+        part_id = client.post("/parts", json={"name": "Bracket", "company_id": company_id}).get_json()["part_id"]
+        operation_id = client.post("/operations", json={
+            "part_id": part_id, "sequence_number": 10, "machining_time": 1.0, "loading_time": 0
+        }).get_json()["operation_id"]
+
+        def book(machine_id, day, slot_number=1):
+            response = client.post("/production-schedules", json={
+                "part_id": part_id, "operation_id": operation_id, "machine_id": machine_id, "date": day,
+                "shift_number": 1, "slot_number": slot_number, "quantity_scheduled": 10
+            })
+            assert response.status_code == 201
+            return response.get_json()["schedule_id"]
+
+        def stats():
+            return client.get("/cache/stats").get_json()["schedule_views"]
+
+        def ids(url):
+            response = client.get(url)
+            assert response.status_code == 200
+            return sorted(row["schedule_id"] for row in response.get_json())
+
+        moved = book(m1, "2030-06-03")
+        book(m1, "2030-06-03", 2)
+        other = book(m2, "2030-06-04")
+
+        by_date = ids("/production-schedules/by-date/2030-06-03")
+        assert len(by_date) == 2 and stats()["misses"] == 1
+        assert ids("/production-schedules/by-date/2030-06-03") == by_date
+        assert stats()["hits"] == 1
+        response = client.get("/production-schedules/by-date/2030-06-03")
+        assert response.mimetype == "application/json" and response.get_json()[0]["date"] == "2030-06-03"
+        assert ids(f"/production-schedules/by-machine/{m1}") == by_date
+        assert ids(f"/production-schedules/by-machine/{m1}?date=2030-06-03") == by_date
+        assert ids(f"/production-schedules/by-machine/{m2}") == [other]
+        print("✅ Views are served from the cache until their data changes")
+
+        # A new row on 06-04 / machine 2 leaves the 06-03 and machine 1 views cached
+        new = book(m2, "2030-06-04", 2)
+        before = stats()
+        assert ids("/production-schedules/by-date/2030-06-03") == by_date
+        assert ids(f"/production-schedules/by-machine/{m1}") == by_date
+        assert stats()["hits"] == before["hits"] + 2
+        assert ids("/production-schedules/by-date/2030-06-04") == sorted([other, new])
+        assert ids(f"/production-schedules/by-machine/{m2}") == sorted([other, new])
+        print("✅ A write only invalidates its own date and machine")
+
+        # Moving a row invalidates the old and the new date and machine
+        response = client.put(f"/production-schedules/{moved}", json={
+            "date": "2030-06-04", "machine_id": m2, "slot_number": 2, "shift_number": 2
+        })
+        assert response.status_code == 200
+        assert moved not in ids("/production-schedules/by-date/2030-06-03")
+        assert moved in ids("/production-schedules/by-date/2030-06-04")
+        assert moved not in ids(f"/production-schedules/by-machine/{m1}")
+        assert moved in ids(f"/production-schedules/by-machine/{m2}")
+        print("✅ Moves invalidate the old and the new keys")
+
+        client.put(f"/production-schedules/{new}/status", json={"status": "completed"})
+        rows = client.get("/production-schedules/by-date/2030-06-04").get_json()
+        assert {row["schedule_id"]: row["status"] for row in rows}[new] == "completed"
+        assert client.delete(f"/production-schedules/{other}").status_code == 200
+        assert other not in ids(f"/production-schedules/by-machine/{m2}?date=2030-06-04")
+        print("✅ Status updates and deletes invalidate their views")
+
+        assert client.get("/production-schedules/by-machine/999").status_code == 404
+        assert client.get("/production-schedules/by-machine/999").status_code == 404
+        assert client.get("/production-schedules/by-date/June").status_code == 400
+        assert client.get(f"/production-schedules/by-machine/{m1}?date=June").status_code == 400
+        print("✅ Missing machines and bad dates are not cached")
+
+        for day in ("2030-06-10", "2030-06-11", "2030-06-12", "2030-06-13", "2030-06-14"):
+            client.get(f"/production-schedules/by-date/{day}")
+        current = stats()
+        assert current["entries"] == current["max_entries"] == 4
+        assert set(client.get("/cache/stats").get_json()) >= {"schedule_views"}
+        print("✅ The cache is bounded and reports its counters")
+
+if __name__ == "__main__":
+    run_tests("schedule view cache", test_schedule_view_cache)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the configurable shop calendar and the integer slot key.
+This script checks slot key arithmetic, calendar-driven validation, the
+slot_key input on the schedule endpoints and the migration backfill.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import db
+from app.models.production_schedule import ProductionSchedule
+from app.shop_calendar import ShopCalendar
+from datetime import date
+from sqlalchemy import text
+from testing import create_test_app, run_tests
+
+def test_slot_keys():
+    calendar = ShopCalendar(2, 2, 240, [0, 1, 2, 3, 4, 5], holidays=["2030-01-01"])
+    friday = date(2029, 12, 28)
+    key = calendar.slot_key(friday, 2, 2)
+    assert calendar.from_slot_key(key) == (friday, 2, 2)
+    assert calendar.slot_key(friday, 1, 1) < calendar.slot_key(friday, 1, 2) < calendar.slot_key(friday, 2, 1)
+    first, last = calendar.day_keys(friday, friday)
+    assert last - first == 4 and first <= key < last
+    print("✅ Slot keys round-trip and sort in slot order")
+
+    # Friday S2:2 -> Saturday; Sunday is not a working day and 2030-01-01 is a holiday
+    saturday_keys = calendar.next_slot_keys(key, 4)
+    assert [calendar.from_slot_key(k)[0] for k in saturday_keys] == [date(2029, 12, 29)] * 4
+    after_weekend = calendar.add_working_slots(key, 5)
+    assert calendar.from_slot_key(after_weekend) == (date(2029, 12, 31), 1, 1)
+    after_holiday = calendar.add_working_slots(key, 9)
+    assert calendar.from_slot_key(after_holiday) == (date(2030, 1, 2), 1, 1)
+    assert calendar.add_working_slots(after_holiday, -9) == key
+    assert calendar.working_slot_count(date(2029, 12, 30), date(2030, 1, 5)) == 5 * 4
+    print("✅ Slot arithmetic skips non-working days and holidays")
+
+def setup_shop(client):
+    company_id = client.post("/companies", json={"name": "Calendar Co"}).get_json()["company_id"]
+    machine_id = client.post("/machines", json={"name": "Lathe 1", "type": "CNC Lathe"}).get_json()["machine_id"]
+    part_id = client.post("/parts", json={"name": "Calendar Pin", "company_id": company_id}).get_json()["part_id"]
+    operation_id = client.post("/operations", json={
+        "part_id": part_id, "sequence_number": 10, "machining_time": 5.0, "loading_time": 1.0
+    }).get_json()["operation_id"]
+    return {"part_id": part_id, "operation_id": operation_id, "machine_id": machine_id, "quantity_scheduled": 10}
+
+def test_schedule_slot_keys():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        fields = setup_shop(client)
+        calendar = ShopCalendar.from_config(app.config)
+
+        response = client.post("/production-schedules", json={
+            **fields, "date": "2030-02-04", "shift_number": 2, "slot_number": 1
+        })
+        assert response.status_code == 201
+        schedule = response.get_json()
+        assert schedule["slot_key"] == calendar.slot_key(date(2030, 2, 4), 2, 1)
+
+        key = calendar.slot_key(date(2030, 2, 5), 1, 2)
+        response = client.post("/production-schedules", json={**fields, "slot_key": key})
+        assert response.status_code == 201
+        schedule = response.get_json()
+        assert (schedule["date"], schedule["shift_number"], schedule["slot_number"]) == ("2030-02-05", 1, 2)
+
+        response = client.put(f"/production-schedules/{schedule['schedule_id']}", json={"slot_key": key + 1})
+        assert response.status_code == 200
+        assert response.get_json()["shift_number"] == 2
+
+        with app.app_context():
+            first, last = calendar.day_keys(date(2030, 2, 4), date(2030, 2, 5))
+            rows = ProductionSchedule.get_machine_slot_range(fields["machine_id"], first, last)
+            assert [row.slot_key for row in rows] == sorted(row.slot_key for row in rows)
+            assert len(rows) == 2
+        print("✅ Schedules accept the slot triple or a slot_key and store the key")
+
+        response = client.post("/production-schedules", json={**fields, "slot_key": "soon"})
+        assert response.status_code == 400
+        response = client.post("/production-schedules", json={
+            **fields, "date": "2030-02-04", "shift_number": 3, "slot_number": 1
+        })
+        assert response.get_json()["error"] == "Shift number must be 1 or 2"
+        print("✅ Invalid slots handled correctly")
+
+        # Existing databases get the column backfilled in SQL
+        with app.app_context():
+            db.session.execute(text("DROP INDEX idx_schedule_machine_slot_key"))
+            db.session.execute(text("ALTER TABLE production_schedules DROP COLUMN slot_key"))
+            db.session.execute(text("UPDATE schema_version SET version = 4"))
+            db.session.commit()
+            db.engine.dispose()
+
+        app = create_test_app(tmpdir)
+        with app.app_context():
+            rows = ProductionSchedule.query.all()
+            assert all(row.slot_key == calendar.slot_key(row.date, row.shift_number, row.slot_number) for row in rows)
+            db.engine.dispose()
+        print("✅ Migration backfills slot keys")
+
+        # Three shifts: shift 3 becomes valid and keys are recomputed on request
+        app = create_test_app(tmpdir, SHIFTS_PER_DAY=3)
+        client = app.test_client()
+        response = client.post("/production-schedules", json={
+            **fields, "date": "2030-02-06", "shift_number": 3, "slot_number": 2
+        })
+        assert response.status_code == 201
+        response = client.post("/production-schedules/conflicts/check-slot", json={
+            "machine_id": fields["machine_id"], "date": "2030-02-06", "shift_number": 4, "slot_number": 1
+        })
+        assert response.get_json()["error"] == "Shift number must be between 1 and 3"
+        result = app.test_cli_runner().invoke(args=["rebuild-slot-keys"])
+        assert result.exit_code == 0, result.output
+        calendar = ShopCalendar.from_config(app.config)
+        with app.app_context():
+            rows = ProductionSchedule.query.all()
+            assert all(row.slot_key == calendar.slot_key(row.date, row.shift_number, row.slot_number) for row in rows)
+            db.engine.dispose()
+        print("✅ Calendar settings drive validation and slot key rebuilds")
+
+if __name__ == "__main__":
+    run_tests("shop calendar", test_slot_keys, test_schedule_slot_keys)
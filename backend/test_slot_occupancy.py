@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for the trigger-maintained slot occupancy counts.
+This script checks conflict totals and heatmaps after creates, moves and
+deletes, the consistency check, the rebuild command and the migration backfill.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import db
+from sqlalchemy import text
+from testing import create_test_app, run_tests
+
+def setup_shop(client):
+    company_id = client.post("/companies", json={"name": "Occupancy Co"}).get_json()["company_id"]
+    machine_ids = [
+        client.post("/machines", json={"name": f"Lathe {i}", "type": "CNC Lathe"}).get_json()["machine_id"]
+        for i in (1, 2)
+    ]
+    part_id = client.post("/parts", json={"name": "Occupancy Pin", "company_id": company_id}).get_json()["part_id"]
+    operation_id = client.post("/operations", json={
+        "part_id": part_id, "sequence_number": 10, "machining_time": 5.0, "loading_time": 1.0
+    }).get_json()["operation_id"]
+    return machine_ids, part_id, operation_id
+
+def test_slot_occupancy():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        (lathe_1, lathe_2), part_id, operation_id = setup_shop(client)
+
+        def schedule(machine_id, day, slot):
+            response = client.post("/production-schedules", json={
+                "date": day, "shift_number": 1, "slot_number": slot, "part_id": part_id,
+                "operation_id": operation_id, "machine_id": machine_id, "quantity_scheduled": 10
+            })
+            assert response.status_code == 201
+            return response.get_json()["schedule_id"]
+
+        schedule(lathe_1, "2030-05-06", 1)
+        triple = schedule(lathe_1, "2030-05-06", 1)
+        schedule(lathe_1, "2030-05-06", 1)
+        schedule(lathe_2, "2030-05-07", 2)
+        double = schedule(lathe_2, "2030-05-07", 2)
+        schedule(lathe_2, "2030-06-03", 1)
+        schedule(lathe_2, "2030-06-03", 1)
+
+        summary = client.get("/production-schedules/conflicts/summary?from=2030-05-01&to=2030-05-31").get_json()
+        assert summary["conflicted_slots"] == 2
+        assert summary["conflicting_schedules"] == 5
+        assert summary["extra_bookings"] == 3
+        summary = client.get(f"/production-schedules/conflicts/summary?machine_id={lathe_2}").get_json()
+        assert summary["conflicted_slots"] == 2
+        print("✅ Conflict totals over a range and per machine")
+
+        # Move one booking out of the triple slot and remove one from the double slot
+        response = client.put(f"/production-schedules/{triple}", json={"slot_number": 2})
+        assert response.status_code == 200
+        response = client.delete(f"/production-schedules/{double}")
+        assert response.status_code == 200
+
+        heatmap = client.get("/production-schedules/conflicts/heatmap?from=2030-05-01&to=2030-06-30").get_json()
+        cells = {(cell["date"], cell["machine_id"]): cell for cell in heatmap["cells"]}
+        assert set(cells) == {("2030-05-06", lathe_1), ("2030-06-03", lathe_2)}
+        assert cells[("2030-05-06", lathe_1)]["conflicting_schedules"] == 2
+        print("✅ Counts follow updates and deletes")
+
+        response = client.get("/production-schedules/conflicts/heatmap?from=2030-05-01")
+        assert response.status_code == 400
+        response = client.get("/production-schedules/conflicts/summary?from=bad-date")
+        assert response.status_code == 400
+        print("✅ Invalid parameters handled correctly")
+
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["check-slot-occupancy"])
+        assert result.exit_code == 0, result.output
+        with app.app_context():
+            db.session.execute(text("UPDATE slot_occupancy SET count = 7 WHERE date = '2030-06-03'"))
+            db.session.execute(text("DELETE FROM slot_occupancy WHERE date = '2030-05-07'"))
+            db.session.commit()
+        result = runner.invoke(args=["check-slot-occupancy"])
+        assert result.exit_code != 0
+        assert "2 slots out of date" in result.output
+        result = runner.invoke(args=["rebuild-slot-occupancy"])
+        assert result.exit_code == 0
+        result = runner.invoke(args=["check-slot-occupancy"])
+        assert result.exit_code == 0, result.output
+        print("✅ Consistency check finds drift and rebuild repairs it")
+
+        # A database from before slot_occupancy existed is backfilled on upgrade
+        with app.app_context():
+            db.session.execute(text("DROP TABLE slot_occupancy"))
+            for trigger in ["insert", "update", "delete"]:
+                db.session.execute(text(f"DROP TRIGGER trg_slot_occupancy_{trigger}"))
+            db.session.execute(text("UPDATE schema_version SET version = 2"))
+            db.session.commit()
+            db.engine.dispose()
+
+        app = create_test_app(tmpdir)
+        client = app.test_client()
+        summary = client.get("/production-schedules/conflicts/summary").get_json()
+        assert summary["conflicted_slots"] == 2
+        schedule(lathe_2, "2030-05-07", 2)
+        summary = client.get("/production-schedules/conflicts/summary").get_json()
+        assert summary["conflicted_slots"] == 3
+        print("✅ Migration backfills counts and installs the triggers")
+
+        with app.app_context():
+            db.engine.dispose()
+
+if __name__ == "__main__":
+    run_tests("slot occupancy", test_slot_occupancy)
@@ -0,0 +1,35 @@
+"""
+Shared setup for the test scripts.
+
+Every test script runs on its own (`python test_<name>.py`). `create_test_app`
+builds an app on a throwaway database and archive in a temporary directory,
+and `run_tests` is the scripts' `__main__` runner.
+"""
+
+import os
+import sys
+import traceback
+
+from app import create_app
+
+
+def create_test_app(tmpdir, **config):
+    """An app whose database and archive live in tmpdir; config overrides the defaults"""
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(tmpdir, "scheduling.db")}',
+        'ARCHIVE_DATABASE_PATH': os.path.join(tmpdir, "scheduling_archive.db"),
+        'TESTING': True,
+        **config
+    })
+
+
+def run_tests(label, *tests):
+    """Run test functions in order and report the first failure with its traceback (exit status 1)"""
+    try:
+        for test in tests:
+            test()
+        print(f"\n🎉 All {label} tests passed!")
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        traceback.print_exc()
+        sys.exit(1)
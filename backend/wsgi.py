@@ -0,0 +1,11 @@
+from app import create_app, db
+
+app = create_app()
+
+# With gunicorn's preload_app the app is built once in the master process.
+# Close the connections opened while building it (the default database and
+# every factory's) so forked workers never share a SQLite connection; each
+# worker opens its own on first use.
+with app.app_context():
+    for engine in db.engines.values():
+        engine.dispose()